@@ -6,7 +6,7 @@ import signal
 from flask import Flask
 from .config import Config
 from .extensions import db, init_app
-from .routes import auth, admin, map, account, websocket, generate_speech
+from .routes import auth, admin, map, account, websocket, generate_speech, metrics
 import sys
 
 app = Flask(__name__)
@@ -21,6 +21,7 @@ app.register_blueprint(admin.admin_bp)
 app.register_blueprint(map.map_bp)
 app.register_blueprint(account.account_bp)
 app.register_blueprint(generate_speech.generate_speech_bp)
+app.register_blueprint(metrics.metrics_bp)
 
 # WSGI 分发器
 def dispatcher_app(environ, start_response):
@@ -41,6 +42,10 @@ signal.signal(signal.SIGINT, signal_handler)
 if __name__ == '__main__':
     with app.app_context():
         db.create_all()
+
+    # 启动时加载并预热模型，避免第一辆车承担冷启动时延
+    if Config.MODEL_WARMUP:
+        websocket.session_manager.warmup()
     
     try:
         server = WSGIServer(
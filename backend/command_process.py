@@ -4,6 +4,7 @@ import datetime
 import re
 import os
 from .config import Config
+from .utils.metrics import metrics
 
 def load_instruction_set():
     """加载指令集"""
@@ -160,6 +161,7 @@ def create_instruction_prompt():
     """
     return prompt
 
+@metrics.timed('llm_api')
 def send_to_api(data):
     """发送请求到大模型API"""
     headers = {
@@ -197,6 +199,7 @@ def create_history_file(user_id, file_prefix):
             json.dump([], f)
     return file_path
 
+@metrics.timed('history_write')
 def add_to_history(user_id, command, system_info, output, file_path, file_prefix, timestamp):
     """添加历史记录"""
     if not user_id:
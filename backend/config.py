@@ -11,4 +11,38 @@ class Config:
     PERMISSION_CODE = os.getenv('PERMISSION_CODE', 'your_permission_code')
     AMAP_API_KEY = os.getenv('AMAP_API_KEY', 'your_amap_api_key')
     AMAP_SECURITY_CODE = os.getenv('AMAP_SECURITY_CODE', 'your_amap_security_code')
-    PORCUPINE_ACCESS_KEY = os.getenv('PORCUPINE_ACCESS_KEY', 'your_porcupine_access_key')
\ No newline at end of file
+    PORCUPINE_ACCESS_KEY = os.getenv('PORCUPINE_ACCESS_KEY', 'your_porcupine_access_key')
+    WAKE_WORD_WAIT_TIMEOUT = float(os.getenv('WAKE_WORD_WAIT_TIMEOUT', 0.2))  # 汇总结果前等待本段唤醒词检测的上限（秒），超时则顺延到下一帧
+    MULTIMODAL_MAX_SESSIONS = int(os.getenv('MULTIMODAL_MAX_SESSIONS', 16))
+    MULTIMODAL_SESSION_IDLE_TIMEOUT = float(os.getenv('MULTIMODAL_SESSION_IDLE_TIMEOUT', 300))
+    INFERENCE_WORKERS = int(os.getenv('INFERENCE_WORKERS', 0))  # 推理进程数，0（默认）表示在 gevent 主进程内推理
+    LLM_MAX_CONCURRENCY = int(os.getenv('LLM_MAX_CONCURRENCY', 2))  # 每辆车同时进行的普通大模型请求数
+    LLM_MAX_PENDING = int(os.getenv('LLM_MAX_PENDING', 8))  # 每辆车排队的大模型请求上限
+    EMERGENCY_RESPONSE_DEADLINE = float(os.getenv('EMERGENCY_RESPONSE_DEADLINE', 1.5))  # 紧急事件响应时限（秒）
+    WS_RECORD_PATH = os.getenv('WS_RECORD_PATH', '')  # 非空时录制 /ws/multimodal 的 command 帧，供压测回放
+    MULTIMODAL_HEADLESS = os.getenv('MULTIMODAL_HEADLESS', 'true').lower() == 'true'  # 纯分析模式：不复制、不绘制帧
+    DEBUG_FRAME_INTERVAL = float(os.getenv('DEBUG_FRAME_INTERVAL', 1.0))  # 调试画面最小采样间隔（秒）
+    GESTURE_INPUT_MAX_SIDE = int(os.getenv('GESTURE_INPUT_MAX_SIDE', 640))  # 手势识别输入最大边长，超过时先缩小
+    ANALYSIS_MAX_SIDE = int(os.getenv('ANALYSIS_MAX_SIDE', 640))  # 分析分辨率：JPEG 按 1/2、1/4、1/8 缩小解码，长边不低于该值（0 表示全尺寸）
+    DECODE_ROI_MIN_SIDE = int(os.getenv('DECODE_ROI_MIN_SIDE', 192))  # 跟踪到人脸/手部时，该区域缩小解码后的最小边长
+    MODEL_WARMUP = os.getenv('MODEL_WARMUP', 'true').lower() == 'true'  # 启动时加载并预热模型
+    MEDIAPIPE_VIDEO_MODE = os.getenv('MEDIAPIPE_VIDEO_MODE', 'true').lower() == 'true'  # 手势/面部网格按会话使用跟踪模式图实例（按采集时间戳推进）
+    ASR_BACKEND = os.getenv('ASR_BACKEND', 'torch').lower()  # 语音识别后端：torch（funasr）或 onnx（ONNX Runtime，CPU 节点无需 torch）
+    ASR_DEVICE = os.getenv('ASR_DEVICE', 'cuda:0')  # torch 后端的推理设备
+    ASR_ONNX_MODEL_DIR = os.getenv('ASR_ONNX_MODEL_DIR', '')  # 导出的 SenseVoiceSmall ONNX 目录（model.onnx / model_quant.onnx、am.mvn、config.yaml），默认使用内置目录
+    ASR_ONNX_QUANTIZE = os.getenv('ASR_ONNX_QUANTIZE', 'true').lower() == 'true'  # 使用 int8 量化模型 model_quant.onnx
+    ASR_NUM_THREADS = int(os.getenv('ASR_NUM_THREADS', 4))  # ONNX Runtime 算子内线程数
+    ASR_VAD_GATE = os.getenv('ASR_VAD_GATE', 'true').lower() == 'true'  # 语音识别前的能量门限：静音/稳态噪声不送入 ASR
+    VAD_SNR_DB = float(os.getenv('VAD_SNR_DB', 8.0))  # 帧能量高于噪声底该分贝数记为语音
+    VAD_MIN_DBFS = float(os.getenv('VAD_MIN_DBFS', -50.0))  # 噪声底下限（dBFS），也是会话初始噪声底
+    VAD_NOISE_ADAPT_SECONDS = float(os.getenv('VAD_NOISE_ADAPT_SECONDS', 5.0))  # 噪声底上升的时间常数（秒）
+    ASR_UTTERANCE_ENDPOINTING = os.getenv('ASR_UTTERANCE_ENDPOINTING', 'true').lower() == 'true'  # 跨音频分段拼接整句，语句结束后才识别
+    UTTERANCE_HANGOVER_SECONDS = float(os.getenv('UTTERANCE_HANGOVER_SECONDS', 0.6))  # 语音后连续静音达到该时长视为语句结束
+    UTTERANCE_CHUNK_END_HANGOVER_SECONDS = float(os.getenv('UTTERANCE_CHUNK_END_HANGOVER_SECONDS', 0.2))  # 音频分段末尾的静音达到该时长即结束语句（不等下一帧）
+    UTTERANCE_MAX_SECONDS = float(os.getenv('UTTERANCE_MAX_SECONDS', 15.0))  # 单句最长时长，超过时强制切分
+    ASR_MAX_BATCH = int(os.getenv('ASR_MAX_BATCH', 8))  # 批量识别每批最多语句数
+    ASR_BATCH_WINDOW_MS = float(os.getenv('ASR_BATCH_WINDOW_MS', 5))  # 批量识别收集窗口（毫秒）
+    ASR_BATCH_BUCKET_RATIO = float(os.getenv('ASR_BATCH_BUCKET_RATIO', 1.5))  # 同一批内最长/最短语句时长比上限
+    ASR_LATENCY_BUDGET = float(os.getenv('ASR_LATENCY_BUDGET', 1.0))  # 单条语句排队 + 识别的时延预算（秒）
+    AUDIO_DEBUG_SPOOL_DIR = os.getenv('AUDIO_DEBUG_SPOOL_DIR', '')  # 调试用：收到的音频异步写入该目录（为空时不落盘）
+    AUDIO_DEBUG_SPOOL_MAX_PENDING = int(os.getenv('AUDIO_DEBUG_SPOOL_MAX_PENDING', 32))  # 写盘积压上限，超出时丢弃
\ No newline at end of file
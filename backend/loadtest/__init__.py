@@ -0,0 +1,9 @@
+"""
+/ws/multimodal 录制与回放压测工具
+
+录制：设置环境变量 WS_RECORD_PATH 后启动服务，所有 command 帧及其到达时间写入录制文件
+回放：python -m backend.loadtest replay <录制文件> --vehicles 8 --speed 5
+"""
+from .recording import SessionRecorder, load_recording
+
+__all__ = ['SessionRecorder', 'load_recording']
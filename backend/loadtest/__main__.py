@@ -0,0 +1,48 @@
+from gevent import monkey
+monkey.patch_all()
+import argparse
+import json
+from .recording import load_recording
+from .replay import replay, print_report
+
+
+def show_info(path):
+    sessions = load_recording(path)
+    for conn_id, records in sorted(sessions.items()):
+        duration = records[-1][0] - records[0][0] if records else 0.0
+        size = sum(len(payload) for _, _, payload in records)
+        print(f"会话 {conn_id}: {len(records)} 帧, 时长 {duration:.1f}s, 负载 {size / 1024:.1f}KB")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='/ws/multimodal 录制回放压测')
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    info_parser = subparsers.add_parser('info', help='查看录制文件')
+    info_parser.add_argument('path')
+
+    replay_parser = subparsers.add_parser('replay', help='回放录制文件')
+    replay_parser.add_argument('path')
+    replay_parser.add_argument('--vehicles', type=int, default=1, help='并发模拟车辆数')
+    replay_parser.add_argument('--speed', type=float, default=1.0, help='时间加速倍数，0 表示全速')
+    replay_parser.add_argument('--mode', choices=['inprocess', 'socket'], default='inprocess')
+    replay_parser.add_argument('--llm-latency', type=float, default=0.3, help='大模型替身响应时延（秒）')
+    replay_parser.add_argument('--tts-latency', type=float, default=0.2, help='TTS 替身响应时延（秒）')
+    replay_parser.add_argument('--drain', type=float, default=5.0, help='发送结束后等待响应的时间（秒）')
+    replay_parser.add_argument('--json', action='store_true', help='以 JSON 输出结果')
+
+    args = parser.parse_args()
+    if args.command == 'info':
+        show_info(args.path)
+        return
+
+    report = replay(args.path, vehicles=args.vehicles, speed=args.speed, mode=args.mode,
+                    llm_latency=args.llm_latency, tts_latency=args.tts_latency, drain=args.drain)
+    if args.json:
+        print(json.dumps(report, ensure_ascii=False, indent=2))
+    else:
+        print_report(report)
+
+
+if __name__ == '__main__':
+    main()
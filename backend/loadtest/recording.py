@@ -0,0 +1,81 @@
+import struct
+import time
+from collections import defaultdict
+
+# 录制文件格式：
+# 文件头 | magic(4)=b'MMRC' | version(1) |
+# 记录头 | offset(8, float64 秒) | conn_id(4) | kind(1) | length(4) | 负载(length) |
+FILE_MAGIC = b'MMRC'
+FILE_VERSION = 1
+FILE_HEADER_FORMAT = '<4sB'
+RECORD_HEADER_FORMAT = '<dIBI'
+RECORD_HEADER_SIZE = struct.calcsize(RECORD_HEADER_FORMAT)
+
+KIND_TEXT = 0     # JSON 文本帧
+KIND_BINARY = 1   # 二进制多模态帧
+
+
+class SessionRecorder:
+    """
+    WebSocket 会话录制器
+
+    记录每个 command 帧的原始负载及相对录制开始的到达时间，多个连接写入同一文件，
+    回放时可还原各连接之间的并发关系。
+    """
+    def __init__(self, path):
+        self.path = path
+        self._file = open(path, 'wb')
+        self._file.write(struct.pack(FILE_HEADER_FORMAT, FILE_MAGIC, FILE_VERSION))
+        self._start = time.monotonic()
+        self._next_conn_id = 0
+        self.records = 0
+
+    def new_connection(self):
+        """为新连接分配录制编号"""
+        conn_id = self._next_conn_id
+        self._next_conn_id += 1
+        return conn_id
+
+    def record(self, conn_id, message):
+        """写入一帧（message 为 WebSocket 收到的原始文本或字节）"""
+        if isinstance(message, str):
+            kind, payload = KIND_TEXT, message.encode('utf-8')
+        else:
+            kind, payload = KIND_BINARY, bytes(message)
+        offset = time.monotonic() - self._start
+        # 单次 write 写入整条记录，gevent 协程之间不会交错
+        self._file.write(struct.pack(RECORD_HEADER_FORMAT, offset, conn_id, kind, len(payload)) + payload)
+        self.records += 1
+
+    def flush(self):
+        self._file.flush()
+
+    def close(self):
+        self._file.close()
+
+
+def load_recording(path):
+    """
+    读取录制文件
+
+    返回: {conn_id: [(offset, kind, payload), ...]}，每个连接内按到达时间排序
+    """
+    sessions = defaultdict(list)
+    with open(path, 'rb') as f:
+        header = f.read(struct.calcsize(FILE_HEADER_FORMAT))
+        magic, version = struct.unpack(FILE_HEADER_FORMAT, header)
+        if magic != FILE_MAGIC or version != FILE_VERSION:
+            raise ValueError(f"不支持的录制文件: {path}")
+        while True:
+            record_header = f.read(RECORD_HEADER_SIZE)
+            if len(record_header) < RECORD_HEADER_SIZE:
+                break
+            offset, conn_id, kind, length = struct.unpack(RECORD_HEADER_FORMAT, record_header)
+            payload = f.read(length)
+            if len(payload) < length:
+                # 录制进程被中断时最后一条记录可能不完整
+                break
+            sessions[conn_id].append((offset, kind, payload))
+    for records in sessions.values():
+        records.sort(key=lambda record: record[0])
+    return dict(sessions)
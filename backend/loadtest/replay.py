@@ -0,0 +1,209 @@
+import json
+import struct
+import time
+from collections import defaultdict
+import gevent
+import numpy as np
+from gevent.queue import Queue
+from ..task_scheduler import TaskPriority
+from ..utils.metrics import metrics
+from .recording import load_recording, KIND_TEXT
+from .stub_services import StubServices
+
+# 二进制帧头中 user_id 与 capture_ts 的偏移（见 binary_frame.HEADER_FORMAT）
+USER_ID_OFFSET = 8
+CAPTURE_TS_OFFSET = 20
+
+# 回放前后对比的服务端计数器
+REPORT_COUNTERS = ('frames_received_total', 'frames_processed_total', 'frames_dropped_total',
+                   'llm_tasks_dropped_total', 'llm_tasks_preempted_total', 'emergency_fallbacks_total')
+
+
+def rewrite_frame(kind, payload, user_id, capture_ts):
+    """替换录制帧的 user_id（每辆模拟车辆独立会话）和 capture_ts（用于计算响应时延）"""
+    if kind == KIND_TEXT:
+        data = json.loads(payload.decode('utf-8'))
+        data['user_id'] = user_id
+        data['capture_ts'] = capture_ts
+        return json.dumps(data)
+    frame = bytearray(payload)
+    struct.pack_into('<I', frame, USER_ID_OFFSET, user_id)
+    struct.pack_into('<Q', frame, CAPTURE_TS_OFFSET, capture_ts)
+    return bytes(frame)
+
+
+class InProcessWebSocket:
+    """交给 dispatcher_app 的服务端 ws 替身"""
+    def __init__(self):
+        self.inbox = Queue()   # 客户端 -> 服务端
+        self.outbox = Queue()  # 服务端 -> 客户端
+
+    def receive(self):
+        return self.inbox.get()
+
+    def send(self, message, binary=None):
+        self.outbox.put(message)
+
+
+class InProcessConnection:
+    """进程内连接：不经过网络，直接驱动 dispatcher_app"""
+    def __init__(self, app):
+        self.server_ws = InProcessWebSocket()
+        environ = {'PATH_INFO': '/ws/multimodal', 'wsgi.websocket': self.server_ws}
+        self.greenlet = gevent.spawn(app, environ, lambda *args: None)
+
+    def send(self, message):
+        self.server_ws.inbox.put(message)
+
+    def receive(self):
+        return self.server_ws.outbox.get()
+
+    def close(self):
+        self.server_ws.inbox.put(None)
+        self.server_ws.outbox.put(None)
+
+
+class ReplayStats:
+    """回放统计：按 TaskPriority 分组的响应时延（毫秒）"""
+    def __init__(self):
+        self.latencies = defaultdict(list)
+        self.frames_sent = 0
+        self.responses = 0
+        self.errors = 0
+
+    def on_message(self, message):
+        try:
+            data = json.loads(message)
+        except (TypeError, ValueError):
+            return
+        if data.get('error'):
+            self.errors += 1
+            return
+        if data.get('type') != 'response':
+            return
+        self.responses += 1
+        capture_ts = data.get('capture_ts')
+        if capture_ts:
+            priority = TaskPriority(data.get('priority', TaskPriority.NORMAL_COMMAND)).name
+            self.latencies[priority].append(time.time() * 1000 - capture_ts)
+
+
+def receive_loop(conn, stats):
+    while True:
+        message = conn.receive()
+        if message is None:
+            break
+        stats.on_message(message)
+
+
+def run_vehicle(connect, records, user_id, speed, drain, stats):
+    """单辆模拟车辆：按录制的到达间隔（除以加速倍数）发送帧"""
+    conn = connect()
+    receiver = gevent.spawn(receive_loop, conn, stats)
+    start = time.monotonic()
+    base_offset = records[0][0]
+    for offset, kind, payload in records:
+        if speed > 0:
+            delay = start + (offset - base_offset) / speed - time.monotonic()
+            if delay > 0:
+                gevent.sleep(delay)
+        conn.send(rewrite_frame(kind, payload, user_id, int(time.time() * 1000)))
+        stats.frames_sent += 1
+        if speed <= 0:
+            # 全速回放也要让出，避免单辆车独占 hub
+            gevent.sleep(0)
+    # 等待最后几帧的响应
+    gevent.sleep(drain)
+    conn.close()
+    receiver.kill(block=False)
+
+
+def percentile(values, q):
+    return float(np.percentile(values, q)) if values else 0.0
+
+
+def replay(path, vehicles=1, speed=1.0, mode='inprocess', llm_latency=0.3, tts_latency=0.2,
+           drain=5.0, base_user_id=900000):
+    """
+    回放录制文件并返回统计结果
+
+    vehicles: 并发模拟车辆数，第 i 辆车回放第 i % 会话数 个录制会话，user_id 为 base_user_id + i
+    speed: 时间加速倍数，<= 0 表示全速回放
+    mode: inprocess（直接调用 dispatcher_app）/ socket（本地端口 + WebSocket）
+    """
+    sessions = load_recording(path)
+    if not sessions:
+        raise ValueError(f"录制文件中没有 command 帧: {path}")
+    session_records = [records for _, records in sorted(sessions.items()) if records]
+
+    stubs = StubServices(llm_latency=llm_latency, tts_latency=tts_latency).start()
+    stubs.install()
+    from ..app import dispatcher_app
+    from ..routes.websocket import session_manager
+    # 预热模型，冷启动不计入回放时延
+    session_manager.warmup()
+
+    server = None
+    if mode == 'socket':
+        from gevent.pywsgi import WSGIServer
+        from geventwebsocket.handler import WebSocketHandler
+        from .ws_client import WebSocketClient
+        server = WSGIServer(('127.0.0.1', 0), dispatcher_app, handler_class=WebSocketHandler, log=None)
+        server.start()
+        host, port = server.address[:2]
+        connect = lambda: WebSocketClient(host, port)
+    else:
+        connect = lambda: InProcessConnection(dispatcher_app)
+
+    stats = ReplayStats()
+    counters_before = {name: metrics.counters.get(name, 0) for name in REPORT_COUNTERS}
+    start = time.monotonic()
+    greenlets = [
+        gevent.spawn(run_vehicle, connect, session_records[i % len(session_records)],
+                     base_user_id + i, speed, drain, stats)
+        for i in range(vehicles)
+    ]
+    gevent.joinall(greenlets)
+    # 排水等待不计入吞吐时间
+    elapsed = max(time.monotonic() - start - drain, 1e-6)
+
+    if server is not None:
+        server.stop(timeout=1)
+    stubs.stop()
+
+    counters = {name: metrics.counters.get(name, 0) - counters_before[name] for name in REPORT_COUNTERS}
+    return {
+        'vehicles': vehicles,
+        'speed': speed,
+        'mode': mode,
+        'elapsed': elapsed,
+        'frames_sent': stats.frames_sent,
+        'responses': stats.responses,
+        'errors': stats.errors,
+        'llm_requests': stubs.llm_requests,
+        'frames_per_second': counters['frames_processed_total'] / elapsed,
+        'responses_per_second': stats.responses / elapsed,
+        'counters': counters,
+        'latency_ms': {
+            priority.name: {
+                'count': len(stats.latencies[priority.name]),
+                'p50': percentile(stats.latencies[priority.name], 50),
+                'p99': percentile(stats.latencies[priority.name], 99)
+            }
+            for priority in TaskPriority
+        }
+    }
+
+
+def print_report(report):
+    counters = report['counters']
+    print(f"回放完成: 模式 {report['mode']}, 车辆 {report['vehicles']}, 加速 {report['speed']}x, "
+          f"用时 {report['elapsed']:.2f}s")
+    print(f"发送帧: {report['frames_sent']}, 处理帧: {counters['frames_processed_total']}, "
+          f"丢弃帧: {counters['frames_dropped_total']}")
+    print(f"吞吐: {report['frames_per_second']:.2f} 帧/秒, {report['responses_per_second']:.2f} 响应/秒, "
+          f"大模型请求: {report['llm_requests']}, 错误: {report['errors']}")
+    print(f"丢弃任务: {counters['llm_tasks_dropped_total']}, 抢占任务: {counters['llm_tasks_preempted_total']}, "
+          f"紧急兜底: {counters['emergency_fallbacks_total']}")
+    for name, latency in report['latency_ms'].items():
+        print(f"  {name:<15} n={latency['count']:<6} p50={latency['p50']:.1f}ms p99={latency['p99']:.1f}ms")
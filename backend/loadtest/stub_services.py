@@ -0,0 +1,82 @@
+import base64
+import json
+import gevent
+from gevent.pywsgi import WSGIServer
+from ..command_process import load_instruction_set
+
+# 一帧静音 MP3（MPEG-1 Layer III, 32kbps, 44.1kHz）
+SILENT_MP3 = bytes([0xFF, 0xFB, 0x10, 0xC4]) + bytes(100)
+
+
+class StubServices:
+    """
+    本地替身服务：代替大模型 API 与 TTS 服务
+
+    大模型替身按指令集匹配输入文本返回标准格式的指令编码，并模拟固定的响应时延，
+    回放压测只衡量本系统自身的处理能力。
+    """
+    def __init__(self, llm_latency=0.3, tts_latency=0.2, host='127.0.0.1', port=0):
+        self.llm_latency = llm_latency
+        self.tts_latency = tts_latency
+        self.instructions = load_instruction_set().get('instructions', [])
+        self.server = WSGIServer((host, port), self.wsgi_app, log=None)
+        self.llm_requests = 0
+        self.tts_requests = 0
+
+    @property
+    def url(self):
+        host, port = self.server.address[:2]
+        return f'http://{host}:{port}'
+
+    def start(self):
+        self.server.start()
+        return self
+
+    def stop(self):
+        self.server.stop(timeout=1)
+
+    def match_instruction(self, text):
+        """取提示词最后一行【用户指令】/【系统信息】后的内容，按指令集匹配"""
+        query = text.rsplit('】', 1)[-1].strip()
+        for instr in self.instructions:
+            if instr['input'] and instr['input'] in query:
+                return instr
+        return None
+
+    def chat_completion(self, payload):
+        self.llm_requests += 1
+        gevent.sleep(self.llm_latency)
+        content = payload['messages'][-1]['content']
+        instr = self.match_instruction(content)
+        if instr is not None:
+            answer = (f"【instruction_code】{instr['response']}\n"
+                      f"【decision】{instr['input']}\n"
+                      f"【feedback】好的")
+        else:
+            answer = "【instruction_code】\n【decision】无\n【feedback】无法识别"
+        return {'choices': [{'message': {'role': 'assistant', 'content': answer}}]}
+
+    def tts(self, payload):
+        self.tts_requests += 1
+        gevent.sleep(self.tts_latency)
+        return {'code': 3000, 'message': 'Success', 'data': base64.b64encode(SILENT_MP3).decode('ascii')}
+
+    def wsgi_app(self, environ, start_response):
+        length = int(environ.get('CONTENT_LENGTH') or 0)
+        payload = json.loads(environ['wsgi.input'].read(length) or b'{}')
+        path = environ.get('PATH_INFO', '')
+        if path == '/tts':
+            result = self.tts(payload)
+        else:
+            result = self.chat_completion(payload)
+        body = json.dumps(result, ensure_ascii=False).encode('utf-8')
+        start_response('200 OK', [('Content-Type', 'application/json'),
+                                  ('Content-Length', str(len(body)))])
+        return [body]
+
+    def install(self):
+        """将大模型与 TTS 的请求地址指向替身服务"""
+        from ..config import Config
+        from .. import text_to_speech
+        Config.MODEL_API_URL = f'{self.url}/v1/chat/completions'
+        text_to_speech.api_url = f'{self.url}/tts'
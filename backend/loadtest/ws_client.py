@@ -0,0 +1,127 @@
+import base64
+import os
+import socket
+import struct
+import numpy as np
+
+OPCODE_TEXT = 0x1
+OPCODE_BINARY = 0x2
+OPCODE_CLOSE = 0x8
+OPCODE_PING = 0x9
+OPCODE_PONG = 0xA
+
+
+class WebSocketClient:
+    """
+    最小 WebSocket 客户端（RFC 6455，仅供压测回放使用）
+
+    接口与服务端 ws 对象一致：send(message) / receive()，连接关闭后 receive 返回 None
+    """
+    def __init__(self, host, port, path='/ws/multimodal', timeout=10):
+        self.sock = socket.create_connection((host, port), timeout=timeout)
+        self.sock.settimeout(None)
+        self.sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        self._buffer = b''
+        self.closed = False
+        self._handshake(host, port, path)
+
+    def _handshake(self, host, port, path):
+        key = base64.b64encode(os.urandom(16)).decode('ascii')
+        request = (
+            f'GET {path} HTTP/1.1\r\n'
+            f'Host: {host}:{port}\r\n'
+            'Upgrade: websocket\r\n'
+            'Connection: Upgrade\r\n'
+            f'Sec-WebSocket-Key: {key}\r\n'
+            'Sec-WebSocket-Version: 13\r\n\r\n'
+        )
+        self.sock.sendall(request.encode('ascii'))
+        while b'\r\n\r\n' not in self._buffer:
+            chunk = self.sock.recv(4096)
+            if not chunk:
+                raise ConnectionError('WebSocket 握手失败：连接已关闭')
+            self._buffer += chunk
+        header, self._buffer = self._buffer.split(b'\r\n\r\n', 1)
+        status_line = header.split(b'\r\n', 1)[0]
+        if b' 101 ' not in status_line:
+            raise ConnectionError(f'WebSocket 握手失败: {status_line.decode("latin-1")}')
+
+    def _send_frame(self, opcode, payload):
+        # 客户端发送的帧必须加掩码
+        mask = os.urandom(4)
+        length = len(payload)
+        if length < 126:
+            header = struct.pack('!BB', 0x80 | opcode, 0x80 | length)
+        elif length < 65536:
+            header = struct.pack('!BBH', 0x80 | opcode, 0x80 | 126, length)
+        else:
+            header = struct.pack('!BBQ', 0x80 | opcode, 0x80 | 127, length)
+        if length:
+            # 按 4 字节整数批量异或，避免逐字节循环
+            padded = np.frombuffer(payload + bytes(-length % 4), dtype='<u4')
+            mask_word = np.frombuffer(mask, dtype='<u4')[0]
+            masked = (padded ^ mask_word).tobytes()[:length]
+        else:
+            masked = b''
+        self.sock.sendall(header + mask + masked)
+
+    def send(self, message, binary=None):
+        if isinstance(message, str):
+            self._send_frame(OPCODE_TEXT, message.encode('utf-8'))
+        else:
+            self._send_frame(OPCODE_BINARY, bytes(message))
+
+    def _read_exact(self, size):
+        while len(self._buffer) < size:
+            chunk = self.sock.recv(max(65536, size - len(self._buffer)))
+            if not chunk:
+                raise ConnectionError('连接已关闭')
+            self._buffer += chunk
+        data, self._buffer = self._buffer[:size], self._buffer[size:]
+        return data
+
+    def receive(self):
+        """读取一条完整消息（合并分片），连接关闭时返回 None"""
+        if self.closed:
+            return None
+        message = b''
+        message_opcode = None
+        try:
+            while True:
+                first, second = self._read_exact(2)
+                fin, opcode = first & 0x80, first & 0x0F
+                length = second & 0x7F
+                if length == 126:
+                    length = struct.unpack('!H', self._read_exact(2))[0]
+                elif length == 127:
+                    length = struct.unpack('!Q', self._read_exact(8))[0]
+                payload = self._read_exact(length)
+                if opcode == OPCODE_CLOSE:
+                    self.closed = True
+                    return None
+                if opcode == OPCODE_PING:
+                    self._send_frame(OPCODE_PONG, payload)
+                    continue
+                if opcode == OPCODE_PONG:
+                    continue
+                if opcode != 0:
+                    message_opcode = opcode
+                message += payload
+                if fin:
+                    break
+        except (ConnectionError, OSError):
+            self.closed = True
+            return None
+        if message_opcode == OPCODE_TEXT:
+            return message.decode('utf-8')
+        return message
+
+    def close(self):
+        if self.closed:
+            return
+        self.closed = True
+        try:
+            self._send_frame(OPCODE_CLOSE, struct.pack('!H', 1000))
+        except OSError:
+            pass
+        self.sock.close()
@@ -1,2 +1,3 @@
 from .multimodal import MultimodalProcessor
-__all__ = ['MultimodalProcessor']
\ No newline at end of file
+from .session import SessionManager
+__all__ = ['MultimodalProcessor', 'SessionManager']
\ No newline at end of file
@@ -4,12 +4,59 @@ from typing import Any, Dict, Iterable, List, NamedTuple, Set, Tuple, Union
 import copy
 
 import numpy as np
+from numpy.lib.stride_tricks import as_strided, sliding_window_view
 import kaldi_native_fbank as knf
 
 root_dir = Path(__file__).resolve().parent
 
 logger_initialized = {}
 
+FLT_EPSILON = 1.1920928955078125e-07
+
+
+def feature_window(frame_opts, window_size: int) -> np.ndarray:
+    """Kaldi 窗函数（与 knf.FeatureWindowFunction 一致）"""
+    i = np.arange(window_size, dtype=np.float64)
+    a = 2 * np.pi / (window_size - 1)
+    window_type = frame_opts.window_type
+    if window_type == "hanning":
+        window = 0.5 - 0.5 * np.cos(a * i)
+    elif window_type == "sine":
+        window = np.sin(0.5 * a * i)
+    elif window_type == "hamming":
+        window = 0.54 - 0.46 * np.cos(a * i)
+    elif window_type == "povey":
+        window = (0.5 - 0.5 * np.cos(a * i)) ** 0.85
+    elif window_type == "rectangular":
+        window = np.ones(window_size)
+    elif window_type == "blackman":
+        c = frame_opts.blackman_coeff
+        window = c - 0.5 * np.cos(a * i) + (0.5 - c) * np.cos(2 * a * i)
+    else:
+        raise ValueError(f"Invalid window type {window_type}")
+    return window.astype(np.float32)
+
+
+def mel_banks(mel_opts, sample_freq: float, padded_window_size: int) -> np.ndarray:
+    """Kaldi 三角 mel 滤波器组，形状 (padded_window_size // 2, num_bins)"""
+    def mel_scale(freq):
+        return 1127.0 * np.log(1.0 + freq / 700.0)
+
+    num_bins = mel_opts.num_bins
+    num_fft_bins = padded_window_size // 2
+    nyquist = 0.5 * sample_freq
+    low_freq = mel_opts.low_freq
+    high_freq = mel_opts.high_freq if mel_opts.high_freq > 0 else mel_opts.high_freq + nyquist
+    mel_low = mel_scale(low_freq)
+    mel_delta = (mel_scale(high_freq) - mel_low) / (num_bins + 1)
+    mel = mel_scale(sample_freq / padded_window_size * np.arange(num_fft_bins))[:, None]
+    left = mel_low + np.arange(num_bins) * mel_delta
+    center = left + mel_delta
+    right = center + mel_delta
+    weights = np.where(mel <= center, (mel - left) / (center - left), (right - mel) / (right - center))
+    weights[(mel <= left) | (mel >= right)] = 0
+    return weights.astype(np.float32)
+
 
 class WavFrontend:
     """Conventional frontend structure for ASR."""
@@ -46,22 +93,71 @@ class WavFrontend:
 
         if self.cmvn_file:
             self.cmvn = self.load_cmvn()
+            # 广播用的均值、缩放（float32，按列对齐特征维度）
+            self.cmvn_means = self.cmvn[0].astype(np.float32)
+            self.cmvn_vars = self.cmvn[1].astype(np.float32)
         self.fbank_fn = None
         self.fbank_beg_idx = 0
         self.reset_status()
 
+        # 整段 fbank 的 numpy 实现所需常量（与 knf.OnlineFbank 的计算过程一致）
+        frame_opts = opts.frame_opts
+        self.window_size = int(frame_opts.samp_freq * 0.001 * frame_opts.frame_length_ms)
+        self.window_shift = int(frame_opts.samp_freq * 0.001 * frame_opts.frame_shift_ms)
+        self.padded_window_size = self.window_size
+        if frame_opts.round_to_power_of_two:
+            self.padded_window_size = 1 << (self.window_size - 1).bit_length()
+        self.window = feature_window(frame_opts, self.window_size)
+        self.mel_banks = mel_banks(opts.mel_opts, frame_opts.samp_freq, self.padded_window_size)
+        self.rng = np.random.default_rng()
+        self._dither_noise = None
+
     def fbank(self, waveform: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
-        waveform = waveform * (1 << 15)
-        self.fbank_fn = knf.OnlineFbank(self.opts)
-        self.fbank_fn.accept_waveform(self.opts.frame_opts.samp_freq, waveform.tolist())
-        frames = self.fbank_fn.num_frames_ready
-        mat = np.empty([frames, self.opts.mel_opts.num_bins])
-        for i in range(frames):
-            mat[i, :] = self.fbank_fn.get_frame(i)
-        feat = mat.astype(np.float32)
-        feat_len = np.array(mat.shape[0]).astype(np.int32)
+        """
+        整段 fbank：按帧移的滑动窗口视图一次取出全部帧，去直流、预加重、加窗、FFT、mel 滤波均按整批矩阵计算
+        （snip_edges=True；逐帧调用 knf 需要 tolist 和逐帧拷贝，整句时占用大部分特征提取时间）
+        """
+        frame_opts = self.opts.frame_opts
+        waveform = np.asarray(waveform, dtype=np.float32) * (1 << 15)
+        num_bins = self.opts.mel_opts.num_bins
+        if len(waveform) < self.window_size:
+            return np.empty((0, num_bins), dtype=np.float32), np.array(0).astype(np.int32)
+        num_frames = 1 + (len(waveform) - self.window_size) // self.window_shift
+        frames = sliding_window_view(waveform, self.window_size)[:: self.window_shift][:num_frames].copy()
+        if frame_opts.dither != 0:
+            frames += frame_opts.dither * self.dither_noise(frames.shape)
+        if frame_opts.remove_dc_offset:
+            frames -= frames.mean(axis=1, keepdims=True)
+        preemph_coeff = frame_opts.preemph_coeff
+        if preemph_coeff != 0:
+            frames[:, 1:] -= preemph_coeff * frames[:, :-1]
+            frames[:, 0] -= preemph_coeff * frames[:, 0]
+        frames *= self.window
+        spectrum = np.fft.rfft(frames, n=self.padded_window_size)[:, : self.padded_window_size // 2]
+        power = np.square(spectrum.real, dtype=np.float32) + np.square(spectrum.imag, dtype=np.float32)
+        if not self.opts.use_power:
+            power = np.sqrt(power)
+        feat = power @ self.mel_banks
+        if self.opts.use_log_fbank:
+            feat = np.log(np.maximum(feat, FLT_EPSILON, out=feat), out=feat)
+        feat_len = np.array(feat.shape[0]).astype(np.int32)
         return feat, feat_len
 
+    DITHER_TABLE_SIZE = 1 << 21
+
+    def dither_noise(self, shape: Tuple[int, int]) -> np.ndarray:
+        """
+        抖动噪声：从预生成的高斯噪声表中随机截取（逐次生成高斯随机数比整个 fbank 计算还慢），
+        超过噪声表长度时再现场生成
+        """
+        size = shape[0] * shape[1]
+        if size > self.DITHER_TABLE_SIZE:
+            return self.rng.standard_normal(shape, dtype=np.float32)
+        if self._dither_noise is None:
+            self._dither_noise = self.rng.standard_normal(self.DITHER_TABLE_SIZE, dtype=np.float32)
+        start = self.rng.integers(0, self.DITHER_TABLE_SIZE - size + 1)
+        return self._dither_noise[start : start + size].reshape(shape)
+
     def fbank_online(self, waveform: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
         waveform = waveform * (1 << 15)
         # self.fbank_fn = knf.OnlineFbank(self.opts)
@@ -80,47 +176,55 @@ class WavFrontend:
         self.fbank_beg_idx = 0
 
     def lfr_cmvn(self, feat: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        LFR 拼帧 + CMVN，输出 float32（原实现与 float64 的 CMVN 相加后为 float64，送入模型前同样转换为 float32）
+        """
         if self.lfr_m != 1 or self.lfr_n != 1:
-            feat = self.apply_lfr(feat, self.lfr_m, self.lfr_n)
-
-        if self.cmvn_file:
+            if self.cmvn_file and feat.shape[0]:
+                # LFR 视图直接做 CMVN 写入输出，不单独生成拼帧副本
+                feat = self.apply_cmvn(self.lfr_view(feat, self.lfr_m, self.lfr_n))
+            else:
+                feat = self.apply_lfr(feat, self.lfr_m, self.lfr_n)
+        elif self.cmvn_file:
             feat = self.apply_cmvn(feat)
 
         feat_len = np.array(feat.shape[0]).astype(np.int32)
         return feat, feat_len
 
     @staticmethod
-    def apply_lfr(inputs: np.ndarray, lfr_m: int, lfr_n: int) -> np.ndarray:
-        LFR_inputs = []
-
-        T = inputs.shape[0]
-        T_lfr = int(np.ceil(T / lfr_n))
-        left_padding = np.tile(inputs[0], ((lfr_m - 1) // 2, 1))
-        inputs = np.vstack((left_padding, inputs))
-        T = T + (lfr_m - 1) // 2
-        for i in range(T_lfr):
-            if lfr_m <= T - i * lfr_n:
-                LFR_inputs.append((inputs[i * lfr_n : i * lfr_n + lfr_m]).reshape(1, -1))
-            else:
-                # process last LFR frame
-                num_padding = lfr_m - (T - i * lfr_n)
-                frame = inputs[i * lfr_n :].reshape(-1)
-                for _ in range(num_padding):
-                    frame = np.hstack((frame, inputs[-1]))
+    def lfr_view(inputs: np.ndarray, lfr_m: int, lfr_n: int) -> np.ndarray:
+        """
+        LFR 拼帧的只读视图 (T_lfr, lfr_m * D)：左侧补 (lfr_m - 1) // 2 个首帧、右侧补末帧后，
+        第 i 个 LFR 帧就是从第 i * lfr_n 帧开始的连续 lfr_m 帧，按步长直接映射到同一块内存
+        """
+        T, dim = inputs.shape
+        T_lfr = -(-T // lfr_n)
+        left = (lfr_m - 1) // 2
+        right = max(0, (T_lfr - 1) * lfr_n + lfr_m - (T + left))
+        padded = np.empty((left + T + right, dim), dtype=np.float32)
+        padded[:left] = inputs[0]
+        padded[left : left + T] = inputs
+        padded[left + T :] = inputs[-1]
+        itemsize = padded.itemsize
+        return as_strided(padded, shape=(T_lfr, lfr_m * dim), strides=(lfr_n * dim * itemsize, itemsize),
+                          writeable=False)
 
-                LFR_inputs.append(frame)
-        LFR_outputs = np.vstack(LFR_inputs).astype(np.float32)
-        return LFR_outputs
+    @staticmethod
+    def apply_lfr(inputs: np.ndarray, lfr_m: int, lfr_n: int) -> np.ndarray:
+        if not inputs.shape[0]:
+            return np.empty((0, lfr_m * inputs.shape[1]), dtype=np.float32)
+        return WavFrontend.lfr_view(inputs, lfr_m, lfr_n).copy()
 
-    def apply_cmvn(self, inputs: np.ndarray) -> np.ndarray:
+    def apply_cmvn(self, inputs: np.ndarray, out: np.ndarray = None) -> np.ndarray:
         """
-        Apply CMVN with mvn data
+        Apply CMVN with mvn data（广播计算，可直接写入预分配的 out）
         """
-        frame, dim = inputs.shape
-        means = np.tile(self.cmvn[0:1, :dim], (frame, 1))
-        vars = np.tile(self.cmvn[1:2, :dim], (frame, 1))
-        inputs = (inputs + means) * vars
-        return inputs
+        dim = inputs.shape[1]
+        if out is None:
+            out = np.empty(inputs.shape, dtype=np.float32)
+        np.add(inputs, self.cmvn_means[:dim], out=out)
+        np.multiply(out, self.cmvn_vars[:dim], out=out)
+        return out
 
     def load_cmvn(
         self,
@@ -158,6 +158,18 @@ class CharTokenizer:
         )
 
 
+class SentencepiecesTokenizer:
+    """SenseVoice 的 BPE 分词器（只用于把 token id 还原为带富文本标签的文本）"""
+    def __init__(self, bpemodel: Union[Path, str]):
+        import sentencepiece as spm
+
+        self.sp = spm.SentencePieceProcessor()
+        self.sp.Load(str(bpemodel))
+
+    def tokens2text(self, token_ids: Iterable[int]) -> str:
+        return self.sp.DecodeIds(list(token_ids))
+
+
 class Hypothesis(NamedTuple):
     """Hypothesis data type."""
 
@@ -6,11 +6,9 @@
 import os.path
 from pathlib import Path
 from typing import List, Union, Tuple
-import torch
-import librosa
 import numpy as np
 
-from utils.infer_utils import (
+from .infer_utils import (
     CharTokenizer,
     Hypothesis,
     ONNXRuntimeError,
@@ -19,8 +17,8 @@ from utils.infer_utils import (
     get_logger,
     read_yaml,
 )
-from utils.frontend import WavFrontend
-from utils.infer_utils import pad_list
+from .frontend import WavFrontend
+from .infer_utils import pad_list
 
 logging = get_logger()
 
@@ -73,33 +71,44 @@ class SenseVoiceSmallONNX:
                  **kwargs) -> List:
         waveform_list = self.load_data(wav_content, self.frontend.opts.frame_opts.samp_freq)
         waveform_nums = len(waveform_list)
+        # language / textnorm 可以逐条给出，也可以只给一个由整批共用
+        language = np.array(language, dtype=np.int32)
+        textnorm = np.array(textnorm, dtype=np.int32)
         asr_res = []
         for beg_idx in range(0, waveform_nums, self.batch_size):
             end_idx = min(waveform_nums, beg_idx + self.batch_size)
             feats, feats_len = self.extract_feat(waveform_list[beg_idx:end_idx])
             ctc_logits, encoder_out_lens = self.infer(feats, 
                                  feats_len, 
-                                 np.array(language, dtype=np.int32), 
-                                 np.array(textnorm, dtype=np.int32)
+                                 self._batch_ids(language, waveform_nums, beg_idx, end_idx), 
+                                 self._batch_ids(textnorm, waveform_nums, beg_idx, end_idx)
                                  )
-            # back to torch.Tensor
-            ctc_logits = torch.from_numpy(ctc_logits).float()
-            # support batch_size=1 only currently
-            x = ctc_logits[0, : encoder_out_lens[0].item(), :]
-            yseq = x.argmax(dim=-1)
-            yseq = torch.unique_consecutive(yseq, dim=-1)
-
-            mask = yseq != self.blank_id
-            token_int = yseq[mask].tolist()
-            
-            if tokenizer is not None:
-                asr_res.append(tokenizer.tokens2text(token_int))
-            else:
-                asr_res.append(token_int)
+            # CTC 贪心解码（numpy 实现，不依赖 torch），逐行截取有效长度
+            yseqs = ctc_logits.argmax(axis=-1)
+            for yseq, yseq_len in zip(yseqs, encoder_out_lens):
+                yseq = yseq[: int(yseq_len)]
+                if len(yseq):
+                    yseq = yseq[np.concatenate(([True], yseq[1:] != yseq[:-1]))]
+
+                mask = yseq != self.blank_id
+                token_int = yseq[mask].tolist()
+
+                if tokenizer is not None:
+                    asr_res.append(tokenizer.tokens2text(token_int))
+                else:
+                    asr_res.append(token_int)
         return asr_res
 
+    @staticmethod
+    def _batch_ids(ids: np.ndarray, waveform_nums: int, beg_idx: int, end_idx: int) -> np.ndarray:
+        if len(ids) == waveform_nums:
+            return ids[beg_idx:end_idx]
+        return np.repeat(ids[:1], end_idx - beg_idx)
+
     def load_data(self, wav_content: Union[str, np.ndarray, List[str]], fs: int = None) -> List:
         def load_wav(path: str) -> np.ndarray:
+            import librosa
+
             waveform, _ = librosa.load(path, sr=fs)
             return waveform
 
@@ -110,7 +119,7 @@ class SenseVoiceSmallONNX:
             return [load_wav(wav_content)]
 
         if isinstance(wav_content, list):
-            return [load_wav(path) for path in wav_content]
+            return [load_wav(item) if isinstance(item, str) else item for item in wav_content]
 
         raise TypeError(f"The type of {wav_content} is not in [str, np.ndarray, list]")
 
@@ -128,13 +137,11 @@ class SenseVoiceSmallONNX:
 
     @staticmethod
     def pad_feats(feats: List[np.ndarray], max_feat_len: int) -> np.ndarray:
-        def pad_feat(feat: np.ndarray, cur_len: int) -> np.ndarray:
-            pad_width = ((0, max_feat_len - cur_len), (0, 0))
-            return np.pad(feat, pad_width, "constant", constant_values=0)
-
-        feat_res = [pad_feat(feat, feat.shape[0]) for feat in feats]
-        feats = np.array(feat_res).astype(np.float32)
-        return feats
+        # 预分配整批并逐条写入，尾部保持零填充
+        feat_res = np.zeros((len(feats), max_feat_len, feats[0].shape[1]), dtype=np.float32)
+        for i, feat in enumerate(feats):
+            feat_res[i, : feat.shape[0]] = feat
+        return feat_res
 
     def infer(self, 
               feats: np.ndarray, 
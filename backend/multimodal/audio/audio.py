@@ -1,8 +1,11 @@
+import os
 import time
+import wave
 import numpy as np
 import pyaudio
-from funasr import AutoModel
-from funasr.utils.postprocess_utils import rich_transcription_postprocess
+from .SenseVoiceSmall.utils.postprocess_utils import rich_transcription_postprocess
+from ...config import Config
+from ...utils.metrics import metrics, process_rss_bytes
 
 # 音频参数
 CHUNK = 512  # 每个缓冲区的帧数
@@ -12,30 +15,96 @@ RATE = 16000  # 采样率
 THRESHOLD = 300  # 能量阈值
 SILENCE_LIMIT = 2.5  # 无声时间阈值
 
+# 内置 SenseVoiceSmall 目录（配置、BPE 分词模型；ONNX 模型可导出到此处）
+SENSEVOICE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'SenseVoiceSmall')
+BPE_MODEL = 'chn_jpn_yue_eng_ko_spectok.bpe.model'
+# 与 SenseVoiceSmall/model.py 中 lid_dict、textnorm_dict 一致
+LANGUAGE_IDS = {"auto": 0, "zh": 3, "en": 4, "yue": 7, "ja": 11, "ko": 12, "nospeech": 13}
+TEXTNORM_IDS = {"withitn": 14, "woitn": 15}
+
+
+def pcm16_to_float32(pcm):
+    """int16 PCM（字节或数组）-> float32 波形（[-1, 1]）"""
+    if isinstance(pcm, (bytes, bytearray, memoryview)):
+        pcm = np.frombuffer(pcm, dtype=np.int16)
+    return pcm.astype(np.float32) * (1.0 / 32768.0)
+
+
+def read_wav(wav_path):
+    """读取 WAV 为 float32 波形（[-1, 1]）和采样率（仅本地调试使用，服务端音频不落盘）"""
+    with wave.open(wav_path, 'rb') as wf:
+        sample_rate = wf.getframerate()
+        channels = wf.getnchannels()
+        pcm = np.frombuffer(wf.readframes(wf.getnframes()), dtype=np.int16)
+    if channels > 1:
+        pcm = pcm.reshape(-1, channels).mean(axis=1)
+    return pcm16_to_float32(pcm), sample_rate
+
+
+def to_waveform(audio):
+    """识别输入统一为 float32 波形：float 数组原样使用，int16 数组或字节按 PCM 转换"""
+    if isinstance(audio, np.ndarray) and audio.dtype.kind == 'f':
+        return audio.astype(np.float32, copy=False)
+    return pcm16_to_float32(audio)
+
 
 class AudioRecognition():
-    def __init__(self, user_id=None):
+    def __init__(self, user_id=None, open_microphone=True, backend=None):
         self.user_id = user_id
-        self.p = pyaudio.PyAudio()
-        self.stream = self.p.open(format=FORMAT,
-                                  channels=CHANNELS,
-                                  rate=RATE,
-                                  input=True,
-                                  frames_per_buffer=CHUNK)
+        self.p = None
+        self.stream = None
+        # 服务端模式下音频由客户端上传，不打开本地麦克风
+        if open_microphone:
+            self.p = pyaudio.PyAudio()
+            self.stream = self.p.open(format=FORMAT,
+                                      channels=CHANNELS,
+                                      rate=RATE,
+                                      input=True,
+                                      frames_per_buffer=CHUNK)
         self.audio_buffer = []
         self.silence_start_time = None
+        # 识别后端：torch（funasr AutoModel）或 onnx（ONNX Runtime，不导入 torch）
+        self.backend = (backend or Config.ASR_BACKEND).lower()
+        self.tokenizer = None
+        self.load_stats = {}
+        self.last_rtf = 0.0
         self.model = self.load_model()
 
     def load_model(self):
+        """加载识别模型，记录加载耗时和进程常驻内存"""
+        rss_before = process_rss_bytes()
+        start = time.perf_counter()
+        if self.backend == 'onnx':
+            model = self._load_onnx_model()
+        else:
+            model = self._load_torch_model()
+        rss = process_rss_bytes()
+        self.load_stats = {
+            'backend': self.backend,
+            'load_seconds': time.perf_counter() - start,
+            'rss_bytes': rss,
+            'rss_delta_bytes': rss - rss_before
+        }
+        if model is not None:
+            print(f"语音识别模型已加载: backend={self.backend}, 耗时 {self.load_stats['load_seconds']:.2f}s, "
+                  f"常驻内存 {rss / 2 ** 20:.0f}MB (+{self.load_stats['rss_delta_bytes'] / 2 ** 20:.0f}MB)")
+            metrics.gauge('asr_model_load_seconds', lambda: self.load_stats['load_seconds'])
+            metrics.gauge('asr_model_rss_delta_bytes', lambda: self.load_stats['rss_delta_bytes'])
+            metrics.gauge('asr_rtf', lambda: self.last_rtf)
+        return model
+
+    def _load_torch_model(self):
         model_dir = "iic/SenseVoiceSmall"
         try:
+            from funasr import AutoModel
+
             model = AutoModel(
                 model=model_dir,
                 trust_remote_code=True,
                 remote_code="multimodal/audio/SenseVoiceSmall/model.py",
                 vad_model="fsmn-vad",
                 vad_kwargs={"max_single_segment_time": 30000},
-                device="cuda:0",
+                device=Config.ASR_DEVICE,
                 disable_update=True  # 禁用更新检查
             )
             return model
@@ -43,26 +112,95 @@ class AudioRecognition():
             print(f"加载模型失败: {str(e)}")
             return None
 
-    def recognize_speech(self, wav_path):
+    def _load_onnx_model(self):
+        model_dir = Config.ASR_ONNX_MODEL_DIR or SENSEVOICE_DIR
+        try:
+            from .SenseVoiceSmall.utils.model_bin import SenseVoiceSmallONNX
+            from .SenseVoiceSmall.utils.infer_utils import SentencepiecesTokenizer
+
+            model = SenseVoiceSmallONNX(model_dir,
+                                        batch_size=Config.ASR_MAX_BATCH,
+                                        quantize=Config.ASR_ONNX_QUANTIZE,
+                                        intra_op_num_threads=Config.ASR_NUM_THREADS)
+            bpe_model = os.path.join(model_dir, BPE_MODEL)
+            if not os.path.exists(bpe_model):
+                bpe_model = os.path.join(SENSEVOICE_DIR, BPE_MODEL)
+            self.tokenizer = SentencepiecesTokenizer(bpe_model)
+            return model
+        except Exception as e:
+            print(f"加载模型失败: {str(e)}")
+            return None
+
+    def recognize_speech(self, audio, sample_rate=RATE):
         """
         识别音频中的语音内容
+
+        audio: float32 波形（[-1, 1]）、int16 PCM（数组或字节），或 WAV 文件路径（本地调试）
         """
-        # 使用 SenseVoice 模型进行识别
-        if self.model:
-            res = self.model.generate(
-                input=wav_path,
-                cache={},
-                language="auto",  # "zh", "en", "yue", "ja", "ko", "nospeech"
-                use_itn=True,
-                batch_size_s=60,
-                merge_vad=True,  #
-                merge_length_s=15,
-            )
+        if not self.model:
+            return "模型加载失败，无法识别"
+        if isinstance(audio, str):
+            waveform, sample_rate = read_wav(audio)
+        else:
+            waveform = to_waveform(audio)
+        duration = len(waveform) / sample_rate
+        start = time.perf_counter()
+        if self.backend == 'onnx':
+            if sample_rate != RATE:
+                # 前端按 16kHz 提取特征，其他采样率先线性重采样
+                positions = np.arange(int(duration * RATE)) * (sample_rate / RATE)
+                waveform = np.interp(positions, np.arange(len(waveform)), waveform).astype(np.float32)
+            raw_text = self._generate_onnx([waveform])[0]
+        else:
+            raw_text = self._generate_torch(waveform, sample_rate)
+        self._record_compute(duration, time.perf_counter() - start)
+
+        # 后处理（富文本标签：语种、情感、事件）
+        text = rich_transcription_postprocess(raw_text) or "音频数据为空"
+        return text
+
+    def recognize_batch(self, waveforms):
+        """
+        批量识别 16kHz 音频（float32 波形或 int16 PCM 列表），返回对应文本列表
+
+        onnx 后端整批一次编码器前向（按最长一条补零）；torch 后端逐条识别（funasr 内部按 VAD 分段）
+        """
+        if not self.model:
+            return ["模型加载失败，无法识别"] * len(waveforms)
+        if self.backend != 'onnx':
+            return [self.recognize_speech(waveform) for waveform in waveforms]
+        waveforms = [to_waveform(waveform) for waveform in waveforms]
+        start = time.perf_counter()
+        raw_texts = self._generate_onnx(waveforms)
+        self._record_compute(sum(len(waveform) for waveform in waveforms) / RATE, time.perf_counter() - start)
+        return [rich_transcription_postprocess(raw_text) or "音频数据为空" for raw_text in raw_texts]
+
+    def _record_compute(self, duration, elapsed):
+        # 实时率 = 计算耗时 / 音频时长
+        metrics.inc('asr_audio_seconds_total', duration)
+        metrics.inc('asr_compute_seconds_total', elapsed)
+        if duration > 0:
+            self.last_rtf = elapsed / duration
+
+    def _generate_torch(self, waveform, sample_rate=RATE):
+        # 使用 SenseVoice 模型进行识别（直接传入波形数组，不经过文件）
+        res = self.model.generate(
+            input=waveform,
+            fs=sample_rate,
+            cache={},
+            language="auto",  # "zh", "en", "yue", "ja", "ko", "nospeech"
+            use_itn=True,
+            batch_size_s=60,
+            merge_vad=True,  #
+            merge_length_s=15,
+        )
+        return res[0]["text"]
 
-            # 后处理
-            text = rich_transcription_postprocess(res[0]["text"]) or "音频数据为空"
-            return text
-        return "模型加载失败，无法识别"
+    def _generate_onnx(self, waveforms):
+        return self.model(waveforms,
+                          language=[LANGUAGE_IDS["auto"]],
+                          textnorm=[TEXTNORM_IDS["withitn"]],
+                          tokenizer=self.tokenizer)
 
     def process_audio(self, data):
         # 读取音频数据
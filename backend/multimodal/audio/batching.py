@@ -0,0 +1,118 @@
+import time
+import gevent
+from gevent.event import AsyncResult, Event
+from ...utils.metrics import metrics
+
+
+class PendingUtterance:
+    """等待识别的一条完整语句"""
+    def __init__(self, waveform, sample_rate):
+        self.waveform = waveform
+        self.duration = len(waveform) / sample_rate
+        self.enqueued = time.monotonic()
+        self.result = AsyncResult()
+
+
+class ASRBatcher:
+    """
+    跨会话的批量语音识别（每个进程一个，运行在 gevent 协程中）
+
+    - 各会话的完整语句先进入队列，在 window 秒内收集，批满 max_batch 条时立即发出
+    - 按时长排序分桶，同一桶内最长/最短不超过 bucket_ratio，补零浪费有限；每桶一次编码器前向
+    - 按近期实时率估算每桶耗时，保证桶内最早的语句 等待 + 计算 不超过 latency_budget，超出时拆成更小的桶；
+      已经超出预算的语句立即发出，但仍与等长语句成批（积压时退化为逐条推理只会让积压更严重）
+    - 整批推理失败时逐条重试，只有本身出错的语句返回异常
+    - 推理在独立执行线程中串行进行，推理期间到达的语句在下一轮成批处理
+    """
+    def __init__(self, recognizer, executor, sample_rate=16000, window=0.005, max_batch=8, bucket_ratio=1.5,
+                 latency_budget=1.0):
+        self.recognizer = recognizer
+        self.executor = executor
+        self.sample_rate = sample_rate
+        self.window = window
+        self.max_batch = max(1, int(max_batch))
+        self.bucket_ratio = bucket_ratio
+        self.latency_budget = latency_budget
+        self.rtf = 0.1  # 补零后音频的实时率估计，每批推理后更新
+        self._pending = []
+        self._batch_ready = Event()
+        self._flusher = None
+
+    def submit(self, waveform):
+        """提交一条语句，返回 AsyncResult（get() 得到识别文本）"""
+        item = PendingUtterance(waveform, self.sample_rate)
+        self._pending.append(item)
+        if len(self._pending) >= self.max_batch:
+            self._batch_ready.set()
+        if self._flusher is None:
+            self._flusher = gevent.spawn(self._run)
+        return item.result
+
+    def recognize(self, waveform):
+        return self.submit(waveform).get()
+
+    def _run(self):
+        try:
+            while self._pending:
+                # 收集窗口：从最早一条到达起计时，批满时提前发出
+                if len(self._pending) < self.max_batch:
+                    self._batch_ready.wait(timeout=max(0.0, self._pending[0].enqueued + self.window - time.monotonic()))
+                self._batch_ready.clear()
+                batch, self._pending = self._pending, []
+                for bucket in self.buckets(batch):
+                    self._infer(bucket)
+        finally:
+            self._flusher = None
+
+    def buckets(self, batch):
+        """按时长分桶，最早到达的语句所在的桶先推理"""
+        now = time.monotonic()
+        buckets = []
+        bucket = []
+        for item in sorted(batch, key=lambda item: item.duration):
+            if bucket and not self._fits(bucket, item, now):
+                buckets.append(bucket)
+                bucket = []
+            bucket.append(item)
+        if bucket:
+            buckets.append(bucket)
+        buckets.sort(key=lambda bucket: min(item.enqueued for item in bucket))
+        return buckets
+
+    def _fits(self, bucket, item, now):
+        if len(bucket) >= self.max_batch:
+            return False
+        if item.duration > bucket[0].duration * self.bucket_ratio:
+            return False
+        # 按最长一条补零后的计算量估算耗时
+        waited = now - min(min(other.enqueued for other in bucket), item.enqueued)
+        if waited > self.latency_budget:
+            # 已超预算：不再按等待时间限制批大小，只受 max_batch 和时长比约束
+            return True
+        estimated = (len(bucket) + 1) * item.duration * self.rtf
+        return waited + estimated <= self.latency_budget
+
+    def _infer(self, bucket):
+        start = time.monotonic()
+        try:
+            texts = self.executor.submit(self.recognizer.recognize_batch, [item.waveform for item in bucket]).result()
+        except Exception as e:
+            if len(bucket) == 1:
+                bucket[0].result.set_exception(e)
+                return
+            # 整批失败：逐条重试，避免一条异常语句拖累同批其他车辆
+            print(f"批量语音识别失败，逐条重试: {e}")
+            metrics.inc('asr_batch_failures_total')
+            for item in bucket:
+                self._infer([item])
+            return
+        end = time.monotonic()
+        padded = len(bucket) * max(item.duration for item in bucket)
+        if padded > 0:
+            self.rtf = 0.8 * self.rtf + 0.2 * (end - start) / padded
+        metrics.inc('asr_batches_total')
+        metrics.inc('asr_batched_utterances_total', len(bucket))
+        for item, text in zip(bucket, texts):
+            metrics.observe('asr_queue_wait', start - item.enqueued)
+            metrics.observe('asr', end - item.enqueued)
+            item.result.set(text)
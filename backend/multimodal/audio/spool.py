@@ -0,0 +1,57 @@
+import itertools
+import os
+import time
+import wave
+from collections import deque
+from gevent import monkey
+from ...utils.metrics import metrics
+
+# 识别在推理线程池的原生线程中进行，写盘线程和唤醒信号使用未被 gevent 替换的原语
+_start_new_thread = monkey.get_original('_thread', 'start_new_thread')
+_allocate_lock = monkey.get_original('_thread', 'allocate_lock')
+
+
+class AudioSpooler:
+    """
+    调试用音频落盘（异步）
+
+    - 识别路径只把 PCM 放入队列，由后台线程写 WAV，不阻塞语音命令
+    - 文件名带毫秒时间戳和序号，同一用户并发请求不会互相覆盖
+    - 积压超过 max_pending 时丢弃新数据（调试数据不影响服务）
+    """
+    def __init__(self, directory, max_pending=32, sample_rate=16000):
+        self.directory = directory
+        self.max_pending = max_pending
+        self.sample_rate = sample_rate
+        self._pending = deque()
+        self._seq = itertools.count()
+        self._wakeup = _allocate_lock()
+        self._wakeup.acquire()
+        os.makedirs(directory, exist_ok=True)
+        _start_new_thread(self._run, ())
+
+    def submit(self, pcm_bytes, user_id):
+        """提交一段 int16 PCM（单声道），立即返回"""
+        if len(self._pending) >= self.max_pending:
+            metrics.inc('audio_spool_dropped_total')
+            return
+        filename = f'{user_id}_{int(time.time() * 1000)}_{next(self._seq)}.wav'
+        self._pending.append((os.path.join(self.directory, filename), bytes(pcm_bytes)))
+        try:
+            self._wakeup.release()
+        except RuntimeError:
+            pass  # 写盘线程已被唤醒
+
+    def _run(self):
+        while True:
+            self._wakeup.acquire()
+            while self._pending:
+                path, pcm_bytes = self._pending.popleft()
+                try:
+                    with wave.open(path, 'wb') as wf:
+                        wf.setnchannels(1)  # 单声道
+                        wf.setsampwidth(2)  # 16 位
+                        wf.setframerate(self.sample_rate)
+                        wf.writeframes(pcm_bytes)
+                except Exception as e:
+                    print(f"调试音频写入失败: {path}: {e}")
@@ -0,0 +1,124 @@
+import numpy as np
+from ...utils.metrics import metrics
+
+
+class UtteranceAssembler:
+    """
+    会话级语句拼接与端点检测
+
+    - 客户端音频按任意长度分段到达，按语音门限的逐帧判定跨段拼接
+    - 语音开始时带上之前 preroll 秒的音频（避免切掉首字的起音）
+    - 语音之后连续静音达到 hangover 秒视为语句结束，输出一整句送入识别
+    - 分段比 hangover 长时（客户端约 4.8 秒一段），等待剩余静音意味着把命令延后一整帧：
+      分段末尾的静音已达到 chunk_end_hangover 秒即在本段结束语句；紧急模式（flush）下分段末尾总是结束语句
+    - 超过 max_seconds 时强制切分；语音总时长不足 min_speech 秒的片段（咳嗽、碰撞声）丢弃
+    """
+    def __init__(self, sample_rate=16000, hop_length=160, hangover=0.6, preroll=0.3, max_seconds=15.0,
+                 min_speech=0.3, chunk_end_hangover=0.2):
+        self.sample_rate = sample_rate
+        self.hop_length = hop_length
+        self.hangover_frames = int(hangover * sample_rate / hop_length)
+        # 至少一帧静音，语音一直持续到分段末尾时（说到一半）不切分
+        self.chunk_end_hangover_frames = max(1, int(chunk_end_hangover * sample_rate / hop_length))
+        self.preroll_samples = int(preroll * sample_rate)
+        self.min_speech_frames = int(min_speech * sample_rate / hop_length)
+        self._buffer = np.zeros(int(max_seconds * sample_rate), dtype=np.int16)  # 当前语句
+        self._length = 0
+        self._preroll = np.zeros(0, dtype=np.int16)  # 语句开始前的最近音频
+        self.active = False  # 是否处于语句中
+        self._silence_frames = 0  # 语句中最后一个语音帧之后的静音帧数
+        self._speech_frames = 0  # 语句中的语音帧数
+
+    def push(self, pcm, speech_mask, flush=False):
+        """
+        追加一段 int16 PCM 及其逐帧语音判定，返回本段内结束的完整语句列表
+
+        第 i 帧覆盖 [i * hop_length, (i + 1) * hop_length) 的样本，末帧之后的剩余样本沿用末帧判定；
+        flush 为 True 时分段末尾未结束的语句也一并输出
+        """
+        utterances = []
+        if not len(pcm):
+            return utterances
+        hop = self.hop_length
+        if not len(speech_mask):
+            speech_mask = np.zeros(1, dtype=bool)
+        # 连续相同判定的区间（按帧）
+        edges = np.flatnonzero(np.diff(speech_mask)) + 1
+        starts = np.concatenate(([0], edges))
+        ends = np.concatenate((edges, [len(speech_mask)]))
+        for start, end in zip(starts.tolist(), ends.tolist()):
+            sample_start = start * hop
+            sample_end = len(pcm) if end == len(speech_mask) else end * hop
+            samples = pcm[sample_start:sample_end]
+            if speech_mask[start]:
+                if not self.active:
+                    self._begin()
+                self._silence_frames = 0
+                self._speech_frames += end - start
+                self._append(samples, utterances, speech=True)
+            elif self.active:
+                remaining = self.hangover_frames - self._silence_frames
+                if end - start < remaining:
+                    self._silence_frames += end - start
+                    self._append(samples, utterances)
+                else:
+                    # 静音达到 hangover：语句在此结束，其余静音作为下一句的 preroll
+                    split = remaining * hop
+                    self._append(samples[:split], utterances)
+                    self._finish(utterances)
+                    self._keep_preroll(samples[split:])
+            else:
+                self._keep_preroll(samples)
+        if self.active and (flush or (len(pcm) > self.hangover_frames * hop
+                                      and self._silence_frames >= self.chunk_end_hangover_frames)):
+            metrics.inc('utterance_chunk_end_flushes_total')
+            self._finish(utterances)
+        return utterances
+
+    def _begin(self):
+        self.active = True
+        self._length = 0
+        self._silence_frames = 0
+        self._speech_frames = 0
+        self._write(self._preroll)
+        self._preroll = self._preroll[:0]
+
+    def _append(self, samples, utterances, speech=False):
+        while len(samples):
+            written = self._write(samples)
+            samples = samples[written:]
+            if len(samples):
+                # 缓冲区已满：强制切分，剩余音频作为下一句继续
+                metrics.inc('utterance_forced_splits_total')
+                self._finish(utterances, forced=True)
+                self.active = True
+                if speech:
+                    self._speech_frames = len(samples) // self.hop_length
+
+    def _write(self, samples):
+        count = min(len(samples), len(self._buffer) - self._length)
+        self._buffer[self._length:self._length + count] = samples[:count]
+        self._length += count
+        return count
+
+    def _finish(self, utterances, forced=False):
+        if forced or self._speech_frames >= self.min_speech_frames:
+            utterances.append(self._buffer[:self._length].copy())
+            metrics.inc('utterances_total')
+        else:
+            metrics.inc('utterances_discarded_total')
+        self.active = False
+        self._length = 0
+        self._silence_frames = 0
+        self._speech_frames = 0
+
+    def _keep_preroll(self, samples):
+        if self.preroll_samples:
+            self._preroll = np.concatenate((self._preroll, samples[-self.preroll_samples:]))[-self.preroll_samples:]
+
+    def reset(self):
+        self.active = False
+        self._length = 0
+        self._silence_frames = 0
+        self._speech_frames = 0
+        self._preroll = self._preroll[:0]
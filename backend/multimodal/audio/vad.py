@@ -0,0 +1,83 @@
+import math
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+
+
+def normalize_audio(audio_array):
+    """将音频数组归一化到 [-1, 1] 范围（float32）"""
+    if audio_array.dtype == np.uint8:
+        return (audio_array.astype(np.float32) - 128) / 128.0
+    if audio_array.dtype == np.int16:
+        return audio_array.astype(np.float32) / 32768.0
+    if audio_array.dtype == np.int32:
+        return audio_array.astype(np.float32) / 2147483648.0
+    return audio_array.astype(np.float32, copy=False)
+
+
+def frame_energies(audio_norm, frame_length, hop_length):
+    """短时能量（每帧均方值）：滑动窗口视图按帧移取帧，不复制数据"""
+    if len(audio_norm) <= frame_length:
+        return np.zeros(0, dtype=np.float32)
+    # 帧起点为 range(0, len - frame_length, hop_length)
+    frames = sliding_window_view(audio_norm, frame_length)[:len(audio_norm) - frame_length:hop_length]
+    return np.einsum('ij,ij->i', frames, frames) / frame_length
+
+
+def longest_run(mask):
+    """布尔序列中最长连续 True 的长度"""
+    edges = np.flatnonzero(np.diff(np.concatenate(([False], mask, [False]))))
+    if not edges.size:
+        return 0
+    return int((edges[1::2] - edges[::2]).max())
+
+
+def classify_frames(is_speech_frame, hop_length, sample_rate, min_length):
+    """由逐帧语音判定得到 (是否包含语音, 语音部分比例)"""
+    speech_ratio = np.count_nonzero(is_speech_frame) / len(is_speech_frame)
+    # 最长连续语音片段（秒）
+    max_speech_length_sec = longest_run(is_speech_frame) * hop_length / sample_rate
+    # 判断是否包含有意义的语音
+    has_speech = bool(max_speech_length_sec >= min_length and speech_ratio > 0.1)
+    return has_speech, speech_ratio
+
+
+class SpeechGate:
+    """
+    会话级语音门限（ASR 之前过滤静音和发动机等稳态噪声）
+
+    - 每段音频取帧能量的低分位数作为该段的噪声估计，语音间隙即可提供噪声样本
+    - 噪声底下降时立即跟随，上升时按时间常数缓慢跟随（连续说话不会把噪声底抬高）
+    - 帧能量高于 噪声底 + snr_db 且高于绝对下限的帧记为语音
+    - 初始噪声底为绝对下限，适应完成前宁可放行也不漏掉语音
+    """
+    NOISE_PERCENTILE = 10
+
+    def __init__(self, sample_rate=16000, snr_db=8.0, min_dbfs=-50.0, adapt_seconds=5.0, min_length=0.3):
+        self.sample_rate = sample_rate
+        self.snr_db = snr_db
+        self.min_dbfs = min_dbfs
+        self.adapt_seconds = adapt_seconds
+        self.min_length = min_length
+        self.frame_length = int(0.02 * sample_rate)
+        self.hop_length = int(0.01 * sample_rate)
+        self.noise_floor_db = min_dbfs  # 噪声底（帧均方值的 dBFS）
+
+    def speech_mask(self, audio_array):
+        """更新噪声底并返回逐帧语音判定（第 i 帧对应从 i * hop_length 开始的样本）"""
+        energies = frame_energies(normalize_audio(audio_array), self.frame_length, self.hop_length)
+        if not energies.size:
+            return np.zeros(0, dtype=bool)
+        noise_db = 10 * math.log10(float(np.percentile(energies, self.NOISE_PERCENTILE)) + 1e-12)
+        if noise_db < self.noise_floor_db:
+            self.noise_floor_db = max(noise_db, self.min_dbfs)
+        else:
+            alpha = 1 - math.exp(-len(audio_array) / self.sample_rate / self.adapt_seconds)
+            self.noise_floor_db += alpha * (noise_db - self.noise_floor_db)
+        return energies > 10 ** ((self.noise_floor_db + self.snr_db) / 10)
+
+    def update(self, audio_array):
+        """更新噪声底并判断本段是否包含语音，返回 (是否包含语音, 语音部分比例)"""
+        mask = self.speech_mask(audio_array)
+        if not mask.size:
+            return False, 0
+        return classify_frames(mask, self.hop_length, self.sample_rate, self.min_length)
@@ -0,0 +1,87 @@
+import time
+from collections import deque
+from concurrent.futures import TimeoutError as FutureTimeoutError
+import numpy as np
+from ...utils.metrics import metrics
+
+
+class WakeWordSpotter:
+    """
+    会话级流式唤醒词检测
+
+    - Porcupine 按 frame_length 逐帧处理，不足一帧的尾部样本留在缓冲区与下一段音频拼接，
+      跨两段音频的唤醒词不会因为尾部被丢弃而漏检
+    - 检测在独立的执行线程中进行，提交音频后立即返回，与其他阶段并行
+    - 检测到唤醒词时记录事件，会话汇总结果前有界等待本段检测完成再取出，唤醒词随本段音频返回
+    """
+    def __init__(self, porcupine, executor):
+        self.porcupine = porcupine
+        self.executor = executor
+        self.frame_length = porcupine.frame_length
+        self._carry = np.zeros(self.frame_length, dtype=np.int16)  # 上一段音频剩余的样本
+        self._carry_len = 0
+        self._events = deque()  # 唤醒事件（检测时刻）
+        self._future = None  # 最近一次提交的检测任务
+
+    def feed(self, pcm):
+        """提交一段 int16 PCM，立即返回（同一会话的音频按提交顺序处理）"""
+        if len(pcm):
+            self._future = self.executor.submit(self._process, pcm)
+
+    def wait(self, timeout=None):
+        """等待最近提交的检测完成（最多 timeout 秒），超时返回 False，事件留到下一帧取出"""
+        future = self._future
+        if future is None:
+            return True
+        try:
+            future.result(timeout=timeout)
+        except FutureTimeoutError:
+            metrics.inc('wake_word_wait_timeouts_total')
+            return False
+        return True
+
+    def poll(self):
+        """取出已检测到的唤醒事件，有事件返回 True"""
+        if not self._events:
+            return False
+        self._events.clear()
+        return True
+
+    def _process(self, pcm):
+        """执行线程中运行：拼接上次剩余样本后逐帧检测，保留新的尾部样本"""
+        try:
+            with metrics.timer('wake_word'):
+                self._spot(pcm)
+        except Exception as e:
+            print(f"唤醒词检测失败: {e}")
+
+    def _spot(self, pcm):
+        frame_length = self.frame_length
+        carry = self._carry
+        offset = 0
+        if self._carry_len:
+            offset = min(frame_length - self._carry_len, len(pcm))
+            carry[self._carry_len:self._carry_len + offset] = pcm[:offset]
+            self._carry_len += offset
+            if self._carry_len < frame_length:
+                return
+            self._detect(carry)
+        end = offset + (len(pcm) - offset) // frame_length * frame_length
+        for start in range(offset, end, frame_length):
+            self._detect(pcm[start:start + frame_length])
+        self._carry_len = len(pcm) - end
+        carry[:self._carry_len] = pcm[end:]
+
+    def _detect(self, frame):
+        if self.porcupine.process(frame) >= 0:
+            print("检测到唤醒词!!!")
+            metrics.inc('wake_word_detected_total')
+            self._events.append(time.monotonic())
+
+    def close(self):
+        """会话回收：等待进行中的检测结束（Porcupine 实例随后归还池中）"""
+        if self._future is not None:
+            self._future.result()
+            self._future = None
+        self._carry_len = 0
+        self._events.clear()
@@ -0,0 +1,86 @@
+import struct
+
+# 二进制多模态帧格式（小端序）
+# | magic(2) | version(1) | type(1) | flags(1) | reserved(1) | wake_word_len(2) |
+# | user_id(4) | timestamp(8) | capture_ts(8) | image_len(4) | audio_len(4) |
+# | wake_word(utf-8) | image(JPEG) | audio(PCM int16, 16kHz, mono) |
+FRAME_MAGIC = b'MM'
+FRAME_VERSION = 1
+HEADER_FORMAT = '<2sBBBBHIQQII'
+HEADER_SIZE = struct.calcsize(HEADER_FORMAT)
+
+# 消息类型
+FRAME_TYPE_COMMAND = 1
+FRAME_TYPE_HEARTBEAT = 2
+FRAME_TYPES = {
+    FRAME_TYPE_COMMAND: 'command',
+    FRAME_TYPE_HEARTBEAT: 'heartbeat'
+}
+
+# 标志位
+FLAG_EMERGENCY = 0x01
+FLAG_WAKE = 0x02
+
+
+def is_binary_frame(message):
+    """判断消息是否为二进制帧"""
+    return isinstance(message, (bytes, bytearray, memoryview))
+
+
+def parse_binary_frame(message):
+    """
+    解析二进制多模态帧，返回与JSON协议字段一致的消息字典
+
+    图像和音频以 memoryview 切片返回，不复制负载数据
+    """
+    view = memoryview(message)
+    if len(view) < HEADER_SIZE:
+        raise ValueError('二进制帧长度不足')
+
+    (magic, version, frame_type, flags, _, wake_word_len, user_id,
+     timestamp, capture_ts, image_len, audio_len) = struct.unpack_from(HEADER_FORMAT, view)
+
+    if magic != FRAME_MAGIC:
+        raise ValueError('二进制帧标识错误')
+    if version != FRAME_VERSION:
+        raise ValueError(f'不支持的二进制帧版本: {version}')
+    if frame_type not in FRAME_TYPES:
+        raise ValueError(f'未知的二进制帧类型: {frame_type}')
+    if HEADER_SIZE + wake_word_len + image_len + audio_len != len(view):
+        raise ValueError('二进制帧长度与头部不一致')
+    if audio_len % 2:
+        raise ValueError('音频数据长度必须为int16对齐')
+
+    offset = HEADER_SIZE
+    wake_word = bytes(view[offset:offset + wake_word_len]).decode('utf-8')
+    offset += wake_word_len
+    image_bytes = view[offset:offset + image_len]
+    offset += image_len
+    audio_bytes = view[offset:offset + audio_len]
+
+    data = {
+        'type': FRAME_TYPES[frame_type],
+        'user_id': user_id,
+        'is_emergency': bool(flags & FLAG_EMERGENCY),
+        'is_wake': bool(flags & FLAG_WAKE),
+        'timestamp': timestamp,
+        'capture_ts': capture_ts,
+        'image_bytes': image_bytes,
+        'audio_bytes': audio_bytes
+    }
+    if wake_word:
+        data['wake_word'] = wake_word
+    return data
+
+
+def build_binary_frame(frame_type, user_id, image_bytes=b'', audio_bytes=b'', wake_word='',
+                       is_emergency=False, is_wake=False, timestamp=0, capture_ts=0):
+    """构建二进制多模态帧（供 Python 客户端和调试使用）"""
+    wake_word_bytes = wake_word.encode('utf-8')
+    flags = (FLAG_EMERGENCY if is_emergency else 0) | (FLAG_WAKE if is_wake else 0)
+    header = struct.pack(
+        HEADER_FORMAT, FRAME_MAGIC, FRAME_VERSION, frame_type, flags, 0,
+        len(wake_word_bytes), int(user_id or 0), int(timestamp), int(capture_ts),
+        len(image_bytes), len(audio_bytes)
+    )
+    return b''.join([header, wake_word_bytes, bytes(image_bytes), bytes(audio_bytes)])
@@ -0,0 +1,49 @@
+import time
+from collections import defaultdict
+import gevent
+from gevent.event import AsyncResult
+
+
+class DebugFrameChannel:
+    """
+    调试画面通道
+
+    服务端默认只做分析、不绘制帧；只有订阅者请求某辆车的画面时，
+    才在到达采样间隔的下一帧上绘制标注并编码为JPEG，推送给所有等待中的订阅者。
+    """
+    def __init__(self, min_interval=1.0):
+        self.min_interval = min_interval
+        self._waiters = defaultdict(list)  # user_id -> [AsyncResult]
+        self._last_render = {}
+
+    def should_render(self, user_id):
+        """当前帧是否需要绘制调试画面（有订阅者且到达采样时刻）"""
+        key = str(user_id)
+        if not self._waiters.get(key):
+            return False
+        now = time.monotonic()
+        if now - self._last_render.get(key, 0.0) < self.min_interval:
+            return False
+        self._last_render[key] = now
+        return True
+
+    def publish(self, user_id, jpeg):
+        """推送绘制好的画面给所有等待中的订阅者"""
+        for waiter in self._waiters.pop(str(user_id), []):
+            waiter.set(jpeg)
+
+    def wait_frame(self, user_id, timeout=5.0):
+        """等待下一帧调试画面，超时返回 None"""
+        key = str(user_id)
+        waiter = AsyncResult()
+        self._waiters[key].append(waiter)
+        try:
+            return waiter.get(timeout=timeout)
+        except gevent.Timeout:
+            return None
+        finally:
+            waiters = self._waiters.get(key)
+            if waiters and waiter in waiters:
+                waiters.remove(waiter)
+                if not waiters:
+                    del self._waiters[key]
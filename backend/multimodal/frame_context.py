@@ -0,0 +1,73 @@
+import time
+import cv2
+import mediapipe as mp
+from gevent import monkey
+
+# 各阶段在真实OS线程中并发读取同一上下文，使用未被 gevent 替换的原生可重入锁
+# （mp.Image 依赖缩小图，缩小图依赖 RGB，计算时会嵌套获取）
+_RLock = monkey.get_original('_thread', 'RLock')
+
+
+class FrameContext:
+    """
+    单帧预处理上下文
+
+    解码后创建一次，手势、面部网格、视线三个检测器共享；RGB、灰度、缩小图和 mp.Image
+    在首次使用时计算并缓存，同一帧不再重复做整帧颜色转换。
+    timestamp_ms 为客户端采集时间（毫秒），未提供时使用本地单调时钟。
+    """
+    def __init__(self, bgr, timestamp_ms=None):
+        self.bgr = bgr
+        self.timestamp_ms = int(timestamp_ms) if timestamp_ms else int(time.monotonic() * 1000)
+        self.height, self.width = bgr.shape[:2]
+        self._cache = {}
+        self._lock = _RLock()
+
+    @property
+    def shape(self):
+        return self.bgr.shape
+
+    def _get(self, key, compute):
+        value = self._cache.get(key)
+        if value is None:
+            with self._lock:
+                value = self._cache.get(key)
+                if value is None:
+                    value = compute()
+                    self._cache[key] = value
+        return value
+
+    @property
+    def rgb(self):
+        return self._get('rgb', lambda: cv2.cvtColor(self.bgr, cv2.COLOR_BGR2RGB))
+
+    @property
+    def gray(self):
+        return self._get('gray', lambda: cv2.cvtColor(self.bgr, cv2.COLOR_BGR2GRAY))
+
+    def gray_roi(self, y1, y2, x1, x2):
+        """灰度子区域：整帧灰度已缓存时直接切片，否则只转换该区域"""
+        gray = self._cache.get('gray')
+        if gray is not None:
+            return gray[y1:y2, x1:x2]
+        return cv2.cvtColor(self.bgr[y1:y2, x1:x2], cv2.COLOR_BGR2GRAY)
+
+    def _scale(self, max_side):
+        if not max_side:
+            return 1.0
+        return min(1.0, max_side / max(self.height, self.width))
+
+    def rgb_downscaled(self, max_side):
+        """长边不超过 max_side 的 RGB 图（本身不超过时直接返回 RGB 原图）"""
+        scale = self._scale(max_side)
+        if scale >= 1.0:
+            return self.rgb
+        size = (max(1, int(self.width * scale)), max(1, int(self.height * scale)))
+        return self._get(('rgb', size), lambda: cv2.resize(self.rgb, size, interpolation=cv2.INTER_AREA))
+
+    def mp_image(self, max_side=None):
+        """MediaPipe 输入图像（SRGB）"""
+        scale = self._scale(max_side)
+        key = ('mp_image', scale)
+        return self._get(key, lambda: mp.Image(image_format=mp.ImageFormat.SRGB,
+                                               data=self.rgb_downscaled(max_side)))
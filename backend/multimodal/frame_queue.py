@@ -0,0 +1,77 @@
+import base64
+import time
+from gevent.event import Event
+from ..utils.metrics import metrics
+
+
+def _raw_audio(data):
+    """取出消息中的原始PCM字节（二进制帧直接返回，JSON帧解码Base64）"""
+    audio_bytes = data.get('audio_bytes')
+    if audio_bytes is not None:
+        return audio_bytes
+    base64_audio = data.get('audio')
+    if base64_audio:
+        return base64.b64decode(base64_audio)
+    return b''
+
+
+class LatestFrameQueue:
+    """
+    单连接的最新帧队列（latest-frame-wins）
+
+    接收协程只负责 put，推理协程每次 get 到的总是最新的一帧；
+    推理期间被覆盖的帧计入 dropped，但其音频会拼接到下一帧之前，语音不会丢失。
+    """
+    def __init__(self):
+        self._frame = None
+        self._frame_at = 0.0  # 当前待处理帧的入队时间
+        self._carry_audio = None  # 被丢弃帧累积的音频
+        self._event = Event()
+        self.closed = False
+        self.received = 0
+        self.dropped = 0
+        self.processed = 0
+
+    def put(self, data):
+        """放入新帧，覆盖尚未处理的旧帧"""
+        if self.closed:
+            return
+        self.received += 1
+        metrics.inc('frames_received_total')
+        if self._frame is not None:
+            self.dropped += 1
+            metrics.inc('frames_dropped_total')
+            if self._carry_audio is None:
+                self._carry_audio = bytearray()
+            self._carry_audio += _raw_audio(self._frame)
+        self._frame = data
+        self._frame_at = time.perf_counter()
+        self._event.set()
+
+    def get(self):
+        """阻塞等待并取出最新帧，队列关闭后返回 None"""
+        while self._frame is None and not self.closed:
+            self._event.clear()
+            self._event.wait()
+        if self.closed:
+            return None
+
+        data, self._frame = self._frame, None
+        metrics.observe('frame_queue_wait', time.perf_counter() - self._frame_at)
+        if self._carry_audio:
+            # 拼接期间到达的音频片段，统一改为原始PCM形式
+            self._carry_audio += _raw_audio(data)
+            data['audio_bytes'] = self._carry_audio
+            data.pop('audio', None)
+        self._carry_audio = None
+        self.processed += 1
+        metrics.inc('frames_processed_total')
+        return data
+
+    @property
+    def pending(self):
+        return 0 if self._frame is None else 1
+
+    def close(self):
+        self.closed = True
+        self._event.set()
@@ -7,6 +7,8 @@ from mediapipe.tasks import python
 from mediapipe.tasks.python import vision
 from mediapipe.framework.formats import landmark_pb2
 from PIL import Image, ImageDraw, ImageFont
+from ..frame_context import FrameContext
+from ..time_window import TimeWindowBuffer
 
 # 手势识别参数
 DEVICE_ID = 0
@@ -19,13 +21,45 @@ DYNAMIC_GESTURE_WINDOW = 1.0  # 动态手势时间窗口（秒）
 SHAKE_WINDOW = 0.6  # 摇手时间窗口（秒）
 SHAKE_THRESHOLD = 0.08  # 每次左右位移的最小x轴差值（归一化）
 SHAKE_COUNT_REQUIRED = 2  # 至少需要多少次左右位移才算作一次有效的摇手
+SHAKE_HISTORY_CAPACITY = 64  # 摇手窗口内最多保留的样本数（远高于实际帧率）
+# 动态手势转换：当前手势 -> ((之前的手势, 动态手势), ...)
+GESTURE_TRANSITIONS = {
+    "Victory": (("Closed_Fist", "Closed_Fist_To_Victory"),),
+    "Closed_Fist": (("Victory", "Victory_To_Closed_Fist"), ("Open_Palm", "Open_Palm_To_Closed_Fist")),
+    "Open_Palm": (("Closed_Fist", "Closed_Fist_To_Open_Palm"),)
+}
+
+def create_gesture_recognizer(video_mode=False):
+    """
+    加载手势识别模型
+
+    IMAGE 模式下无帧间状态，可在多个会话间共享；
+    VIDEO 模式下跟踪上一帧的手部区域，跳过逐帧的手掌检测，每个会话需要独立实例
+    """
+    current_dir = os.path.dirname(os.path.abspath(__file__))
+    model_path = os.path.join(current_dir, './model', 'gesture_recognizer.task')
+    base_options = python.BaseOptions(model_asset_path=model_path)
+    running_mode = vision.RunningMode.VIDEO if video_mode else vision.RunningMode.IMAGE
+    options = vision.GestureRecognizerOptions(base_options=base_options, running_mode=running_mode)
+    return vision.GestureRecognizer.create_from_options(options)
 
 class GestureRecognition():
-    def __init__(self, capture=None, user_id=None):
-        self.init_video()
-        self.init_mediapipe_hands_detector()
+    def __init__(self, capture=None, user_id=None, recognizer=None, annotate=True, input_max_side=None,
+                 graph_lease=None):
+        if recognizer is None:
+            self.init_video()
+            self.init_mediapipe_hands_detector()
+        else:
+            # 使用共享识别器时帧由服务端传入，无需打开本地摄像头
+            self.capture = capture
+            self.gesture_recognizer = recognizer
+        # VIDEO 模式识别器的租用（提供该实例上严格递增的时间戳），为 None 时按 IMAGE 模式识别
+        self.graph_lease = graph_lease
         self.prev_time = time.time()
-        self.gesture_history = []  # 存储静态手势和时间戳
+        # 是否在帧上绘制手部关键点（服务端为纯分析模式，不绘制）
+        self.annotate = annotate
+        # 识别输入的最大边长（关键点为归一化坐标，缩小输入不影响后续判定）
+        self.input_max_side = input_max_side
         self.gesture_map = {
             "Closed_Fist": "播放/暂停音乐",
             "Open_Palm": "挂断电话",
@@ -47,12 +81,15 @@ class GestureRecognition():
 
         # 动态过渡的手势历史记录（保留时间稍长于窗口以捕捉边界跨越）
         self.gesture_history_duration = DYNAMIC_GESTURE_WINDOW + 0.5  # 增加0.5秒的冗余
-        self.gesture_history = []  # 存储手势和时间戳
+        # 每种手势最近一次出现的时间（转换只与各手势最近一次出现有关，无需保存完整历史）
+        self.gesture_last_seen = {}
+        self.latest_gesture = None  # 最近一次检测到的手势
+        self.latest_gesture_time = None
         self.gesture_start_time = None  # 手势开始时间戳
         self.last_displayed_gesture = None  # 上一次显示的手势
         self.potential_landmark_gesture = None  # 当前正在跟踪的手势
         self.potential_landmark_gesture_start_time = None  # 跟踪开始时间戳
-        self.shake_history = []  # 记录最近手腕的x位置和时间
+        self.shake_history = TimeWindowBuffer(SHAKE_HISTORY_CAPACITY, SHAKE_WINDOW)  # 最近手腕的x位置
 
     def init_video(self):
         self.capture = cv2.VideoCapture(DEVICE_ID)
@@ -61,21 +98,24 @@ class GestureRecognition():
         self.capture.set(cv2.CAP_PROP_FRAME_HEIGHT, FRAME_HEIGHT)
 
     def init_mediapipe_hands_detector(self):
-        current_dir = os.path.dirname(os.path.abspath(__file__))
-        model_path = os.path.join(current_dir, './model', 'gesture_recognizer.task')
-        base_options = python.BaseOptions(model_asset_path=model_path)
-        options = vision.GestureRecognizerOptions(base_options=base_options)
-        self.gesture_recognizer = vision.GestureRecognizer.create_from_options(options)
+        self.gesture_recognizer = create_gesture_recognizer()
 
-    def process_frame(self, frame):
+    def process_frame(self, frame, context=None):
         current_time = time.time()
-        frame_rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-        mp_image = mp.Image(image_format=mp.ImageFormat.SRGB, data=frame_rgb)
-        result = self.gesture_recognizer.recognize(mp_image)
+        # 与面部网格共用同一帧的 RGB 转换结果
+        if context is None:
+            context = FrameContext(frame)
+        mp_image = context.mp_image(self.input_max_side)
+        if self.graph_lease is not None:
+            result = self.gesture_recognizer.recognize_for_video(
+                mp_image, self.graph_lease.timestamp(context.timestamp_ms))
+        else:
+            result = self.gesture_recognizer.recognize(mp_image)
 
         current_raw_gesture = None
         current_raw_score = 0.0
         gesture_recognized_text = "无手势"
+        hand_landmarks = result.hand_landmarks[0] if result.hand_landmarks else None
         
         if result.gestures and result.gestures[0]:
             current_raw_gesture = result.gestures[0][0].category_name
@@ -98,61 +138,44 @@ class GestureRecognition():
             self.potential_static_gesture = None
             self.potential_static_gesture_start_time = None
 
-        # 更新手势历史（仅添加实际检测到的手势）
+        # 更新手势历史（仅记录实际检测到的手势）
         if current_raw_gesture:
-            self.gesture_history.append((current_raw_gesture, current_time))
-
-        # 清除过期的手势记录
-        self.gesture_history = [
-            (g, t) for g, t in self.gesture_history
-            if current_time - t <= self.gesture_history_duration  # 保留稍长于窗口的历史记录
-        ]
-
-        # 检测动态手势转换
-        if self.confirmed_static_gesture is None:
-            # 使用历史记录检查过渡
-            if len(self.gesture_history) >= 2:
-                # 查找在当前时间结束的DYNAMIC_GESTURE_WINDOW内的转换
-                latest_gesture, latest_time = self.gesture_history[-1]
-                for i in range(len(self.gesture_history) - 2, -1, -1):  # 从倒数第二个开始向后遍历
-                    prev_gesture, prev_time = self.gesture_history[i]
-                    time_diff = latest_time - prev_time
-
-                    # 检查转换是否发生在窗口内
-                    if 0 < time_diff <= DYNAMIC_GESTURE_WINDOW:  # 确保时间差为正
-                        # 检查特定的预定义转换
-                        transition_found = False
-                        if prev_gesture == "Closed_Fist" and latest_gesture == "Victory":
-                            dynamic_gesture = "Closed_Fist_To_Victory"
-                            transition_found = True
-                        elif prev_gesture == "Victory" and latest_gesture == "Closed_Fist":
-                            dynamic_gesture = "Victory_To_Closed_Fist"
-                            transition_found = True
-                        elif prev_gesture == "Closed_Fist" and latest_gesture == "Open_Palm":
-                            dynamic_gesture = "Closed_Fist_To_Open_Palm"
-                            transition_found = True
-                        elif prev_gesture == "Open_Palm" and latest_gesture == "Closed_Fist":
-                            dynamic_gesture = "Open_Palm_To_Closed_Fist"
-                            transition_found = True
-
-                        if transition_found:
-                            # print(f"检测到动态转换: {dynamic_gesture}")
-                            # 关键：检测到动态手势后重置历史记录和静态跟踪
-                            self.gesture_history.clear()
-                            self.potential_static_gesture = None
-                            self.potential_static_gesture_start_time = None
-                            break  # 找到转换后停止检查历史记录
-                    elif time_diff > DYNAMIC_GESTURE_WINDOW:
-                        # 优化：如果时间回溯太远，停止检查此历史记录
-                        break
+            self.gesture_last_seen[current_raw_gesture] = current_time
+            self.latest_gesture = current_raw_gesture
+            self.latest_gesture_time = current_time
+
+        # 检测动态手势转换：最近一次手势之前 DYNAMIC_GESTURE_WINDOW 内出现过对应的起始手势
+        # （两者都需在保留时长内，与原先按时间过期的历史记录一致）
+        if self.confirmed_static_gesture is None and self.latest_gesture is not None and \
+                current_time - self.latest_gesture_time <= self.gesture_history_duration:
+            latest_time = self.latest_gesture_time
+            best_prev_time = None
+            for prev_gesture, transition in GESTURE_TRANSITIONS.get(self.latest_gesture, ()):
+                prev_time = self.gesture_last_seen.get(prev_gesture)
+                if prev_time is None or current_time - prev_time > self.gesture_history_duration:
+                    continue
+                # 确保时间差为正；多个候选时取最近的一次
+                if 0 < latest_time - prev_time <= DYNAMIC_GESTURE_WINDOW and \
+                        (best_prev_time is None or prev_time > best_prev_time):
+                    best_prev_time = prev_time
+                    dynamic_gesture = transition
+
+            if dynamic_gesture:
+                # print(f"检测到动态转换: {dynamic_gesture}")
+                # 关键：检测到动态手势后重置历史记录和静态跟踪
+                self.gesture_last_seen.clear()
+                self.latest_gesture = None
+                self.latest_gesture_time = None
+                self.potential_static_gesture = None
+                self.potential_static_gesture_start_time = None
 
         # 仅在无动态转换时检查关键点手势（如拇指、旋转）
         if not dynamic_gesture and result.hand_landmarks:
-            hand_landmarks = result.hand_landmarks[0]  # 获取第一个检测到的手的关键点
             points = [(lm.x, lm.y) for lm in hand_landmarks]  # 转换关键点数据结构
             landmark_gesture = self.classify_gesture(points, current_time)
             # 绘制关键点
-            frame = self.draw_landmarks_on_image(frame, hand_landmarks)
+            if self.annotate:
+                frame = self.draw_landmarks_on_image(frame, hand_landmarks)
 
             # 处理需要稳定时间的关键点静态手势
             if landmark_gesture in ["Thumb_Left", "Thumb_Right"]:
@@ -189,17 +212,11 @@ class GestureRecognition():
 
                 if fingers_open and thumb_open:
                     wrist_x = wrist[0]
-                    self.shake_history.append((wrist_x, current_time))
-
-                    # 保留时间窗口内的数据
-                    self.shake_history = [
-                        (x, t) for x, t in self.shake_history
-                        if current_time - t <= SHAKE_WINDOW
-                    ]
+                    # 追加时自动淘汰时间窗口外的数据
+                    self.shake_history.append(wrist_x, current_time)
 
                     if len(self.shake_history) >= 3:
-                        x_positions = [x for x, _ in self.shake_history]
-                        movement_range = max(x_positions) - min(x_positions)
+                        movement_range = self.shake_history.max() - self.shake_history.min()
 
                         if movement_range >= SHAKE_THRESHOLD * 2:  # 两倍阈值表示至少来回过一次
                             dynamic_gesture = "Shake"
@@ -243,9 +260,23 @@ class GestureRecognition():
         
         return {
             'frame': frame,
-            'text': gesture_recognized_text
+            'text': gesture_recognized_text,
+            'hand_landmarks': hand_landmarks,
+            'hand_box': self.hand_box(hand_landmarks)
         }
 
+    @staticmethod
+    def hand_box(hand_landmarks, margin=0.2):
+        """手部关键点的归一化包围框（未检测到手时返回 None）"""
+        if not hand_landmarks:
+            return None
+        xs = [lm.x for lm in hand_landmarks]
+        ys = [lm.y for lm in hand_landmarks]
+        dx = (max(xs) - min(xs)) * margin
+        dy = (max(ys) - min(ys)) * margin
+        return (max(0.0, min(xs) - dx), max(0.0, min(ys) - dy),
+                min(1.0, max(xs) + dx), min(1.0, max(ys) + dy))
+
     def classify_gesture(self, points, current_time):
         # 调整输入参数处理
         points = np.array(points)
@@ -0,0 +1,97 @@
+class PooledGraph:
+    """池中的一个 MediaPipe 图实例及其已使用过的最大时间戳"""
+    def __init__(self, instance):
+        self.instance = instance
+        self.last_ts = 0
+
+
+class GraphLease:
+    """
+    会话对池中图实例的租用
+
+    VIDEO 模式要求同一实例上的时间戳严格递增；实例在会话间复用时，
+    把客户端采集时间平移到该实例已用时间之后，并保留帧间间隔。
+    """
+    def __init__(self, pool, graph):
+        self.pool = pool
+        self.graph = graph
+        self._offset = None
+
+    @property
+    def instance(self):
+        return self.graph.instance
+
+    def timestamp(self, capture_ts):
+        """客户端采集时间（毫秒）-> 该实例上严格递增的时间戳（毫秒）"""
+        capture_ts = int(capture_ts)
+        if self._offset is None:
+            self._offset = self.graph.last_ts + 1 - capture_ts
+        ts = max(capture_ts + self._offset, self.graph.last_ts + 1)
+        self.graph.last_ts = ts
+        return ts
+
+    def release(self):
+        if self.graph is not None:
+            self.pool._release(self.graph)
+            self.graph = None
+
+
+class GraphPool:
+    """
+    有状态图实例池（每个进程一个）
+
+    VIDEO 模式的手势识别器和跟踪模式的 FaceMesh 在帧间保存跟踪状态，不能在会话间共享；
+    会话创建时租用一个实例，会话回收时归还，新会话复用已加载的实例而不必重新加载模型。
+
+    归还时清除上一会话的状态：提供 reset 的实例就地重置后放回池中；
+    不能重置的实例（MediaPipe Tasks 图、Porcupine）用 dispose 释放后丢弃，下一个会话创建新实例，
+    不会继承上一辆车的跟踪状态和时间戳序列。
+    """
+    def __init__(self, factory, reset=None, dispose=None):
+        self.factory = factory
+        self.reset = reset
+        self.dispose = dispose
+        self._idle = []
+        self.created = 0
+        self.discarded = 0
+
+    def acquire(self):
+        if self._idle:
+            graph = self._idle.pop()
+        else:
+            graph = PooledGraph(self.factory())
+            self.created += 1
+        return GraphLease(self, graph)
+
+    def _release(self, graph):
+        if self.reset is not None:
+            try:
+                self.reset(graph.instance)
+            except Exception as e:
+                print(f"图实例重置失败，丢弃该实例: {e}")
+            else:
+                self._idle.append(graph)
+                return
+        self._discard(graph)
+
+    def _discard(self, graph):
+        self.discarded += 1
+        if self.dispose is not None:
+            try:
+                self.dispose(graph.instance)
+            except Exception as e:
+                print(f"图实例释放失败: {e}")
+
+    def warmup(self, warmup_fn):
+        """创建一个实例并预热，之后放回池中供第一个会话使用"""
+        lease = self.acquire()
+        try:
+            warmup_fn(lease)
+        finally:
+            # 预热只处理空白帧，不留下跟踪状态，不经重置直接放回（时间戳由租用平移，仍严格递增）
+            self._idle.append(lease.graph)
+            lease.graph = None
+
+    @property
+    def idle(self):
+        return len(self._idle)
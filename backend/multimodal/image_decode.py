@@ -0,0 +1,85 @@
+import struct
+import cv2
+import numpy as np
+
+# 缩小倍数 -> OpenCV 读取标志（libjpeg-turbo 在 DCT 阶段直接按比例解码，不需要先解出全图）
+REDUCED_DECODE_FLAGS = {
+    1: cv2.IMREAD_COLOR,
+    2: cv2.IMREAD_REDUCED_COLOR_2,
+    4: cv2.IMREAD_REDUCED_COLOR_4,
+    8: cv2.IMREAD_REDUCED_COLOR_8
+}
+
+# 带尺寸信息的 SOF 标记（排除 DHT=C4、JPG=C8、DAC=CC）
+_SOF_MARKERS = {0xC0, 0xC1, 0xC2, 0xC3, 0xC5, 0xC6, 0xC7, 0xC9, 0xCA, 0xCB, 0xCD, 0xCE, 0xCF}
+
+
+def jpeg_size(data):
+    """只解析 JPEG 头部获取 (宽, 高)，非 JPEG 或解析失败返回 None"""
+    view = memoryview(data)
+    n = len(view)
+    if n < 4 or view[0] != 0xFF or view[1] != 0xD8:
+        return None
+    i = 2
+    while i + 9 < n:
+        if view[i] != 0xFF:
+            return None
+        marker = view[i + 1]
+        if marker == 0xFF:  # 填充字节
+            i += 1
+            continue
+        if marker in _SOF_MARKERS:
+            height, width = struct.unpack_from('>HH', view, i + 5)
+            return width, height
+        if marker == 0xD8 or marker == 0x01 or 0xD0 <= marker <= 0xD7:
+            i += 2
+            continue
+        if marker == 0xDA:  # 扫描数据开始前仍未找到 SOF
+            return None
+        i += 2 + struct.unpack_from('>H', view, i + 2)[0]
+    return None
+
+
+class FrameDecoder:
+    """
+    按分析分辨率选择缩小倍数的 JPEG 解码器（每个会话一个）
+
+    - 未跟踪到目标时：按长边不低于 max_side 选择最大的缩小倍数
+    - 跟踪到人脸/手部区域后：保证该区域在解码图中的短边不低于 roi_min_side，
+      目标越大可缩小得越多（FaceMesh / 手势模型输入只有约 192~256 像素）
+    """
+    def __init__(self, max_side=640, roi_min_side=192, min_frame_side=320, max_reduction=8):
+        self.max_side = max_side
+        self.roi_min_side = roi_min_side
+        self.min_frame_side = min_frame_side  # 跟踪模式下整帧长边下限，保证新出现的目标仍能被检测到
+        self.max_reduction = max_reduction
+        self.rois = []  # 上一帧跟踪到的归一化区域 (x1, y1, x2, y2)
+        self.reduction = 1
+
+    def track(self, *boxes):
+        """更新跟踪区域（人脸、手部的归一化包围框），都为空时回到按分析分辨率解码"""
+        self.rois = [box for box in boxes if box is not None]
+
+    def choose_reduction(self, width, height):
+        if not self.max_side:
+            return 1
+        # (边长, 缩小后该边长的下限)：所有约束都满足时才继续缩小
+        long_side = max(width, height)
+        if self.rois:
+            # 各目标中最小的边长决定能缩小多少
+            roi_side = min(min((x2 - x1) * width, (y2 - y1) * height) for x1, y1, x2, y2 in self.rois)
+            limits = ((roi_side, self.roi_min_side), (long_side, self.min_frame_side))
+        else:
+            limits = ((long_side, self.max_side),)
+        reduction = 1
+        while (reduction * 2 <= self.max_reduction and
+               all(side / (reduction * 2) >= limit for side, limit in limits)):
+            reduction *= 2
+        return reduction
+
+    def decode(self, img_bytes):
+        """解码 JPEG 为 BGR 图像（非 JPEG 时按原尺寸解码）"""
+        img_array = np.frombuffer(img_bytes, dtype=np.uint8)
+        size = jpeg_size(img_bytes)
+        self.reduction = self.choose_reduction(*size) if size else 1
+        return cv2.imdecode(img_array, REDUCED_DECODE_FLAGS[self.reduction])
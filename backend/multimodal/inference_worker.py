@@ -0,0 +1,72 @@
+"""
+推理工作进程入口
+
+spawn 启动的子进程以本模块作为主模块（而不是重新执行 backend.app），
+只加载推理需要的模型和会话表，不初始化 Flask、数据库和各路由的模块级状态。
+"""
+import queue
+import threading
+
+
+def recv_or_none(conn):
+    """阻塞读取管道，对端关闭时返回 None"""
+    try:
+        return conn.recv()
+    except (EOFError, OSError):
+        return None
+
+
+def main(request_conn, result_conn, max_sessions, idle_timeout, warmup=False):
+    """
+    推理工作进程主循环
+
+    - 读取线程（原生线程）阻塞读取管道：指标请求直接应答，其余消息按到达顺序放入任务队列
+    - 主线程依次执行任务，推理期间管道读取和指标采集不受影响
+    - 每个进程独立加载模型，并持有分配到本进程的车辆会话（手势/头部姿态/视线时序状态）；
+      单个请求内各阶段仍在共享的执行线程中并行
+    """
+    from .session import SessionManager
+    from ..utils.metrics import metrics
+
+    tasks = queue.Queue()
+    send_lock = threading.Lock()
+
+    def send(message):
+        with send_lock:
+            result_conn.send(message)
+
+    def read_requests():
+        while True:
+            message = recv_or_none(request_conn)
+            if message is None or message[0] == 'stop':
+                tasks.put(None)
+                return
+            if message[0] == 'metrics':
+                # 各进程独立统计，由 Hub 在采集时汇总
+                send((message[1], metrics.snapshot()))
+            else:
+                tasks.put(message)
+
+    threading.Thread(target=read_requests, name='inference-worker-reader', daemon=True).start()
+
+    sessions = SessionManager(max_sessions=max_sessions, idle_timeout=idle_timeout)
+    if warmup:
+        # 先加载并预热模型再处理请求，期间到达的请求在任务队列中排队
+        sessions.warmup()
+
+    while True:
+        message = tasks.get()
+        if message is None:
+            break
+        op = message[0]
+        if op == 'process':
+            request_id, user_id, wake_word, data, is_emergency, is_wake = message[1:]
+            try:
+                result = sessions.process_request(user_id, wake_word, data, is_emergency, is_wake)
+            except Exception as e:
+                result = {'error': str(e)}
+            send((request_id, result))
+        elif op == 'attach':
+            sessions.attach(message[1])
+        elif op == 'detach':
+            sessions.detach(message[1])
@@ -0,0 +1,67 @@
+import time
+from gevent import monkey
+
+# 模型可能在推理线程中首次加载，使用未被 gevent 替换的原生锁
+_RLock = monkey.get_original('_thread', 'RLock')
+
+
+class ModelRegistry:
+    """
+    进程级模型注册表
+
+    - 每个重模型在进程内只加载一次，所有会话共享
+    - 加载失败的模型记为 None，不会每个会话重复尝试
+    - warmup 用合成输入各跑一次推理，避免第一辆车承担冷启动时延
+    """
+    def __init__(self):
+        self._loaders = {}
+        self._warmups = {}
+        self._models = {}
+        self._lock = _RLock()
+        self.warmed_up = False
+
+    def register(self, name, loader, warmup=None):
+        """注册模型加载函数和预热函数（预热函数接收模型实例）"""
+        self._loaders[name] = loader
+        if warmup is not None:
+            self._warmups[name] = warmup
+
+    def get(self, name):
+        """获取模型，首次调用时加载"""
+        if name in self._models:
+            return self._models[name]
+        with self._lock:
+            if name not in self._models:
+                start = time.perf_counter()
+                try:
+                    self._models[name] = self._loaders[name]()
+                    print(f"模型已加载: {name} ({time.perf_counter() - start:.2f}s)")
+                except Exception as e:
+                    print(f"模型加载失败: {name}: {e}")
+                    self._models[name] = None
+            return self._models[name]
+
+    def warmup(self):
+        """加载全部模型并用合成输入预热"""
+        with self._lock:
+            if self.warmed_up:
+                return
+            self.warmed_up = True
+            for name in self._loaders:
+                model = self.get(name)
+                warmup = self._warmups.get(name)
+                if model is None or warmup is None:
+                    continue
+                start = time.perf_counter()
+                try:
+                    warmup(model)
+                    print(f"模型已预热: {name} ({time.perf_counter() - start:.2f}s)")
+                except Exception as e:
+                    print(f"模型预热失败: {name}: {e}")
+
+    def loaded(self):
+        return [name for name, model in self._models.items() if model is not None]
+
+
+# 进程级全局注册表
+model_registry = ModelRegistry()
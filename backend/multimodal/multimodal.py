@@ -1,133 +1,197 @@
 import base64
 import cv2
 import numpy as np
-from .gesture.gesture import GestureRecognition
+from .gesture.gesture import GestureRecognition, create_gesture_recognizer
 from .video.video import VisualRecognition
+from .video.face_detection import FaceDetector
+from .frame_context import FrameContext
+from .image_decode import FrameDecoder
+from .model_registry import model_registry
+from .graph_pool import GraphPool
 from .audio.audio import AudioRecognition
+from .audio.spool import AudioSpooler
+from .audio.wake_word import WakeWordSpotter
+from .audio.vad import SpeechGate
+from .audio.utterance import UtteranceAssembler
+from .audio.batching import ASRBatcher
 import pvporcupine
-import os
-import wave
+from gevent.threadpool import ThreadPoolExecutor
 from ..config import Config
+from ..utils.metrics import metrics
 
-def create_temp_audio(audio_bytes, user_id):
-    """
-    将 Base64 编码的音频数据解码并保存为临时 WAV 文件
-    """
-    if not user_id:
-        raise ValueError("用户ID不能为空")
-    
-    # 构建路径
-    audio_dir = os.path.join(os.path.dirname(__file__), 'audio')
-    temp_audio_dir = os.path.join(audio_dir, 'tempAudio')
-    
-    # 创建目录结构
-    os.makedirs(temp_audio_dir, exist_ok=True)
-
-    # 构建完整文件路径
-    filename = f'temp_audio_{user_id}.wav'
-    temp_wav_path = os.path.join(temp_audio_dir, filename)
-
-    # 保存临时音频文件
-    with wave.open(temp_wav_path, 'wb') as wf:
-        wf.setnchannels(1)  # 单声道
-        wf.setsampwidth(2)  # 16 位
-        wf.setframerate(16000)  # 采样率
-        wf.writeframes(audio_bytes)
-    return temp_wav_path
-
-def detect_speech(audio_array, sample_rate=16000, threshold=0.1, min_length=0.3):
-    """
-    检测音频中是否包含有意义的语音内容
-    
-    参数:
-    audio_array: 音频数据 numpy 数组
-    sample_rate: 采样率 (Hz)
-    threshold: 语音活动阈值 (0.0-1.0)
-    min_length: 最小语音长度 (秒)
-    
-    返回:
-    (bool, float): 是否包含语音, 语音部分比例
-    """
-    # 将音频数组归一化到 [-1, 1] 范围
-    if audio_array.dtype == np.uint8:
-        audio_norm = (audio_array.astype(np.float32) - 128) / 128.0
-    elif audio_array.dtype == np.int16:
-        audio_norm = audio_array.astype(np.float32) / 32768.0
-    elif audio_array.dtype == np.int32:
-        audio_norm = audio_array.astype(np.float32) / 2147483648.0
-    else:
-        audio_norm = audio_array.astype(np.float32)
-    
-    # 计算短时能量来检测语音活动
-    frame_length = int(0.02 * sample_rate)  # 20ms 帧长
-    hop_length = int(0.01 * sample_rate)   # 10ms 帧移
-    
-    # 分帧
-    frames = []
-    for i in range(0, len(audio_norm) - frame_length, hop_length):
-        frames.append(audio_norm[i:i+frame_length])
-    
-    # 计算每帧的能量
-    energies = np.array([np.sum(frame**2) / frame_length for frame in frames])
-    
-    # 归一化能量
-    if energies.max() > 0:
-        energies = energies / energies.max()
-    
-    # 基于能量的语音活动检测
-    is_speech_frame = energies > threshold
-    
-    # 计算语音片段长度
-    speech_frames = 0
-    max_speech_length = 0
-    current_length = 0
-    
-    for frame in is_speech_frame:
-        if frame:
-            current_length += 1
-            speech_frames += 1
+def create_porcupine():
+    """创建唤醒词检测器"""
+    return pvporcupine.create(
+        access_key = Config.PORCUPINE_ACCESS_KEY,
+        keywords=["hey siri"]
+    )
+
+def warmup_gesture_recognizer(recognizer):
+    frame = np.zeros((360, 640, 3), dtype=np.uint8)
+    recognizer.recognize(FrameContext(frame).mp_image())
+
+def warmup_face_detector(face_detector):
+    face_detector.detect_face(np.zeros((360, 640, 3), dtype=np.uint8))
+
+def warmup_gesture_graph(lease):
+    context = FrameContext(np.zeros((360, 640, 3), dtype=np.uint8))
+    lease.instance.recognize_for_video(context.mp_image(), lease.timestamp(context.timestamp_ms))
+
+def warmup_face_graph(lease):
+    warmup_face_detector(lease.instance)
+
+def warmup_audio(audio):
+    # 1秒低幅噪声，走一遍 VAD + SenseVoice 的完整路径
+    noise = (np.random.default_rng(0).standard_normal(16000) * 100).astype(np.int16)
+    audio.recognize_speech(noise)
+    # 不等长的两条走一遍批量推理（补零 + 逐行解码）
+    audio.recognize_batch([noise, noise[:8000]])
+
+def warmup_porcupine(porcupine):
+    porcupine.process(np.zeros(porcupine.frame_length, dtype=np.int16))
+
+# 服务端模式：只加载模型，不打开本地摄像头和麦克风
+if Config.MEDIAPIPE_VIDEO_MODE:
+    # 跟踪模式的图实例带帧间状态，按会话从池中租用；
+    # FaceMesh 归还时重置跟踪状态，VIDEO 模式手势识别器无法重置，归还时关闭、下个会话重新创建
+    model_registry.register('gesture_graphs',
+                            lambda: GraphPool(lambda: create_gesture_recognizer(video_mode=True),
+                                              dispose=lambda recognizer: recognizer.close()),
+                            lambda pool: pool.warmup(warmup_gesture_graph))
+    model_registry.register('face_graphs', lambda: GraphPool(FaceDetector, reset=FaceDetector.reset),
+                            lambda pool: pool.warmup(warmup_face_graph))
+else:
+    model_registry.register('gesture_recognizer', create_gesture_recognizer, warmup_gesture_recognizer)
+    model_registry.register('face_detector', FaceDetector, warmup_face_detector)
+model_registry.register('audio', lambda: AudioRecognition(open_microphone=False), warmup_audio)
+# Porcupine 逐帧流式处理、帧间有状态，每个会话从池中租用独立实例（无法重置，归还时释放、按需重新创建）
+model_registry.register('porcupine_pool',
+                        lambda: GraphPool(create_porcupine, dispose=lambda porcupine: porcupine.delete()),
+                        lambda pool: pool.warmup(lambda lease: warmup_porcupine(lease.instance)))
+
+class SharedModels:
+    """多个会话共享的重模型：手势识别器、面部网格、语音识别、唤醒词检测器（来自进程级模型注册表）"""
+    def __init__(self):
+        self.gesture_recognizer = None
+        self.face_detector = None
+        self.gesture_graphs = None  # 跟踪模式下按会话租用的手势识别器池
+        self.face_graphs = None  # 跟踪模式下按会话租用的面部网格池
+        self.audio = None
+        self.asr_batcher = None  # 跨会话批量语音识别
+        self.porcupine_pool = None  # 唤醒词检测器池（按会话租用）
+        self.audio_spool = None  # 调试用音频异步落盘（AUDIO_DEBUG_SPOOL_DIR 为空时关闭）
+        self.executors = None  # 各处理阶段的执行线程
+        self.initialized = False
+
+    def initialize(self):
+        """加载所有共享模型（只加载一次）"""
+        if self.initialized:
+            return
+        self.initialized = True
+        # 每个阶段一个真实OS线程：阶段之间并行（OpenCV/MediaPipe/onnxruntime 会释放GIL），
+        # 同一阶段内串行，保证共享模型不会被并发调用
+        self.executors = {
+            'gesture': ThreadPoolExecutor(max_workers=1),
+            'video': ThreadPoolExecutor(max_workers=1),
+            'audio': ThreadPoolExecutor(max_workers=1),
+            'wake': ThreadPoolExecutor(max_workers=1),  # 流式唤醒词检测，不阻塞帧处理
+            'asr': ThreadPoolExecutor(max_workers=1)  # 跨会话批量语音识别
+        }
+        if Config.MEDIAPIPE_VIDEO_MODE:
+            self.gesture_graphs = model_registry.get('gesture_graphs')
+            self.face_graphs = model_registry.get('face_graphs')
         else:
-            if current_length > max_speech_length:
-                max_speech_length = current_length
-            current_length = 0
-    
-    # 检查最后一个片段
-    if current_length > max_speech_length:
-        max_speech_length = current_length
-    
-    # 转换为秒
-    max_speech_length_sec = max_speech_length * hop_length / sample_rate
-    speech_ratio = speech_frames / len(is_speech_frame) if len(is_speech_frame) > 0 else 0
-    
-    # 判断是否包含有意义的语音
-    has_speech = max_speech_length_sec >= min_length and speech_ratio > 0.1
-    
-    return has_speech, speech_ratio
+            self.gesture_recognizer = model_registry.get('gesture_recognizer')
+            self.face_detector = model_registry.get('face_detector')
+        self.audio = model_registry.get('audio')
+        if self.audio is not None:
+            self.asr_batcher = ASRBatcher(self.audio, self.executors['asr'],
+                                          window=Config.ASR_BATCH_WINDOW_MS / 1000.0,
+                                          max_batch=Config.ASR_MAX_BATCH,
+                                          bucket_ratio=Config.ASR_BATCH_BUCKET_RATIO,
+                                          latency_budget=Config.ASR_LATENCY_BUDGET)
+        # 初始化唤醒词检测器池
+        self.porcupine_pool = model_registry.get('porcupine_pool')
+        if Config.AUDIO_DEBUG_SPOOL_DIR:
+            self.audio_spool = AudioSpooler(Config.AUDIO_DEBUG_SPOOL_DIR, Config.AUDIO_DEBUG_SPOOL_MAX_PENDING)
+
+    def warmup(self):
+        """启动时加载并预热全部模型"""
+        self.initialize()
+        model_registry.warmup()
 
 class MultimodalProcessor:
-    def __init__(self):
-        self.user_id = None
+    def __init__(self, user_id=None, wake_word=None, shared_models=None):
+        self.user_id = user_id
+        self.shared_models = shared_models or SharedModels()
         self.gesture = None
         self.video = None
         self.audio = None
-        self.porcupine = None  # 唤醒词检测器
+        self.wake_spotter = None  # 会话级流式唤醒词检测
+        self.speech_gate = None  # 会话级语音门限（自适应噪声底）
+        self.utterances = None  # 会话级语句拼接与端点检测
+        self.last_is_wake = False  # 上一帧的唤醒状态，状态切换时丢弃未结束的语句
+        self.graph_leases = []  # 从池中租用的有状态实例（跟踪模式图、唤醒词检测器），会话回收时归还
         self.initialized = False
-        self.wake_word = "hey siri"
+        self.wake_word = wake_word or "hey siri"
+        # 按分析分辨率和跟踪区域选择缩小倍数的解码器（会话内记忆上一帧的人脸/手部区域）
+        self.decoder = FrameDecoder(max_side=Config.ANALYSIS_MAX_SIDE,
+                                    roi_min_side=Config.DECODE_ROI_MIN_SIDE)
     
     def initialize(self):
-        """初始化所有模块"""
+        """初始化所有模块（重模型共享，手势/头部姿态/视线的时序状态按会话独立）"""
         self.initialized = True
-        self.gesture = GestureRecognition(capture=None, user_id=self.user_id)
-        self.video = VisualRecognition(user_id=self.user_id)
-        self.audio = AudioRecognition(user_id=self.user_id)
-        # 初始化唤醒词检测器
-        try:
-            self.porcupine = pvporcupine.create(
-                access_key = Config.PORCUPINE_ACCESS_KEY,
-                keywords=["hey siri"]
-            )
-        except Exception as e:
-            print(f"唤醒词检测器初始化失败: {e}")
+        self.shared_models.initialize()
+        annotate = not Config.MULTIMODAL_HEADLESS
+        recognizer = self.shared_models.gesture_recognizer
+        face_detector = self.shared_models.face_detector
+        gesture_lease = None
+        if self.shared_models.gesture_graphs is not None:
+            gesture_lease = self.shared_models.gesture_graphs.acquire()
+            recognizer = gesture_lease.instance
+            self.graph_leases.append(gesture_lease)
+        if self.shared_models.face_graphs is not None:
+            face_lease = self.shared_models.face_graphs.acquire()
+            face_detector = face_lease.instance
+            self.graph_leases.append(face_lease)
+        self.gesture = GestureRecognition(capture=None, user_id=self.user_id,
+                                          recognizer=recognizer,
+                                          annotate=annotate,
+                                          input_max_side=Config.GESTURE_INPUT_MAX_SIDE,
+                                          graph_lease=gesture_lease)
+        self.video = VisualRecognition(user_id=self.user_id,
+                                       face_detector=face_detector,
+                                       annotate=annotate)
+        self.audio = self.shared_models.audio
+        if Config.ASR_VAD_GATE or Config.ASR_UTTERANCE_ENDPOINTING:
+            self.speech_gate = SpeechGate(snr_db=Config.VAD_SNR_DB, min_dbfs=Config.VAD_MIN_DBFS,
+                                          adapt_seconds=Config.VAD_NOISE_ADAPT_SECONDS)
+        if Config.ASR_UTTERANCE_ENDPOINTING:
+            self.utterances = UtteranceAssembler(hop_length=self.speech_gate.hop_length,
+                                                 hangover=Config.UTTERANCE_HANGOVER_SECONDS,
+                                                 max_seconds=Config.UTTERANCE_MAX_SECONDS,
+                                                 chunk_end_hangover=Config.UTTERANCE_CHUNK_END_HANGOVER_SECONDS)
+        # 唤醒词检测器在池中按需创建，创建失败（访问密钥无效、平台不支持）时本会话不做唤醒词检测
+        if self.shared_models.porcupine_pool is not None:
+            try:
+                porcupine_lease = self.shared_models.porcupine_pool.acquire()
+            except Exception as e:
+                print(f"唤醒词检测器创建失败，跳过唤醒词检测: {e}")
+                # 与模型注册表一致：创建失败后不再为每个会话重复尝试
+                self.shared_models.porcupine_pool = None
+            else:
+                self.graph_leases.append(porcupine_lease)
+                self.wake_spotter = WakeWordSpotter(porcupine_lease.instance,
+                                                    self.shared_models.executors['wake'])
+
+    def close(self):
+        """会话回收：归还租用的图实例"""
+        if self.wake_spotter is not None:
+            self.wake_spotter.close()
+            self.wake_spotter = None
+        for lease in self.graph_leases:
+            lease.release()
+        self.graph_leases = []
     
     def process_request(self, data, is_emergency = False, is_wake = False):
         """处理多模态请求"""
@@ -140,107 +204,176 @@ class MultimodalProcessor:
                 self.wake_word = data.get('wake_word', self.wake_word)
                 self.initialize()
             
-            # 处理图像数据
-            image_data = data.get('image')           
-            if not image_data:
+            # 处理图像数据（二进制帧直接携带原始JPEG）
+            img_bytes = data.get('image_bytes')
+            if img_bytes is None:
+                image_data = data.get('image')
+                if not image_data:
+                    raise ValueError({'error': 'Image data is missing'})
+            elif len(img_bytes) == 0:
                 raise ValueError({'error': 'Image data is missing'})
             
-            # 去除Base64前缀
-            base64_data = image_data.split(',')[1]
-            
             try:
-                # 解码 Base64 字符串为字节流
-                img_bytes = base64.b64decode(base64_data)
-                # 转换为NumPy数组
-                img_array = np.frombuffer(img_bytes, dtype=np.uint8)
-                # 解码为OpenCV图像
-                frame = cv2.imdecode(img_array, cv2.IMREAD_COLOR)
+                with metrics.timer('image_decode'):
+                    if img_bytes is None:
+                        # 去除Base64前缀并解码为字节流
+                        img_bytes = base64.b64decode(image_data.split(',')[1])
+                    # 解码为OpenCV图像（按需缩小解码，memoryview 零拷贝）
+                    frame = self.decoder.decode(img_bytes)
             except Exception as e:
-                print(f"Error decoding base64 image: {e}")
+                print(f"Error decoding image: {e}")
                 raise ValueError({'error': 'Failed to decode image data'})
             
-            # print("处理手势识别")
-            # 处理手势识别
-            gesture_result = self.gesture.process_frame(frame)
-            frame = gesture_result.get('frame')
-            gesture_recognized_text = gesture_result.get('text')
+            # 手势、面部/视线、音频三个阶段相互独立，并发执行后汇合
+            executors = self.shared_models.executors
+            # 纯分析模式下两个阶段只读同一帧；需要绘制时手势阶段使用独立副本，避免与视觉识别产生竞争
+            gesture_frame = frame.copy() if self.gesture.annotate else frame
+            # 解码后创建一次帧上下文，RGB / mp.Image / 灰度等变体在各阶段间共享；
+            # 跟踪模式的图实例按客户端采集时间推进
+            context = FrameContext(frame, data.get('capture_ts'))
+            audio_np = self.decode_audio(data)
+            gesture_future = executors['gesture'].submit(self.process_gesture, gesture_frame, context)
+            video_future = executors['video'].submit(self.process_video, frame, context)
+            # 唤醒词检测在独立线程中流式进行，与音频阶段并行
+            if self.wake_spotter is not None and audio_np is not None:
+                self.wake_spotter.feed(audio_np)
+            audio_future = executors['audio'].submit(self.process_audio, audio_np, is_emergency, is_wake)
+            segments = audio_future.result()
+            woke = self.poll_wake_word(is_emergency)
+            if woke and self.utterances is not None:
+                # 唤醒词所在的语句不再识别，也不能并入唤醒后的第一条命令
+                self.utterances.reset()
+            # 音频阶段只做端点检测（开销小），先取出完整语句交给批量识别，与手势/视觉阶段并行；
+            # 检测到唤醒词时本段返回唤醒词，不再识别
+            speech_results = [] if woke else self.submit_speech(segments)
+
+            gesture_result = gesture_future.result()
+            video_result = video_future.result()
             # print("手势识别结果:", gesture_recognized_text)
-            
-            # print("处理视觉识别")
-            # 处理视觉识别
-            video_result = self.video.process_frame(frame)
-            frame = video_result.get('frame')
-            video_recognized_text = video_result.get('text')
+            gesture_recognized_text = gesture_result.get('text')
             # print("视觉识别结果:", video_recognized_text)
-            
-            # ========================================================================
-            # 处理语音识别
-            base64_audio = data.get('audio')
-
-            if not base64_audio:
-                raise ValueError({'error': 'Audio data is missing'})
-
-            # 语音合成播放时不发送音频数据
-            if base64_audio == "":
-                return {
-                    'gesture': gesture_recognized_text,
-                    'video': video_recognized_text,
-                    'audio': "音频数据为空"
-                }
-            
-            # 解码 Base64 字符串为 PCM(int16, 16kHz, mono)
-            try:
-                audio_bytes = base64.b64decode(base64_audio)
-                # 保存为临时 WAV 文件
-                temp_wav_path = create_temp_audio(audio_bytes, self.user_id)
-                # 转换为NumPy数组
-                audio_np = np.frombuffer(audio_bytes, dtype=np.int16)
-            except Exception as e:
-                print(f"Error decoding base64 audio: {e}")
-                raise ValueError({'error': 'Failed to decode audio data'})
-
-            if is_emergency:
-                print("处理音频识别")
-                print("紧急模式下跳过唤醒词检测和唤醒状态判断")
-                audio_recognized_text = self.audio.recognize_speech(temp_wav_path)
-                return {
-                    'gesture': gesture_recognized_text,
-                    'video': video_recognized_text,
-                    'audio': audio_recognized_text
-                }
-
-            # 检测唤醒词
-            if self.porcupine is not None:
-                frame_length = self.porcupine.frame_length
-                # Porcupine需要每次处理512样本的帧
-                for i in range(0, len(audio_np) - frame_length + 1, frame_length):
-                    frame = audio_np[i:i + frame_length]
-                    keyword_index = self.porcupine.process(frame)
-                    if keyword_index >= 0:
-                        print("检测到唤醒词!!!")
-                        # 如果检测到唤醒词，返回手势识别、视觉识别、唤醒词
-                        return {
-                            'gesture': gesture_recognized_text,
-                            'video': video_recognized_text,
-                            'audio': self.wake_word
-                        }
-
-            print("多模态大模型is_wake:", is_wake)
-            # 如果未检测到唤醒词，且当前是未唤醒状态, 返回手势识别、视觉识别、"音频数据为空"
-            if not is_wake:
-                return {
-                    'gesture': gesture_recognized_text,
-                    'video': video_recognized_text,
-                    'audio': "音频数据为空"
-                }
-            
-            print("处理音频识别")
-            # 处理音频识别
-            audio_recognized_text = self.audio.recognize_speech(temp_wav_path)
-            return {
+            video_recognized_text = video_result.get('text')
+            # 检测到唤醒词，返回唤醒词
+            audio_recognized_text = self.wake_word if woke else self.collect_speech(speech_results)
+            # 下一帧按当前人脸/手部区域的大小选择解码倍数
+            self.decoder.track(video_result.get('face_box'), gesture_result.get('hand_box'))
+            result = {
                 'gesture': gesture_recognized_text,
                 'video': video_recognized_text,
                 'audio': audio_recognized_text
             }
+            # 仅在调试画面订阅者请求且到达采样时刻时才绘制并编码
+            if data.get('debug_frame'):
+                result['debug_frame'] = executors['video'].submit(
+                    self.render_debug_frame, frame, gesture_result, video_result).result()
+            return result
+        except Exception as e:
+            return { 'error': str(e) }
+
+    def render_debug_frame(self, frame, gesture_result, video_result):
+        """绘制手部关键点、头部姿态和视线信息，返回JPEG字节"""
+        image = frame.copy()
+        if gesture_result.get('hand_landmarks') is not None:
+            self.gesture.draw_landmarks_on_image(image, gesture_result['hand_landmarks'])
+        self.video.draw_annotations(image, video_result.get('head'), video_result.get('gaze'))
+        success, jpeg = cv2.imencode('.jpg', image, [cv2.IMWRITE_JPEG_QUALITY, 70])
+        return jpeg.tobytes() if success else None
+
+    @metrics.timed('gesture')
+    def process_gesture(self, frame, context=None):
+        """手势阶段"""
+        return self.gesture.process_frame(frame, context)
+
+    @metrics.timed('video')
+    def process_video(self, frame, context=None):
+        """面部/视线阶段"""
+        return self.video.process_frame(frame, context)
+
+    def decode_audio(self, data):
+        """解码音频为 int16 PCM 数组，语音合成播放时的空音频返回 None"""
+        # 处理语音识别（二进制帧直接携带原始PCM）
+        audio_bytes = data.get('audio_bytes')
+        base64_audio = data.get('audio') if audio_bytes is None else None
+
+        if audio_bytes is None and not base64_audio:
+            raise ValueError({'error': 'Audio data is missing'})
+
+        # 语音合成播放时不发送音频数据
+        if base64_audio == "" or (audio_bytes is not None and len(audio_bytes) == 0):
+            return None
+        
+        # 解码 Base64 字符串为 PCM(int16, 16kHz, mono)
+        try:
+            if audio_bytes is None:
+                audio_bytes = base64.b64decode(base64_audio)
+            # 转换为NumPy数组（识别直接使用内存中的波形，不经过临时文件）
+            audio_np = np.frombuffer(audio_bytes, dtype=np.int16)
         except Exception as e:
-            return { 'error': str(e) }
\ No newline at end of file
+            print(f"Error decoding audio: {e}")
+            raise ValueError({'error': 'Failed to decode audio data'})
+
+        if self.shared_models.audio_spool is not None:
+            self.shared_models.audio_spool.submit(audio_bytes, self.user_id)
+        return audio_np
+
+    @metrics.timed('audio')
+    def process_audio(self, audio_np, is_emergency=False, is_wake=False):
+        """音频阶段：语音门限和端点检测，返回待识别的完整语句列表（唤醒词由 WakeWordSpotter 流式检测）"""
+        if audio_np is None:
+            return []
+
+        # 每段音频都更新噪声底（未唤醒时也持续适应）
+        if self.utterances is not None:
+            if is_wake != self.last_is_wake:
+                # 唤醒/退出唤醒时丢弃未结束的语句，避免半句话串到下一条命令
+                self.utterances.reset()
+            self.last_is_wake = is_wake
+            # 端点检测：跨段拼接，语句结束时整句识别一次（未结束时本段不识别）；
+            # 紧急模式下分段末尾未结束的语句也立即识别，不等下一帧
+            with metrics.timer('vad'):
+                segments = self.utterances.push(audio_np, self.speech_gate.speech_mask(audio_np),
+                                                flush=is_emergency)
+        else:
+            segments = [audio_np]
+            if self.speech_gate is not None:
+                # 语音门限：静音和稳态噪声不送入语音识别
+                with metrics.timer('vad'):
+                    has_speech, _ = self.speech_gate.update(audio_np)
+                if not has_speech:
+                    metrics.inc('vad_rejected_total')
+                    segments = []
+
+        if is_emergency:
+            print("紧急模式下跳过唤醒词检测和唤醒状态判断")
+            return segments
+
+        print("多模态大模型is_wake:", is_wake)
+        # 当前是未唤醒状态, 不识别
+        if not is_wake:
+            return []
+        return segments
+
+    def poll_wake_word(self, is_emergency=False):
+        """有界等待本段音频的唤醒词检测完成，返回本段是否唤醒（紧急模式下忽略唤醒词）"""
+        if self.wake_spotter is None:
+            return False
+        self.wake_spotter.wait(Config.WAKE_WORD_WAIT_TIMEOUT)
+        if not self.wake_spotter.poll():
+            return False
+        if is_emergency:
+            print("紧急模式下忽略唤醒词")
+            return False
+        return True
+
+    def submit_speech(self, segments):
+        """完整语句提交到跨会话批量识别，返回待取的结果"""
+        if not segments or self.shared_models.asr_batcher is None:
+            return []
+        print("处理音频识别")
+        return [self.shared_models.asr_batcher.submit(segment) for segment in segments]
+
+    def collect_speech(self, results):
+        """取出识别文本（没有待识别的语音时返回"音频数据为空"）"""
+        if not results:
+            return "音频数据为空"
+        return '，'.join(result.get() for result in results)
@@ -0,0 +1,111 @@
+import time
+from collections import OrderedDict
+from .multimodal import MultimodalProcessor, SharedModels
+from ..utils.metrics import metrics
+
+
+class MultimodalSession:
+    """单个车辆（user_id）的会话：独立的时序状态 + 连接计数"""
+    def __init__(self, user_id, processor):
+        self.user_id = user_id
+        self.processor = processor
+        self.connections = 0  # 当前挂载的 WebSocket 连接数
+        self.created_at = time.monotonic()
+        self.last_active = self.created_at
+
+    def touch(self):
+        self.last_active = time.monotonic()
+
+
+class SessionManager:
+    """
+    多模态会话表
+
+    - 每个 user_id 对应一个会话，重模型由 SharedModels 在会话间共享
+    - 超过 max_sessions 时按 LRU 淘汰（优先淘汰无连接的会话）
+    - 无连接且空闲超过 idle_timeout 秒的会话被回收
+    - 客户端断线重连（5秒重试）时直接复用原会话的时序状态
+    """
+    def __init__(self, max_sessions=16, idle_timeout=300.0, shared_models=None):
+        self.max_sessions = max(1, int(max_sessions))
+        self.idle_timeout = idle_timeout
+        self.shared_models = shared_models or SharedModels()
+        self.sessions = OrderedDict()  # user_id -> MultimodalSession，按最近使用排序
+        metrics.gauge('sessions', lambda: len(self.sessions))
+
+    def _get_or_create(self, user_id, wake_word=None):
+        session = self.sessions.get(user_id)
+        if session is None:
+            processor = MultimodalProcessor(user_id=user_id, wake_word=wake_word,
+                                            shared_models=self.shared_models)
+            session = MultimodalSession(user_id, processor)
+            self.sessions[user_id] = session
+            self._evict_over_capacity(keep=user_id)
+        else:
+            self.sessions.move_to_end(user_id)
+        session.touch()
+        return session
+
+    def attach(self, user_id):
+        """WebSocket 连接挂载到会话（存在则热复用）"""
+        self.evict_idle()
+        reattached = user_id in self.sessions
+        session = self._get_or_create(user_id)
+        session.connections += 1
+        if reattached:
+            print(f"会话重新挂载: user_id={user_id}")
+        return session
+
+    def detach(self, user_id):
+        """WebSocket 连接断开，会话保留至空闲超时"""
+        session = self.sessions.get(user_id)
+        if session is not None:
+            session.connections = max(0, session.connections - 1)
+            session.touch()
+
+    def get_processor(self, user_id, wake_word=None):
+        """获取会话对应的多模态处理器"""
+        session = self._get_or_create(user_id, wake_word)
+        if wake_word:
+            session.processor.wake_word = wake_word
+        return session.processor
+
+    def process_request(self, user_id, wake_word, data, is_emergency=False, is_wake=False):
+        """在车辆会话上处理一帧多模态请求"""
+        processor = self.get_processor(user_id, wake_word)
+        return processor.process_request(data, is_emergency, is_wake)
+
+    def evict_idle(self, now=None):
+        """回收无连接且空闲超时的会话"""
+        now = time.monotonic() if now is None else now
+        expired = [
+            user_id for user_id, session in self.sessions.items()
+            if session.connections == 0 and now - session.last_active > self.idle_timeout
+        ]
+        for user_id in expired:
+            self._evict(user_id)
+        return len(expired)
+
+    def _evict_over_capacity(self, keep=None):
+        while len(self.sessions) > self.max_sessions:
+            # 优先淘汰最久未使用且无连接的会话，否则淘汰最久未使用的会话
+            candidates = [user_id for user_id in self.sessions if user_id != keep]
+            victim = next(
+                (user_id for user_id in candidates if self.sessions[user_id].connections == 0),
+                candidates[0]
+            )
+            self._evict(victim)
+
+    def _evict(self, user_id):
+        session = self.sessions.pop(user_id, None)
+        if session is not None:
+            session.processor.close()
+        metrics.inc('sessions_evicted_total')
+        print(f"会话已回收: user_id={user_id}")
+
+    def warmup(self):
+        """启动时加载并预热共享模型"""
+        self.shared_models.warmup()
+
+    def __len__(self):
+        return len(self.sessions)
@@ -0,0 +1,184 @@
+import numpy as np
+
+
+class TimeWindowBuffer:
+    """
+    预分配的时间窗口环形缓冲区
+
+    - 容量固定（超出时淘汰最旧样本，等价于 deque(maxlen)），window 秒以外的样本在追加时过期
+    - 追加、过期都是均摊 O(1)，不产生新的列表或数组
+    - 和、平方和增量维护，均值/方差 O(1)；最大/最小值由单调队列维护，O(1)
+    - 滑动平均的极值及位置直接在环形缓冲区上逐个计算（跨越回绕点时按序号取模），不导出数组
+    """
+    def __init__(self, capacity, window=None):
+        self.capacity = int(capacity)
+        self.window = window
+        self._values = [0.0] * self.capacity
+        self._times = [0.0] * self.capacity
+        # 序号单调递增，槽位为 序号 % capacity；[head, tail) 为有效样本
+        self._head = 0
+        self._tail = 0
+        self._sum = 0.0
+        self._sum_sq = 0.0
+        self._pops = 0  # 淘汰计数，每淘汰 capacity 个样本重新求和一次，消除浮点累计误差
+        # 单调队列（存样本序号）：队首分别为窗口内最大值、最小值
+        self._max_queue = [0] * self.capacity
+        self._max_head = 0
+        self._max_tail = 0
+        self._min_queue = [0] * self.capacity
+        self._min_head = 0
+        self._min_tail = 0
+
+    def __len__(self):
+        return self._tail - self._head
+
+    def append(self, value, timestamp=0.0):
+        """追加样本（按时间窗口工作时 timestamp 必须单调不减）"""
+        capacity = self.capacity
+        if self._tail - self._head >= capacity:
+            self._popleft()
+        seq = self._tail
+        values = self._values
+        values[seq % capacity] = value
+        self._times[seq % capacity] = timestamp
+        self._tail = seq + 1
+        self._sum += value
+        self._sum_sq += value * value
+
+        queue = self._max_queue
+        tail = self._max_tail
+        while tail > self._max_head and values[queue[(tail - 1) % capacity] % capacity] <= value:
+            tail -= 1
+        queue[tail % capacity] = seq
+        self._max_tail = tail + 1
+
+        queue = self._min_queue
+        tail = self._min_tail
+        while tail > self._min_head and values[queue[(tail - 1) % capacity] % capacity] >= value:
+            tail -= 1
+        queue[tail % capacity] = seq
+        self._min_tail = tail + 1
+
+        self.expire(timestamp)
+
+    def expire(self, now):
+        """淘汰时间早于 now - window 的样本"""
+        if self.window is None:
+            return
+        cutoff = now - self.window
+        times = self._times
+        while self._head < self._tail and times[self._head % self.capacity] < cutoff:
+            self._popleft()
+
+    def _popleft(self):
+        seq = self._head
+        value = self._values[seq % self.capacity]
+        self._head = seq + 1
+        if self._max_queue[self._max_head % self.capacity] == seq:
+            self._max_head += 1
+        if self._min_queue[self._min_head % self.capacity] == seq:
+            self._min_head += 1
+        if self._head == self._tail:
+            self._sum = 0.0
+            self._sum_sq = 0.0
+            self._pops = 0
+            return
+        self._sum -= value
+        self._sum_sq -= value * value
+        self._pops += 1
+        if self._pops >= self.capacity:
+            self._resum()
+
+    def _resum(self):
+        self._pops = 0
+        total = 0.0
+        total_sq = 0.0
+        values = self._values
+        for seq in range(self._head, self._tail):
+            value = values[seq % self.capacity]
+            total += value
+            total_sq += value * value
+        self._sum = total
+        self._sum_sq = total_sq
+
+    def clear(self):
+        self._head = self._tail
+        self._max_head = self._max_tail
+        self._min_head = self._min_tail
+        self._sum = 0.0
+        self._sum_sq = 0.0
+        self._pops = 0
+
+    @property
+    def sum(self):
+        return self._sum
+
+    @property
+    def sum_sq(self):
+        return self._sum_sq
+
+    def mean(self, default=0.0):
+        n = self._tail - self._head
+        return self._sum / n if n else default
+
+    def var(self, default=0.0):
+        """总体方差（与 np.var 一致）"""
+        n = self._tail - self._head
+        if not n:
+            return default
+        mean = self._sum / n
+        return max(0.0, self._sum_sq / n - mean * mean)
+
+    def max(self, default=None):
+        if self._head == self._tail:
+            return default
+        return self._values[self._max_queue[self._max_head % self.capacity] % self.capacity]
+
+    def min(self, default=None):
+        if self._head == self._tail:
+            return default
+        return self._values[self._min_queue[self._min_head % self.capacity] % self.capacity]
+
+    def last(self, default=None):
+        if self._head == self._tail:
+            return default
+        return self._values[(self._tail - 1) % self.capacity]
+
+    def moving_average_extrema(self, width):
+        """
+        宽度为 width 的滑动平均（即 np.convolve(values, np.ones(width) / width, mode='valid')）的极值
+
+        返回 (最大值位置, 最大值, 最小值位置, 最小值, 滑动平均个数)，位置从最旧样本起计，
+        并列时取最早的位置（与 np.argmax / np.argmin 一致）；样本少于 width 个时返回 None
+        """
+        n = self._tail - self._head
+        if n < width:
+            return None
+        capacity = self.capacity
+        values = self._values
+        head = self._head
+        total = 0.0
+        for seq in range(head, head + width):
+            total += values[seq % capacity]
+        max_idx = min_idx = 0
+        max_total = min_total = total
+        for i in range(1, n - width + 1):
+            total += values[(head + i + width - 1) % capacity] - values[(head + i - 1) % capacity]
+            if total > max_total:
+                max_idx, max_total = i, total
+            elif total < min_total:
+                min_idx, min_total = i, total
+        return max_idx, max_total / width, min_idx, min_total / width, n - width + 1
+
+    def values(self):
+        """按时间顺序导出样本（会分配新数组，只在离线分析时使用）"""
+        return np.array([self._values[seq % self.capacity] for seq in range(self._head, self._tail)])
+
+
+def pooled_var(*buffers, default=0.0):
+    """多个缓冲区合并后的总体方差（等价于拼接后 np.var，不实际拼接）"""
+    n = sum(len(buffer) for buffer in buffers)
+    if not n:
+        return default
+    mean = sum(buffer.sum for buffer in buffers) / n
+    return max(0.0, sum(buffer.sum_sq for buffer in buffers) / n - mean * mean)
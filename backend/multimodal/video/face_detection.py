@@ -3,10 +3,15 @@ import mediapipe as mp
 import numpy as np
 from collections import deque
 import time
+from .landmarks import FaceLandmarks
+from .pose_tracker import PoseTracker
+
+# PnP 姿态估计使用的关键点索引（与 face_3d 一一对应）
+POSE_LANDMARK_INDICES = np.array([1, 9, 57, 130, 287, 359])
 
 class FaceDetector:
     def __init__(self):
-        # 初始化面部网格检测器
+        # 初始化面部网格检测器（跟踪模式：带帧间状态，服务端按会话从池中租用实例）
         self.mp_face_mesh = mp.solutions.face_mesh
         self.face_mesh = self.mp_face_mesh.FaceMesh(
             min_detection_confidence=0.5,
@@ -23,32 +28,40 @@ class FaceDetector:
             [360, 574, 128],
             [391, 425, 108]
         ], dtype=np.float64)
+        # 内参按分辨率缓存、帧间热启动的姿态估计（未传入会话自己的跟踪器时使用）
+        self.pose_tracker = PoseTracker(self.face_3d)
         # 定义左右眼关键点索引
         self.left_eye_indices = [33, 7, 163, 144, 145, 153, 154, 155, 133, 173, 157, 158, 159, 160, 161, 246]
         self.right_eye_indices = [263, 249, 390, 373, 374, 380, 381, 382, 362, 466, 384, 385, 386, 387, 388, 398]
 
-    def detect_face(self, image):
-        """检测面部并返回关键点和姿态信息"""
-        image_rgb = cv2.cvtColor(image, cv2.COLOR_BGR2RGB)
+    def reset(self):
+        """清除跟踪状态（归还池中前调用，下一个会话从检测重新开始）"""
+        self.face_mesh.reset()
+        self.pose_tracker.reset()
+
+    def detect_face(self, image, context=None, pose_tracker=None):
+        """
+        检测面部并返回关键点和姿态信息
+
+        context 为共享的帧预处理上下文，可复用其 RGB 图；
+        pose_tracker 为会话自己的姿态跟踪器，检测器在会话间共享或复用时热启动状态不会串到其他车辆
+        """
+        if pose_tracker is None:
+            pose_tracker = self.pose_tracker
+        image_rgb = context.rgb if context is not None else cv2.cvtColor(image, cv2.COLOR_BGR2RGB)
         results = self.face_mesh.process(image_rgb)
         h, w, _ = image.shape
         face_data = None
 
         if results.multi_face_landmarks:
-            face_landmarks = results.multi_face_landmarks[0]
+            # 关键点一次性转换为数组，姿态估计和视线跟踪共用
+            face_landmarks = FaceLandmarks(results.multi_face_landmarks[0], w, h)
             # 提取特定关键点用于姿态估计
-            face_2d = []
-            for idx in [1, 9, 57, 130, 287, 359]:
-                lm = face_landmarks.landmark[idx]
-                face_2d.append([int(lm.x * w), int(lm.y * h)])
-            face_2d = np.array(face_2d, dtype=np.float64)
-            
-            # 相机矩阵和畸变系数
-            cam_matrix = np.array([[w, 0, w / 2], [0, w, h / 2], [0, 0, 1]], dtype=np.float64)
-            dist_matrix = np.zeros((4, 1), dtype=np.float64)
+            face_2d = face_landmarks.subpixel_points(POSE_LANDMARK_INDICES)
             
-            # 求解3D到2D投影，获取旋转和平移向量
-            success, rvec, tvec = cv2.solvePnP(self.face_3d, face_2d, cam_matrix, dist_matrix)
+            # 求解3D到2D投影，获取旋转和平移向量（以上一帧结果为初值）
+            success, rvec, tvec, cam_matrix = pose_tracker.estimate(face_2d, w, h)
+            dist_matrix = pose_tracker.dist_matrix
             rotation_matrix, _ = cv2.Rodrigues(rvec)
             
             face_data = {
@@ -60,6 +73,8 @@ class FaceDetector:
                 'cam_matrix': cam_matrix,
                 'dist_matrix': dist_matrix,
             }
+        else:
+            pose_tracker.reset()
 
             
             
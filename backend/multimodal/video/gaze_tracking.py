@@ -2,7 +2,8 @@ import cv2
 import numpy as np
 import mediapipe as mp
 import math
-from collections import deque
+from ..time_window import TimeWindowBuffer, pooled_var
+from ...utils.metrics import metrics
 
 # 视线方向常量
 GAZE_DIRECTION_CENTER = "center"
@@ -39,38 +40,55 @@ class GazeParams:
     LEFT_EYE_WEIGHT = 0.5
     RIGHT_EYE_WEIGHT = 0.5
     PITCH_COMPENSATION_FACTOR = 0.3
+    # 虹膜关键点可信时直接使用，不做轮廓细化
+    IRIS_STABILITY_THRESHOLD = 0.15   # 相邻帧虹膜位置比例变化上限
+    IRIS_MIN_EYE_OPENNESS = 0.15      # 眼睛高宽比下限（闭眼/眯眼时关键点不可靠）
+    IRIS_MIN_DIAMETER_RATIO = 0.2     # 虹膜直径占眼宽比例的合理范围
+    IRIS_MAX_DIAMETER_RATIO = 0.8
+
+# 关键点索引数组（升序，与按索引顺序遍历关键点得到的点序一致）
+LEFT_EYE_LANDMARKS = np.array(sorted(GazeParams.LEFT_EYE_INDICES))
+RIGHT_EYE_LANDMARKS = np.array(sorted(GazeParams.RIGHT_EYE_INDICES))
+LEFT_IRIS_LANDMARKS = np.array(sorted(GazeParams.LEFT_IRIS_INDICES))
+RIGHT_IRIS_LANDMARKS = np.array(sorted(GazeParams.RIGHT_IRIS_INDICES))
+GAZE_LANDMARKS = np.concatenate([LEFT_EYE_LANDMARKS, RIGHT_EYE_LANDMARKS,
+                                 LEFT_IRIS_LANDMARKS, RIGHT_IRIS_LANDMARKS])
 
 class GazeTracker:
     def __init__(self):
-        self.left_h_ratio_history = deque(maxlen=GazeParams.SMOOTHING_WINDOW_SIZE)
-        self.left_v_ratio_history = deque(maxlen=GazeParams.SMOOTHING_WINDOW_SIZE)
-        self.right_h_ratio_history = deque(maxlen=GazeParams.SMOOTHING_WINDOW_SIZE)
-        self.right_v_ratio_history = deque(maxlen=GazeParams.SMOOTHING_WINDOW_SIZE)
-        self.left_pupil_center_history = deque(maxlen=GazeParams.SMOOTHING_WINDOW_SIZE)
-        self.right_pupil_center_history = deque(maxlen=GazeParams.SMOOTHING_WINDOW_SIZE)
-        self.left_gaze_direction_history = deque(maxlen=GazeParams.SMOOTHING_WINDOW_SIZE)
-        self.right_gaze_direction_history = deque(maxlen=GazeParams.SMOOTHING_WINDOW_SIZE)
+        # 平滑后的虹膜位置比例（方差增量维护）
+        self.left_h_ratio_history = TimeWindowBuffer(GazeParams.SMOOTHING_WINDOW_SIZE)
+        self.left_v_ratio_history = TimeWindowBuffer(GazeParams.SMOOTHING_WINDOW_SIZE)
+        self.right_h_ratio_history = TimeWindowBuffer(GazeParams.SMOOTHING_WINDOW_SIZE)
+        self.right_v_ratio_history = TimeWindowBuffer(GazeParams.SMOOTHING_WINDOW_SIZE)
+        # 平滑只依赖上一帧的瞳孔中心
+        self.left_pupil_center = None
+        self.right_pupil_center = None
         self.h_ratio_variance = 0.1
         self.v_ratio_variance = 0.1
+        # 上一帧由虹膜关键点得到的位置比例，用于判断关键点是否稳定
+        self.last_landmark_iris = {'left': None, 'right': None}
 
-    def _smooth_value(self, value_history, new_value, alpha=None):
-        if not value_history:
+    def _smooth_value(self, prev_value, new_value, alpha=None):
+        """指数平滑，prev_value 为上一帧的平滑值（无则直接返回新值）"""
+        if prev_value is None:
             return new_value
         if alpha is None:
             alpha = GazeParams.POSITION_ALPHA
         if isinstance(new_value, tuple):
-            prev_x, prev_y = value_history[-1]
+            prev_x, prev_y = prev_value
             curr_x, curr_y = new_value
             return (alpha * curr_x + (1 - alpha) * prev_x,
                     alpha * curr_y + (1 - alpha) * prev_y)
         else:
-            return alpha * new_value + (1 - alpha) * value_history[-1]
+            return alpha * new_value + (1 - alpha) * prev_value
 
-    def _enhanced_iris_detection(self, eye_region, landmarks):
+    def _enhanced_iris_detection(self, eye_region, landmarks, gray=None):
         try:
             if eye_region.size == 0:
                 return None
-            gray = cv2.cvtColor(eye_region, cv2.COLOR_BGR2GRAY)
+            if gray is None:
+                gray = cv2.cvtColor(eye_region, cv2.COLOR_BGR2GRAY)
             blurred = cv2.GaussianBlur(gray, (5, 5), 0)
             _, thresh1 = cv2.threshold(blurred, 0, 255, cv2.THRESH_BINARY_INV + cv2.THRESH_OTSU)
             thresh2 = cv2.adaptiveThreshold(blurred, 255, cv2.ADAPTIVE_THRESH_GAUSSIAN_C,
@@ -83,12 +101,17 @@ class GazeTracker:
             min_area = eye_region.shape[0] * eye_region.shape[1] * GazeParams.PUPIL_DETECTION_THRESHOLD
             valid_contours = [c for c in contours if cv2.contourArea(c) > min_area]
             if valid_contours:
+                # 各轮廓填充到同一张标签图，每个轮廓只在自身外接矩形内统计灰度均值
+                # （不再为每个轮廓分配整幅掩码）
+                labels = np.zeros(gray.shape, dtype=np.uint16)
+                for index in range(len(valid_contours)):
+                    cv2.drawContours(labels, valid_contours, index, index + 1, -1)
                 best_contour = None
                 darkest_value = 255
-                for contour in valid_contours:
-                    mask = np.zeros_like(gray)
-                    cv2.drawContours(mask, [contour], 0, 255, -1)
-                    mean_val = cv2.mean(gray, mask=mask)[0]
+                for index, contour in enumerate(valid_contours):
+                    x, y, w, h = cv2.boundingRect(contour)
+                    mask = (labels[y:y + h, x:x + w] == index + 1).view(np.uint8)
+                    mean_val = cv2.mean(gray[y:y + h, x:x + w], mask=mask)[0]
                     if mean_val < darkest_value:
                         darkest_value = mean_val
                         best_contour = contour
@@ -103,9 +126,8 @@ class GazeTracker:
         return None
 
     def _calculate_eye_center(self, eye_landmarks):
-        x_coords = [p[0] for p in eye_landmarks]
-        y_coords = [p[1] for p in eye_landmarks]
-        return (sum(x_coords) / len(x_coords), sum(y_coords) / len(y_coords))
+        center_x, center_y = eye_landmarks.mean(axis=0)
+        return (float(center_x), float(center_y))
 
     def _calculate_3d_gaze_direction(self, pupil_center, eye_center, image_height):
         if not pupil_center or not eye_center:
@@ -125,42 +147,71 @@ class GazeTracker:
         norm = math.sqrt(dx_2d ** 2 + dy_2d ** 2 + (dz * depth_scale) ** 2)
         return (dx_2d / norm, dy_2d / norm, (dz * depth_scale) / norm)
 
+    def _eye_region_bounds(self, eye_landmarks, frame):
+        (min_x, min_y), (max_x, max_y) = eye_landmarks.min(axis=0), eye_landmarks.max(axis=0)
+        x1 = max(0, int(min_x) - 5)
+        y1 = max(0, int(min_y) - 5)
+        x2 = min(frame.shape[1], int(max_x) + 5)
+        y2 = min(frame.shape[0], int(max_y) + 5)
+        return x1, y1, x2, y2
+
     def _extract_eye_region(self, eye_landmarks, frame):
-        eye_x_coords = [p[0] for p in eye_landmarks]
-        eye_y_coords = [p[1] for p in eye_landmarks]
-        x1 = max(0, int(min(eye_x_coords)) - 5)
-        y1 = max(0, int(min(eye_y_coords)) - 5)
-        x2 = min(frame.shape[1], int(max(eye_x_coords)) + 5)
-        y2 = min(frame.shape[0], int(max(eye_y_coords)) + 5)
+        x1, y1, x2, y2 = self._eye_region_bounds(eye_landmarks, frame)
         if x2 <= x1 or y2 <= y1:
             return None, (x1, y1)
         eye_region = frame[y1:y2, x1:x2]
         return eye_region, (x1, y1)
 
-    def _calculate_iris_position(self, eye_landmarks, iris_landmarks, frame=None):
-        eye_x_coords = [p[0] for p in eye_landmarks]
-        eye_y_coords = [p[1] for p in eye_landmarks]
-        eye_left = min(eye_x_coords)
-        eye_right = max(eye_x_coords)
-        eye_top = min(eye_y_coords)
-        eye_bottom = max(eye_y_coords)
+    def _iris_landmarks_stable(self, eye, h_ratio, v_ratio, diameter_ratio, openness):
+        """虹膜关键点是否可信：睁眼、虹膜大小合理、位于眼框内且与上一帧相比没有跳变"""
+        last = self.last_landmark_iris.get(eye)
+        self.last_landmark_iris[eye] = (h_ratio, v_ratio)
+        if last is None:
+            return False
+        return (openness >= GazeParams.IRIS_MIN_EYE_OPENNESS and
+                GazeParams.IRIS_MIN_DIAMETER_RATIO <= diameter_ratio <= GazeParams.IRIS_MAX_DIAMETER_RATIO and
+                abs(h_ratio) <= 1.0 and abs(v_ratio) <= 1.0 and
+                abs(h_ratio - last[0]) <= GazeParams.IRIS_STABILITY_THRESHOLD and
+                abs(v_ratio - last[1]) <= GazeParams.IRIS_STABILITY_THRESHOLD)
+
+    def _calculate_iris_position(self, eye_landmarks, iris_landmarks, frame=None, context=None, eye=None):
+        """
+        eye_landmarks / iris_landmarks 为 (k, 2) int32 像素坐标数组
+
+        虹膜关键点稳定时直接使用其中心；否则在眼部区域内做轮廓细化
+        """
+        eye_left, eye_top = (int(v) for v in eye_landmarks.min(axis=0))
+        eye_right, eye_bottom = (int(v) for v in eye_landmarks.max(axis=0))
         eye_width = max(eye_right - eye_left, 1e-5)
         eye_height = max(eye_bottom - eye_top, 1e-5)
         eye_center = self._calculate_eye_center(eye_landmarks)
         
         if len(iris_landmarks) >= 3:
-            iris_pts = np.array(iris_landmarks, dtype=np.int32)
-            (iris_center_x, iris_center_y), _ = cv2.minEnclosingCircle(iris_pts)
+            (iris_center_x, iris_center_y), iris_radius = cv2.minEnclosingCircle(iris_landmarks)
             iris_center = (iris_center_x, iris_center_y)
         else:
-            iris_center_x = sum([p[0] for p in iris_landmarks]) / len(iris_landmarks)
-            iris_center_y = sum([p[1] for p in iris_landmarks]) / len(iris_landmarks)
+            iris_center_x, iris_center_y = (float(v) for v in iris_landmarks.mean(axis=0))
             iris_center = (iris_center_x, iris_center_y)
-        if frame is not None:
+            iris_radius = 0.0
+        refine = frame is not None
+        if refine and eye is not None:
+            refine = not self._iris_landmarks_stable(
+                eye,
+                2 * (iris_center_x - eye_left) / eye_width - 1,
+                2 * (iris_center_y - eye_top) / eye_height - 1,
+                2 * iris_radius / eye_width,
+                eye_height / eye_width)
+            metrics.inc('gaze_iris_refined_total' if refine else 'gaze_iris_fast_path_total')
+        if refine:
             eye_region, offset = self._extract_eye_region(eye_landmarks, frame)
             if eye_region is not None and eye_region.size > 0:
+                # 共享上下文时灰度图只转换眼部区域（或复用已缓存的整帧灰度）
+                gray = None
+                if context is not None:
+                    x1, y1, x2, y2 = self._eye_region_bounds(eye_landmarks, frame)
+                    gray = context.gray_roi(y1, y2, x1, x2)
                 enhanced_iris = self._enhanced_iris_detection(eye_region,
-                    [(p[0] - offset[0], p[1] - offset[1]) for p in eye_landmarks])
+                    eye_landmarks - np.array(offset, dtype=np.int32), gray)
                 if enhanced_iris:
                     iris_center = (enhanced_iris[0] + offset[0], enhanced_iris[1] + offset[1])
                     iris_center_x, iris_center_y = iris_center
@@ -190,19 +241,18 @@ class GazeTracker:
                                  head_pitch=0.0, head_yaw=0.0):
         is_consistent, consistency_score = self._check_eye_consistency(
             left_h_ratio, left_v_ratio, right_h_ratio, right_v_ratio)
-        smooth_left_h = self._smooth_value(self.left_h_ratio_history, left_h_ratio)
-        smooth_left_v = self._smooth_value(self.left_v_ratio_history, left_v_ratio)
-        smooth_right_h = self._smooth_value(self.right_h_ratio_history, right_h_ratio)
-        smooth_right_v = self._smooth_value(self.right_v_ratio_history, right_v_ratio)
+        smooth_left_h = self._smooth_value(self.left_h_ratio_history.last(), left_h_ratio)
+        smooth_left_v = self._smooth_value(self.left_v_ratio_history.last(), left_v_ratio)
+        smooth_right_h = self._smooth_value(self.right_h_ratio_history.last(), right_h_ratio)
+        smooth_right_v = self._smooth_value(self.right_v_ratio_history.last(), right_v_ratio)
         self.left_h_ratio_history.append(smooth_left_h)
         self.left_v_ratio_history.append(smooth_left_v)
         self.right_h_ratio_history.append(smooth_right_h)
         self.right_v_ratio_history.append(smooth_right_v)
-        h_ratios = list(self.left_h_ratio_history) + list(self.right_h_ratio_history)
-        v_ratios = list(self.left_v_ratio_history) + list(self.right_v_ratio_history)
-        if len(h_ratios) >= 3:
-            self.h_ratio_variance = np.var(h_ratios) + 0.05
-            self.v_ratio_variance = np.var(v_ratios) + 0.05
+        # 两眼合并后的方差由各缓冲区的和、平方和直接得到
+        if len(self.left_h_ratio_history) + len(self.right_h_ratio_history) >= 3:
+            self.h_ratio_variance = pooled_var(self.left_h_ratio_history, self.right_h_ratio_history) + 0.05
+            self.v_ratio_variance = pooled_var(self.left_v_ratio_history, self.right_v_ratio_history) + 0.05
         left_weight = GazeParams.LEFT_EYE_WEIGHT
         right_weight = GazeParams.RIGHT_EYE_WEIGHT
         if not is_consistent:
@@ -254,8 +304,8 @@ class GazeTracker:
                 # 对角区域时center范围更大
                 return GAZE_DIRECTION_CENTER, confidence, mirrored_h_ratio, camera_v_ratio
 
-    def track_gaze(self, landmarks, frame):
-        h, w, _ = frame.shape
+    def track_gaze(self, landmarks, frame, context=None):
+        """landmarks 为 FaceLandmarks（整帧关键点数组），按预先计算的索引数组取眼部和虹膜点"""
         gaze_result = {
             "direction": GAZE_DIRECTION_CENTER,
             "confidence": 0.0,
@@ -276,47 +326,26 @@ class GazeTracker:
                 "gaze_3d": None
             }
         }
-        left_eye_landmarks = []
-        right_eye_landmarks = []
-        left_iris_landmarks = []
-        right_iris_landmarks = []
-        for idx, landmark in enumerate(landmarks.landmark):
-            x, y, z = landmark.x, landmark.y, landmark.z
-            pixel_x, pixel_y = int(x * w), int(y * h)
-            if idx in GazeParams.LEFT_EYE_INDICES:
-                left_eye_landmarks.append((pixel_x, pixel_y))
-            if idx in GazeParams.RIGHT_EYE_INDICES:
-                right_eye_landmarks.append((pixel_x, pixel_y))
-            if idx in GazeParams.LEFT_IRIS_INDICES:
-                left_iris_landmarks.append((pixel_x, pixel_y))
-            if idx in GazeParams.RIGHT_IRIS_INDICES:
-                right_iris_landmarks.append((pixel_x, pixel_y))
-       
-        if (len(left_eye_landmarks) == len(GazeParams.LEFT_EYE_INDICES) and
-            len(right_eye_landmarks) == len(GazeParams.RIGHT_EYE_INDICES) and
-            len(left_iris_landmarks) == len(GazeParams.LEFT_IRIS_INDICES) and
-            len(right_iris_landmarks) == len(GazeParams.RIGHT_IRIS_INDICES)):
+        if landmarks.has(GAZE_LANDMARKS):
+            left_eye_landmarks = landmarks.pixel_points(LEFT_EYE_LANDMARKS)
+            right_eye_landmarks = landmarks.pixel_points(RIGHT_EYE_LANDMARKS)
+            left_iris_landmarks = landmarks.pixel_points(LEFT_IRIS_LANDMARKS)
+            right_iris_landmarks = landmarks.pixel_points(RIGHT_IRIS_LANDMARKS)
             left_h_ratio, left_v_ratio, left_gaze_3d, left_pupil = self._calculate_iris_position(
-                left_eye_landmarks, left_iris_landmarks, frame)
+                left_eye_landmarks, left_iris_landmarks, frame, context, eye='left')
             right_h_ratio, right_v_ratio, right_gaze_3d, right_pupil = self._calculate_iris_position(
-                right_eye_landmarks, right_iris_landmarks, frame)
+                right_eye_landmarks, right_iris_landmarks, frame, context, eye='right')
            
             if left_pupil:
-                smooth_left_pupil = self._smooth_value(
-                    self.left_pupil_center_history, left_pupil)
-                self.left_pupil_center_history.append(smooth_left_pupil)
+                smooth_left_pupil = self._smooth_value(self.left_pupil_center, left_pupil)
+                self.left_pupil_center = smooth_left_pupil
             else:
                 smooth_left_pupil = None
             if right_pupil:
-                smooth_right_pupil = self._smooth_value(
-                    self.right_pupil_center_history, right_pupil)
-                self.right_pupil_center_history.append(smooth_right_pupil)
+                smooth_right_pupil = self._smooth_value(self.right_pupil_center, right_pupil)
+                self.right_pupil_center = smooth_right_pupil
             else:
                 smooth_right_pupil = None
-            if left_gaze_3d:
-                self.left_gaze_direction_history.append(left_gaze_3d)
-            if right_gaze_3d:
-                self.right_gaze_direction_history.append(right_gaze_3d)
             direction, confidence, compensated_h_ratio, compensated_v_ratio = self._determine_gaze_direction(
                 left_h_ratio, left_v_ratio, left_gaze_3d,
                 right_h_ratio, right_v_ratio, right_gaze_3d
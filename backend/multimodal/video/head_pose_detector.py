@@ -1,6 +1,10 @@
 import numpy as np
-from collections import deque
 import time
+from ..time_window import TimeWindowBuffer
+from .pose_tracker import AngleKalmanFilter
+
+AMPLITUDE_SIZE = 10  # 动态阈值使用最近的帧数
+ZERO_CROSS_WINDOW = 0.3  # 过零计数时间窗口（秒）
 
 class HeadPoseDetector:
     def __init__(self):
@@ -13,14 +17,23 @@ class HeadPoseDetector:
         self.BASE_SHAKE_THRESH = 10
         self.ZC_COUNT_THRESH = 2
         self.MOTION_INTERVAL = 1.5
+        # 判定点头/摇头前至少需要的帧数（滤波后的角度抖动小，不必等满整个窗口）
+        self.MIN_DECISION_FRAMES = self.WINDOW_SIZE // 2
         
-        # 状态变量
-        self.pitch_history = deque(maxlen=self.WINDOW_SIZE)
-        self.yaw_history = deque(maxlen=self.WINDOW_SIZE)
-        self.roll_history = deque(maxlen=self.WINDOW_SIZE)
+        # 状态变量（均为预分配的窗口缓冲区，统计量增量维护）
+        self.pitch_history = TimeWindowBuffer(self.WINDOW_SIZE)
+        self.yaw_history = TimeWindowBuffer(self.WINDOW_SIZE)
+        self.roll_history = TimeWindowBuffer(self.WINDOW_SIZE)
+        # 角度平滑：匀速模型卡尔曼滤波
+        self.angle_filter = AngleKalmanFilter()
+        self.smooth_angles = {'pitch': 0.0, 'yaw': 0.0, 'roll': 0.0}
+        # 最近 AMPLITUDE_SIZE 帧角度的绝对值，用于动态阈值
+        self.pitch_amplitude = TimeWindowBuffer(AMPLITUDE_SIZE)
+        self.yaw_amplitude = TimeWindowBuffer(AMPLITUDE_SIZE)
+        self.roll_amplitude = TimeWindowBuffer(AMPLITUDE_SIZE)
         self.zero_cross = {
-            'pitch': {'count': 0, 'prev_sign': 1, 'timestamps': deque(maxlen=20)},
-            'yaw': {'count': 0, 'prev_sign': 1, 'timestamps': deque(maxlen=20)}
+            'pitch': {'count': 0, 'prev_sign': 1, 'timestamps': TimeWindowBuffer(20, ZERO_CROSS_WINDOW)},
+            'yaw': {'count': 0, 'prev_sign': 1, 'timestamps': TimeWindowBuffer(20, ZERO_CROSS_WINDOW)}
         }
         self.last_action_time = 0
         self.detected_action = ""
@@ -33,12 +46,11 @@ class HeadPoseDetector:
         z = np.arctan2(rotation_matrix[1, 0], rotation_matrix[0, 0])
         return np.array([x, y, z]) * 180.0 / np.pi
 
-    def calculate_dynamic_threshold(self, values, base_thresh, is_vertical=False):
-        """计算动态阈值"""
+    def calculate_dynamic_threshold(self, values, amplitudes, base_thresh, is_vertical=False):
+        """计算动态阈值（amplitudes 为最近若干帧角度绝对值的缓冲区）"""
         if len(values) < 5:
             return base_thresh
-        recent_values = list(values)[-10:]
-        avg_amplitude = np.mean(np.abs(recent_values))
+        avg_amplitude = amplitudes.mean()
         sensitivity = self.VERTICAL_SENSITIVITY if is_vertical else self.DYNAMIC_THRESHOLD_RATIO
         return max(base_thresh, avg_amplitude * sensitivity)
 
@@ -47,39 +59,35 @@ class HeadPoseDetector:
         current_sign = 1 if current_value >= 0 else -1
         state = self.zero_cross[axis]
         
-        # 检查是否发生过零
+        # 检查是否发生过零（添加时间戳时自动移除超过0.3秒的记录）
         if state['prev_sign'] != current_sign:
             current_time = time.time()
-            
-            # 移除超过0.3秒的时间戳
-            cutoff_time = current_time - 0.3
-            while state['timestamps'] and state['timestamps'][0] < cutoff_time:
-                state['timestamps'].popleft()
-            
-            # 添加新的过零时间戳
-            state['timestamps'].append(current_time)
+            state['timestamps'].append(current_time, current_time)
         
         # 更新前一个符号状态
         state['prev_sign'] = current_sign
         
         # 只计算0.3秒内的过零次数
-        current_time = time.time()
-        cutoff_time = current_time - 0.3
-        recent_timestamps = [t for t in state['timestamps'] if t >= cutoff_time]
-        return len(recent_timestamps)
+        state['timestamps'].expire(time.time())
+        return len(state['timestamps'])
 
     def analyze_motion_pattern(self, values, threshold):
         """分析运动模式"""
         if len(values) < self.WINDOW_SIZE // 2:
             return False
-        smoothed = np.convolve(values, np.ones(3) / 3, mode='valid')
-        max_idx = np.argmax(smoothed)
-        min_idx = np.argmin(smoothed)
-        max_val = smoothed[max_idx]
-        min_val = smoothed[min_idx]
+        if isinstance(values, TimeWindowBuffer):
+            # 直接在环形缓冲区上求 3 点滑动平均的极值，逐帧调用不分配数组
+            max_idx, max_val, min_idx, min_val, count = values.moving_average_extrema(3)
+        else:
+            smoothed = np.convolve(values, np.ones(3) / 3, mode='valid')
+            max_idx = int(np.argmax(smoothed))
+            min_idx = int(np.argmin(smoothed))
+            max_val = smoothed[max_idx]
+            min_val = smoothed[min_idx]
+            count = len(smoothed)
         if abs(max_val - min_val) > threshold:
             time_diff = abs(max_idx - min_idx)
-            if time_diff > len(smoothed) // 4 and (max_val * min_val < 0):
+            if time_diff > count // 4 and (max_val * min_val < 0):
                 return True
         return False
 
@@ -88,26 +96,35 @@ class HeadPoseDetector:
         for axis in ['pitch', 'yaw']:
             self.zero_cross[axis]['timestamps'].clear()
             self.zero_cross[axis]['count'] = 0
-            current_value = np.mean(list(getattr(self, f"{axis}_history"))[-5:]) if getattr(self, f"{axis}_history") else 0
+            current_value = self.smooth_angles[axis]
             self.zero_cross[axis]['prev_sign'] = 1 if current_value >= 0 else -1
 
-    def detect_head_movement(self, rotation_matrix):
-        """检测头部动作"""
+    def detect_head_movement(self, rotation_matrix, timestamp=None):
+        """检测头部动作（timestamp 为帧采集时间，单位秒，用于滤波的帧间隔）"""
         # 转换为欧拉角
         euler_angles = self.rotation_matrix_to_angles(rotation_matrix)
-        pitch, yaw, roll = euler_angles
+        pitch, yaw, roll = euler_angles.tolist()
         self.pitch_history.append(pitch)
         self.yaw_history.append(yaw)
         self.roll_history.append(roll)
+        self.pitch_amplitude.append(abs(pitch))
+        self.yaw_amplitude.append(abs(yaw))
+        self.roll_amplitude.append(abs(roll))
 
         # 计算平滑角度
-        smooth_pitch = np.mean(list(self.pitch_history)[-5:]) if self.pitch_history else 0
-        smooth_yaw = np.mean(list(self.yaw_history)[-5:]) if self.yaw_history else 0
+        if timestamp is None:
+            timestamp = time.monotonic()
+        smooth_pitch, smooth_yaw, smooth_roll = self.angle_filter.update(euler_angles, timestamp).tolist()
+        self.smooth_angles['pitch'] = smooth_pitch
+        self.smooth_angles['yaw'] = smooth_yaw
+        self.smooth_angles['roll'] = smooth_roll
         
         # 计算动态阈值
-        dyn_nod_thresh = self.calculate_dynamic_threshold(self.pitch_history, self.BASE_NOD_THRESH, is_vertical=True)
-        dyn_shake_thresh = self.calculate_dynamic_threshold(self.yaw_history, self.BASE_SHAKE_THRESH)
-        dyn_roll_thresh = self.calculate_dynamic_threshold(self.roll_history, 2)
+        dyn_nod_thresh = self.calculate_dynamic_threshold(self.pitch_history, self.pitch_amplitude,
+                                                          self.BASE_NOD_THRESH, is_vertical=True)
+        dyn_shake_thresh = self.calculate_dynamic_threshold(self.yaw_history, self.yaw_amplitude,
+                                                            self.BASE_SHAKE_THRESH)
+        dyn_roll_thresh = self.calculate_dynamic_threshold(self.roll_history, self.roll_amplitude, 2)
         current_time = time.time()
         time_since_last = current_time - self.last_action_time
 
@@ -115,7 +132,7 @@ class HeadPoseDetector:
         
         # 检测点头动作
         pitch_zc = self.check_zero_cross(smooth_pitch, 'pitch')
-        if len(self.pitch_history) >= self.WINDOW_SIZE and abs(smooth_pitch) < 20 and \
+        if len(self.pitch_history) >= self.MIN_DECISION_FRAMES and abs(smooth_pitch) < 20 and \
                 dyn_nod_thresh > self.BASE_NOD_THRESH * 1.5 and \
                 dyn_nod_thresh < self.BASE_NOD_THRESH * 2.5 and \
                 pitch_zc >= self.ZC_COUNT_THRESH and time_since_last > self.MOTION_INTERVAL and \
@@ -128,7 +145,7 @@ class HeadPoseDetector:
 
         # 检测摇头动作
         yaw_zc = self.check_zero_cross(smooth_yaw, 'yaw')
-        if len(self.yaw_history) >= self.WINDOW_SIZE and \
+        if len(self.yaw_history) >= self.MIN_DECISION_FRAMES and \
                 dyn_shake_thresh > self.BASE_SHAKE_THRESH * 1.5 and \
                 dyn_shake_thresh < self.BASE_SHAKE_THRESH * 4 and \
                 yaw_zc >= self.ZC_COUNT_THRESH and time_since_last > self.MOTION_INTERVAL and \
@@ -0,0 +1,32 @@
+import numpy as np
+
+
+class FaceLandmarks:
+    """
+    单帧人脸关键点
+
+    MediaPipe 结果只在这里遍历一次，转换为 (N, 3) float32 归一化坐标，
+    像素坐标由一次乘法得到；面部姿态、视线等模块用预先计算好的索引数组直接取点。
+    """
+    def __init__(self, landmark_list, width, height):
+        self.landmark_list = landmark_list  # 原始结果（绘制等需要 protobuf 的场景使用）
+        self.points = np.array([(lm.x, lm.y, lm.z) for lm in landmark_list.landmark], dtype=np.float32)
+        self.width = width
+        self.height = height
+        # 与逐点 int(x * w) 一致：向零取整
+        self.pixels = (self.points[:, :2] * np.array([width, height], dtype=np.float32)).astype(np.int32)
+
+    def __len__(self):
+        return len(self.points)
+
+    def has(self, indices):
+        """是否包含索引数组中的全部关键点（未开启 refine_landmarks 时没有虹膜点）"""
+        return len(indices) == 0 or int(indices.max()) < len(self.points)
+
+    def pixel_points(self, indices):
+        """按索引数组取像素坐标 (k, 2) int32"""
+        return self.pixels[indices]
+
+    def subpixel_points(self, indices):
+        """按索引数组取亚像素坐标 (k, 2) float64（姿态估计使用，避免取整带来的抖动）"""
+        return self.points[indices, :2].astype(np.float64) * (self.width, self.height)
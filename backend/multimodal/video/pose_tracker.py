@@ -0,0 +1,132 @@
+import math
+from collections import deque
+import cv2
+import numpy as np
+
+
+class PoseTracker:
+    """
+    帧间热启动的 PnP 姿态估计
+
+    - 相机内参按分辨率缓存（缩小解码会让分辨率随帧变化）
+    - 上一帧成功时以其 rvec/tvec 为初值迭代求解，跳过每帧的初始化
+    - 热启动结果与上一帧相差过大（跟丢、换人）时退回冷启动
+    """
+    MAX_WARM_START_JUMP = 0.5  # 相邻帧旋转向量差异上限（弧度）
+
+    def __init__(self, object_points):
+        self.object_points = object_points
+        self.dist_matrix = np.zeros((4, 1), dtype=np.float64)
+        self._intrinsics = {}
+        self.rvec = None
+        self.tvec = None
+
+    def camera_matrix(self, width, height):
+        key = (width, height)
+        cam_matrix = self._intrinsics.get(key)
+        if cam_matrix is None:
+            cam_matrix = np.array([[width, 0, width / 2], [0, width, height / 2], [0, 0, 1]], dtype=np.float64)
+            self._intrinsics[key] = cam_matrix
+        return cam_matrix
+
+    def estimate(self, image_points, width, height):
+        """返回 (success, rvec, tvec, cam_matrix)"""
+        cam_matrix = self.camera_matrix(width, height)
+        if self.rvec is not None:
+            success, rvec, tvec = cv2.solvePnP(self.object_points, image_points, cam_matrix, self.dist_matrix,
+                                               self.rvec.copy(), self.tvec.copy(), useExtrinsicGuess=True,
+                                               flags=cv2.SOLVEPNP_ITERATIVE)
+            if success and np.linalg.norm(rvec - self.rvec) <= self.MAX_WARM_START_JUMP:
+                self.rvec, self.tvec = rvec, tvec
+                return success, rvec, tvec, cam_matrix
+        success, rvec, tvec = cv2.solvePnP(self.object_points, image_points, cam_matrix, self.dist_matrix)
+        if success:
+            self.rvec, self.tvec = rvec, tvec
+        else:
+            self.reset()
+        return success, rvec, tvec, cam_matrix
+
+    def reset(self):
+        """未检测到人脸时清除热启动状态"""
+        self.rvec = None
+        self.tvec = None
+
+
+class AngleKalmanFilter:
+    """
+    俯仰/偏航/翻滚角的卡尔曼滤波（三轴独立，状态为角度和角速度）
+
+    取代固定帧数的滑动平均：抖动更小且滞后更短，帧间隔按实际时间戳计算。
+
+    - 角速度按时间常数 rate_time_constant 衰减（Singer 模型）：高帧率时接近匀速模型，
+      帧间隔远大于时间常数时（客户端约 4.8 秒一帧）退化为角度随机游走，仍能平滑测量噪声
+    - 帧间隔超过 max_gap 时重新初始化；未指定 max_gap 时取最近帧间隔中位数的 gap_factor 倍
+      （不低于 min_gap），按实际帧率自适应
+    """
+    def __init__(self, process_noise=5.0, measurement_noise=9.0, max_gap=None, rate_time_constant=0.5,
+                 gap_factor=3.0, min_gap=1.0):
+        self.q = process_noise  # 角加速度噪声强度（度²/秒³）
+        self.r = measurement_noise  # 测量噪声方差（度²）
+        self.max_gap = max_gap  # 超过该间隔（秒）重新初始化，None 表示按帧间隔自适应
+        self.tau = rate_time_constant  # 角速度相关时间（秒）
+        self.gap_factor = gap_factor
+        self.min_gap = min_gap
+        self.intervals = deque(maxlen=9)  # 最近的帧间隔（秒）
+        self.angle = np.zeros(3)
+        self.rate = np.zeros(3)
+        self.p00 = np.zeros(3)
+        self.p01 = np.zeros(3)
+        self.p11 = np.zeros(3)
+        self.timestamp = None
+
+    def reset(self, angles, timestamp):
+        self.angle = np.array(angles, dtype=np.float64)
+        self.rate = np.zeros(3)
+        self.p00 = np.full(3, self.r)
+        self.p01 = np.zeros(3)
+        self.p11 = np.full(3, 100.0)
+        self.timestamp = timestamp
+
+    def gap_limit(self):
+        """当前的重新初始化间隔（秒）"""
+        if self.max_gap is not None:
+            return self.max_gap
+        if not self.intervals:
+            return self.min_gap
+        return max(self.min_gap, self.gap_factor * sorted(self.intervals)[len(self.intervals) // 2])
+
+    def update(self, angles, timestamp):
+        """输入测量角度（度），返回滤波后的角度"""
+        if self.timestamp is not None and timestamp > self.timestamp:
+            self.intervals.append(timestamp - self.timestamp)
+        if self.timestamp is None or not 0 < timestamp - self.timestamp <= self.gap_limit():
+            if self.timestamp is not None and timestamp == self.timestamp:
+                return self.angle
+            self.reset(angles, timestamp)
+            return self.angle
+        dt = timestamp - self.timestamp
+        self.timestamp = timestamp
+        q = self.q
+        tau = self.tau
+        decay = math.exp(-dt / tau)
+        gain = tau * (1 - decay)  # 衰减角速度在 dt 内的积分
+
+        # 预测（dt 远小于 tau 时与匀速模型一致：q·dt³/3、q·dt²/2、q·dt）
+        self.angle = self.angle + gain * self.rate
+        self.rate = decay * self.rate
+        self.p00 = self.p00 + gain * (2 * self.p01 + gain * self.p11) + \
+            q * tau * tau * (dt - 2 * gain + tau * (1 - decay * decay) / 2)
+        self.p01 = decay * (self.p01 + gain * self.p11) + q * gain * gain / 2
+        self.p11 = decay * decay * self.p11 + q * tau * (1 - decay * decay) / 2
+
+        # 更新（新息按 ±180 度回绕）
+        innovation = (np.asarray(angles) - self.angle + 180.0) % 360.0 - 180.0
+        s = self.p00 + self.r
+        k0 = self.p00 / s
+        k1 = self.p01 / s
+        self.angle = (self.angle + k0 * innovation + 180.0) % 360.0 - 180.0
+        self.rate = self.rate + k1 * innovation
+        self.p11 = self.p11 - k1 * self.p01
+        self.p00 = (1 - k0) * self.p00
+        self.p01 = (1 - k0) * self.p01
+        return self.angle
@@ -1,36 +1,52 @@
 import time
 import cv2
 import numpy as np
+from ..frame_context import FrameContext
+from ...utils.metrics import metrics
 
 class VisualRecognition:
-    def __init__(self,user_id=None):
+    def __init__(self,user_id=None, face_detector=None, annotate=True):
         from .face_detection import FaceDetector
         from .head_pose_detector import HeadPoseDetector
         from .gaze_tracking import GazeTracker
+        from .pose_tracker import PoseTracker
 
         self.user_id = user_id
-        self.face_detector = FaceDetector()
+        # 面部网格模型可由多个会话共享，头部姿态和视线状态按会话独立
+        self.face_detector = face_detector or FaceDetector()
+        self.pose_tracker = PoseTracker(self.face_detector.face_3d)
         self.head_detector = HeadPoseDetector()
         self.gaze_tracker = GazeTracker()
         self.last_action = None
         self.last_gaze_status = "center"
         self.gaze_away_start_time = None
         self.DISTRACTION_THRESHOLD = 1.5
+        # 是否在帧上绘制可视化信息（服务端为纯分析模式，不复制也不绘制帧）
+        self.annotate = annotate
 
-    def process_frame(self, frame):
-        image = frame.copy()
-        face_data = self.face_detector.detect_face(image)
+    def process_frame(self, frame, context=None):
+        # 与手势识别共用同一帧的预处理结果
+        if context is None:
+            context = FrameContext(frame)
+        with metrics.timer('face_detect'):
+            face_data = self.face_detector.detect_face(frame, context, self.pose_tracker)
         visual_recognized_text = "视觉数据为空"
+        head_result = None
+        gaze_result = None
+        face_box = None
         
         if face_data:
             landmarks = face_data['landmarks']
             rotation_matrix = face_data['rotation_matrix']
+            face_box = self.face_box(face_data['face_2d'], context.width, context.height)
 
             # 头部姿态检测
-            head_result = self.head_detector.detect_head_movement(rotation_matrix)
+            with metrics.timer('head_pose'):
+                head_result = self.head_detector.detect_head_movement(rotation_matrix, context.timestamp_ms / 1000.0)
 
             # 视线检测
-            gaze_result = self.gaze_tracker.track_gaze(landmarks, image)
+            with metrics.timer('gaze'):
+                gaze_result = self.gaze_tracker.track_gaze(landmarks, frame, context)
             
             # 终端输出点头/摇头
             if head_result['action'] in ("NOD", "SHAKE") and head_result['action'] != self.last_action:
@@ -64,7 +80,27 @@ class VisualRecognition:
                 self.gaze_away_start_time = None
                 self.last_gaze_status = "center"
 
-            # 可视化部分同前
+        image = self.draw_annotations(frame.copy(), head_result, gaze_result) if self.annotate else frame
+        return {
+            'frame': image,
+            'text': visual_recognized_text,
+            'head': head_result,
+            'gaze': gaze_result,
+            'face_box': face_box
+        }
+
+    @staticmethod
+    def face_box(face_2d, width, height, margin=0.6):
+        """由姿态估计用的6个关键点估算人脸的归一化包围框（关键点不含下巴和脸颊，向外扩展）"""
+        x1, y1 = face_2d.min(axis=0)
+        x2, y2 = face_2d.max(axis=0)
+        dx, dy = (x2 - x1) * margin, (y2 - y1) * margin
+        return (max(0.0, (x1 - dx) / width), max(0.0, (y1 - dy) / height),
+                min(1.0, (x2 + dx) / width), min(1.0, (y2 + dy) / height))
+
+    def draw_annotations(self, image, head_result, gaze_result):
+        """在帧上绘制头部姿态和视线信息（仅本地调试或调试画面通道使用）"""
+        if head_result is not None:
             cv2.putText(image, f"Pitch: {head_result['angles']['pitch']:+.1f}°", (10, 230),
                         cv2.FONT_HERSHEY_SIMPLEX, 0.6, (200, 0, 200), 2)
             cv2.putText(image, f"Yaw: {head_result['angles']['yaw']:+.1f}°", (10, 260),
@@ -85,13 +121,14 @@ class VisualRecognition:
                 cv2.putText(image, text, (image.shape[1] // 2 - text_size[0] // 2, image.shape[0] // 2),
                             cv2.FONT_HERSHEY_SIMPLEX, 1.2, (0, 255, 0), 3)
 
+        if gaze_result is not None:
             cv2.putText(image, f"Gaze: {gaze_result['direction']}", (30, 140),
                         cv2.FONT_HERSHEY_SIMPLEX, 0.6, (200, 0, 200), 2)
 
             for pt in gaze_result["left_eye"]["iris_landmarks"]:
-                cv2.circle(image, pt, 1, (0, 0, 255), -1)
+                cv2.circle(image, (int(pt[0]), int(pt[1])), 1, (0, 0, 255), -1)
             for pt in gaze_result["right_eye"]["iris_landmarks"]:
-                cv2.circle(image, pt, 1, (0, 0, 255), -1)
+                cv2.circle(image, (int(pt[0]), int(pt[1])), 1, (0, 0, 255), -1)
 
             if gaze_result["left_eye"]["pupil_center"]:
                 cv2.circle(image, (int(gaze_result["left_eye"]["pupil_center"][0]), int(gaze_result["left_eye"]["pupil_center"][1])), 3, (255, 0, 255), -1)
@@ -107,9 +144,7 @@ class VisualRecognition:
                         int(pupil[1] + gaze_vec[1] * 50)
                     )
                     cv2.arrowedLine(image, (int(pupil[0]), int(pupil[1])), end_point, (0, 255, 0), 2)
-                
-        return {
-            'frame': image,
-            'text': visual_recognized_text
-        }
+
+        return image
+
 
@@ -0,0 +1,206 @@
+import itertools
+import multiprocessing
+import sys
+import zlib
+from contextlib import contextmanager
+import gevent
+from gevent.event import AsyncResult
+from gevent.lock import Semaphore
+from . import inference_worker
+from .inference_worker import recv_or_none
+
+
+def _picklable(data):
+    """跨进程发送前将 memoryview 负载转换为 bytes"""
+    return {
+        key: bytes(value) if isinstance(value, memoryview) else value
+        for key, value in data.items()
+    }
+
+
+@contextmanager
+def _worker_entry_main():
+    """
+    spawn 会在子进程中重新执行父进程的主模块（python -m backend.app 时即整个服务端），
+    启动子进程期间把主模块换成推理入口模块，子进程只执行该模块
+    """
+    main_module = sys.modules['__main__']
+    sys.modules['__main__'] = inference_worker
+    try:
+        yield
+    finally:
+        sys.modules['__main__'] = main_module
+
+
+class _Worker:
+    """Hub 侧对单个工作进程的句柄"""
+    def __init__(self, index):
+        self.index = index
+        self.process = None
+        self.conn = None
+        self.send_lock = Semaphore()
+        self.pending = set()  # 该进程上尚未返回的请求ID
+
+
+class InferenceWorkerPool:
+    """
+    推理进程池
+
+    - MediaPipe / FaceMesh / SenseVoice 等 CPU 密集计算放到 N 个子进程中执行，不再阻塞 gevent hub
+    - 按 user_id 哈希做会话亲和，同一车辆的帧始终落在同一进程，时序状态保留在该进程内
+    - Hub 通过线程池收发管道消息，协程以 AsyncResult 协作等待结果
+    """
+    def __init__(self, num_workers=2, max_sessions=16, idle_timeout=300.0, timeout=30.0, warmup=False):
+        self.num_workers = max(1, int(num_workers))
+        self.max_sessions = max_sessions
+        self.idle_timeout = idle_timeout
+        self.timeout = timeout
+        self.warmup_models = warmup
+        self.workers = [_Worker(i) for i in range(self.num_workers)]
+        self._results = {}  # request_id -> AsyncResult
+        self._request_ids = itertools.count()
+        self._context = multiprocessing.get_context('spawn')
+        self._started = False
+
+    def _ensure_started(self):
+        """首次使用时再启动子进程，避免子进程导入本模块时递归创建进程池"""
+        if self._started:
+            return
+        self._started = True
+        threadpool = gevent.get_hub().threadpool
+        # 每个进程常驻一个接收线程，另需发送线程
+        threadpool.maxsize = max(threadpool.maxsize, 2 * self.num_workers + 4)
+        for worker in self.workers:
+            self._start_worker(worker)
+
+    def _start_worker(self, worker):
+        # 使用两条单向管道（os.pipe，阻塞读写）：gevent 补丁后的双向 Pipe 基于非阻塞 socket，不能在线程池中阻塞读取
+        request_reader, request_writer = self._context.Pipe(duplex=False)
+        result_reader, result_writer = self._context.Pipe(duplex=False)
+        worker.conn = request_writer
+        worker.process = self._context.Process(
+            target=inference_worker.main,
+            # 会话上限按进程均分
+            args=(request_reader, result_writer,
+                  -(-self.max_sessions // self.num_workers), self.idle_timeout, self.warmup_models),
+            daemon=True,
+            name=f'inference-worker-{worker.index}'
+        )
+        with _worker_entry_main():
+            worker.process.start()
+        request_reader.close()
+        result_writer.close()
+        gevent.spawn(self._collect_results, worker, request_writer, result_reader)
+        print(f"推理进程已启动: {worker.process.name} (pid={worker.process.pid})")
+
+    def _collect_results(self, worker, conn, result_conn):
+        """接收协程：在线程池中阻塞读取管道，结果分发给等待中的请求"""
+        threadpool = gevent.get_hub().threadpool
+        while True:
+            message = threadpool.apply(recv_or_none, (result_conn,))
+            if message is None:
+                break
+            request_id, result = message
+            worker.pending.discard(request_id)
+            async_result = self._results.pop(request_id, None)
+            if async_result is not None:
+                async_result.set(result)
+
+        # 进程异常退出：通知等待中的请求并重启该进程
+        for request_id in list(worker.pending):
+            async_result = self._results.pop(request_id, None)
+            if async_result is not None:
+                async_result.set({'error': '推理进程异常退出'})
+        worker.pending.clear()
+        result_conn.close()
+        if worker.conn is conn:
+            print(f"推理进程已退出，正在重启: {worker.process.name}")
+            self._start_worker(worker)
+
+    def _worker_for(self, user_id):
+        if isinstance(user_id, int):
+            key = user_id
+        else:
+            key = zlib.crc32(str(user_id).encode('utf-8'))
+        return self.workers[key % self.num_workers]
+
+    def _send(self, worker, message):
+        with worker.send_lock:
+            gevent.get_hub().threadpool.apply(worker.conn.send, (message,))
+
+    def warmup(self):
+        """启动时拉起所有工作进程，各进程加载并预热模型"""
+        self.warmup_models = True
+        self._ensure_started()
+
+    def attach(self, user_id):
+        self._ensure_started()
+        self._send(self._worker_for(user_id), ('attach', user_id))
+
+    def detach(self, user_id):
+        if self._started:
+            self._send(self._worker_for(user_id), ('detach', user_id))
+
+    def process_request(self, user_id, wake_word, data, is_emergency=False, is_wake=False):
+        """提交一帧到会话所在进程，协作等待推理结果"""
+        self._ensure_started()
+        worker = self._worker_for(user_id)
+        request_id = next(self._request_ids)
+        async_result = AsyncResult()
+        self._results[request_id] = async_result
+        worker.pending.add(request_id)
+        try:
+            self._send(worker, ('process', request_id, user_id, wake_word,
+                                _picklable(data), is_emergency, is_wake))
+            return async_result.get(timeout=self.timeout)
+        except gevent.Timeout:
+            return {'error': '推理超时'}
+        finally:
+            self._results.pop(request_id, None)
+            worker.pending.discard(request_id)
+
+    def collect_metrics(self, timeout=5.0):
+        """采集各工作进程的指标快照，返回 [(进程标签, 快照), ...]"""
+        if not self._started:
+            return []
+        requests = []
+        for worker in self.workers:
+            request_id = next(self._request_ids)
+            async_result = AsyncResult()
+            self._results[request_id] = async_result
+            worker.pending.add(request_id)
+            try:
+                self._send(worker, ('metrics', request_id))
+            except (OSError, ValueError, AttributeError):
+                self._results.pop(request_id, None)
+                worker.pending.discard(request_id)
+                continue
+            requests.append((worker, request_id, async_result))
+
+        snapshots = []
+        for worker, request_id, async_result in requests:
+            try:
+                snapshot = async_result.get(timeout=timeout)
+                if 'histograms' in snapshot:
+                    snapshots.append((f'worker-{worker.index}', snapshot))
+            except gevent.Timeout:
+                pass
+            finally:
+                self._results.pop(request_id, None)
+                worker.pending.discard(request_id)
+        return snapshots
+
+    def close(self):
+        """停止所有工作进程"""
+        for worker in self.workers:
+            # 先解除句柄，避免接收协程把正常退出当作异常而重启进程
+            conn, worker.conn = worker.conn, None
+            if worker.process is not None and worker.process.is_alive():
+                try:
+                    conn.send(('stop',))
+                except (OSError, ValueError):
+                    pass
+                worker.process.join(timeout=2)
+                if worker.process.is_alive():
+                    worker.process.terminate()
+        self._started = False
@@ -1,8 +1,9 @@
-from flask import Blueprint, request, jsonify
+from flask import Blueprint, request, jsonify, Response
 from werkzeug.security import generate_password_hash
 from ..extensions import db
 from ..models import User, PublicUser
 from ..utils.decorators import token_required
+from .websocket import debug_channel
 
 admin_bp = Blueprint('admin', __name__)
 
@@ -108,4 +109,16 @@ def manage_user(current_user, id):
             return jsonify({'message': '用户删除成功'}), 200
         except Exception as e:
             db.session.rollback()
-            return jsonify({'error': f'删除失败: {str(e)}'}), 500
\ No newline at end of file
+            return jsonify({'error': f'删除失败: {str(e)}'}), 500
+
+# 调试画面：等待指定车辆下一帧带标注的画面（服务端默认不绘制，仅在此请求时按采样间隔生成）
+@admin_bp.route('/api/admin/debug_frame/<user_id>', methods=['GET'])
+@token_required
+def admin_debug_frame(current_user, user_id):
+    if current_user.role != 'admin':
+        return jsonify({'error': '权限不足'}), 403
+
+    jpeg = debug_channel.wait_frame(user_id, timeout=request.args.get('timeout', 5.0, type=float))
+    if jpeg is None:
+        return jsonify({'error': '暂无调试画面'}), 404
+    return Response(jpeg, mimetype='image/jpeg')
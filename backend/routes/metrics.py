@@ -0,0 +1,13 @@
+from flask import Blueprint, Response
+from ..utils.metrics import metrics, render_prometheus
+from .websocket import session_manager
+
+metrics_bp = Blueprint('metrics', __name__)
+
+@metrics_bp.route('/api/metrics', methods=['GET'])
+def api_metrics():
+    """Prometheus 指标：Hub 进程 + 各推理进程的阶段延迟、队列深度、丢弃计数"""
+    snapshots = [('hub', metrics.snapshot())]
+    if hasattr(session_manager, 'collect_metrics'):
+        snapshots.extend(session_manager.collect_metrics())
+    return Response(render_prometheus(snapshots), mimetype='text/plain; version=0.0.4')
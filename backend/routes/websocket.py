@@ -1,9 +1,85 @@
 import json
-from ..multimodal.multimodal import MultimodalProcessor
-from ..command_process import process_system_info, process_user_command
+import multiprocessing
+import re
+import uuid
+import gevent
+from gevent.lock import Semaphore
+from ..multimodal.session import SessionManager
+from ..multimodal.worker_pool import InferenceWorkerPool
+from ..multimodal.binary_frame import is_binary_frame, parse_binary_frame
+from ..multimodal.frame_queue import LatestFrameQueue
+from ..multimodal.debug_frames import DebugFrameChannel
+from ..command_process import process_system_info, process_user_command, load_instruction_set
+from ..task_scheduler import TaskPriority, PriorityScheduler
+from ..loadtest.recording import SessionRecorder
+from ..config import Config
+from ..utils.metrics import metrics
 
-# 初始化多模态处理器
-multimodal_processor = MultimodalProcessor()
+# 初始化多模态会话表（每辆车独立时序状态，重模型共享）
+# 配置了推理进程（INFERENCE_WORKERS > 0，默认关闭）时，会话按 user_id 亲和分布到各进程，CPU 密集推理不再阻塞 gevent hub
+if Config.INFERENCE_WORKERS > 0:
+    session_manager = InferenceWorkerPool(
+        num_workers=Config.INFERENCE_WORKERS,
+        max_sessions=Config.MULTIMODAL_MAX_SESSIONS,
+        idle_timeout=Config.MULTIMODAL_SESSION_IDLE_TIMEOUT
+    )
+else:
+    session_manager = SessionManager(
+        max_sessions=Config.MULTIMODAL_MAX_SESSIONS,
+        idle_timeout=Config.MULTIMODAL_SESSION_IDLE_TIMEOUT
+    )
+
+# 调试画面通道：有订阅者时才按采样间隔绘制标注帧
+debug_channel = DebugFrameChannel(min_interval=Config.DEBUG_FRAME_INTERVAL)
+
+# 录制 command 帧（压测回放用），首个连接建立时在 Hub 进程中创建
+recorder = None
+
+
+def get_recorder():
+    """
+    获取录制器（未配置 WS_RECORD_PATH 时返回 None）
+
+    只在 Hub 进程中打开录制文件：子进程导入本模块时若以 'wb' 重新打开，会截断 Hub 正在写入的录制
+    """
+    global recorder
+    if recorder is None and Config.WS_RECORD_PATH and multiprocessing.parent_process() is None:
+        recorder = SessionRecorder(Config.WS_RECORD_PATH)
+    return recorder
+
+# 当前连接的帧队列与调度器，供 /api/metrics 采集队列深度
+active_connections = {}  # SerializedWebSocket -> (LatestFrameQueue, PriorityScheduler)
+metrics.gauge('websocket_connections', lambda: len(active_connections))
+metrics.gauge('frame_queue_depth', lambda: sum(q.pending for q, _ in list(active_connections.values())))
+metrics.gauge('llm_queue_depth', lambda: sum(s.pending for _, s in list(active_connections.values())))
+metrics.gauge('llm_tasks_running', lambda: sum(s.running for _, s in list(active_connections.values())))
+
+class SerializedWebSocket:
+    """接收协程与推理协程共用同一连接，发送需串行化"""
+    def __init__(self, ws):
+        self.ws = ws
+        self._send_lock = Semaphore()
+
+    def receive(self):
+        return self.ws.receive()
+
+    def send(self, message, binary=None):
+        with self._send_lock:
+            return self.ws.send(message, binary)
+
+def process_loop(ws, frame_queue, scheduler):
+    """推理协程：每次只处理最新的一帧，大模型请求交给优先级调度器"""
+    try:
+        while True:
+            data = frame_queue.get()
+            if data is None:
+                break
+            try:
+                handle_command(ws, data, scheduler)
+            except Exception as e:
+                ws.send(json.dumps({'error': str(e)}))
+    except Exception:
+        pass
 
 def websocket_handler(environ, start_response):
     ws = environ.get('wsgi.websocket')
@@ -11,14 +87,44 @@ def websocket_handler(environ, start_response):
         start_response('404 Not Found', [('Content-Type','text/plain')])
         return [b'Not a WebSocket request']
 
+    # 接收（当前协程）与推理（独立协程）解耦，推理期间到达的帧只保留最新一帧
+    ws = SerializedWebSocket(ws)
+    frame_queue = LatestFrameQueue()
+    scheduler = PriorityScheduler(
+        max_concurrency=Config.LLM_MAX_CONCURRENCY,
+        max_pending=Config.LLM_MAX_PENDING
+    )
+    active_connections[ws] = (frame_queue, scheduler)
+    gevent.spawn(process_loop, ws, frame_queue, scheduler)
+    attached_user_id = None
+    recorder = get_recorder()
+    record_id = recorder.new_connection() if recorder is not None else None
     try:
         while True:
             message = ws.receive()
+            if message is None:
+                break
             if message:
                 try:
-                    data = json.loads(message)
+                    # 二进制帧：头部 + 原始JPEG/PCM；文本帧：兼容旧客户端的JSON协议
+                    if is_binary_frame(message):
+                        data = parse_binary_frame(message)
+                    else:
+                        data = json.loads(message)
                     # print("接收到消息:", data)
-                    handle_message(ws, data)
+                    # 连接首次携带 user_id 时挂载到对应会话
+                    user_id = data.get('user_id')
+                    if data.get('type') == 'command' and user_id != attached_user_id:
+                        if attached_user_id is not None:
+                            session_manager.detach(attached_user_id)
+                        session_manager.attach(user_id)
+                        attached_user_id = user_id
+                    if data.get('type') == 'command':
+                        if recorder is not None:
+                            recorder.record(record_id, message)
+                        frame_queue.put(data)
+                    else:
+                        handle_message(ws, data)
                 except json.JSONDecodeError:
                     ws.send(json.dumps({'error': 'JSON解析错误'}))
                 except Exception as e:
@@ -26,42 +132,88 @@ def websocket_handler(environ, start_response):
     except Exception:
         pass
     finally:
-        print("WebSocket连接断开!")
+        # 推理协程处理完当前帧后自行退出
+        frame_queue.close()
+        scheduler.close()
+        active_connections.pop(ws, None)
+        if recorder is not None:
+            recorder.flush()
+        if attached_user_id is not None:
+            session_manager.detach(attached_user_id)
+        print(f"WebSocket连接断开! 接收帧数: {frame_queue.received}, "
+              f"处理帧数: {frame_queue.processed}, 丢弃帧数: {frame_queue.dropped}, "
+              f"抢占任务数: {scheduler.preempted}, 丢弃任务数: {scheduler.dropped}")
     return []
 
 def handle_message(ws, data):
-    """统一消息分发处理"""
+    """统一消息分发处理（command 帧不经过这里：由推理协程按优先级提交到调度器）"""
     msg_type = data.get('type')
     handler = {
-        'heartbeat': handle_heartbeat,
-        'command': handle_command
+        'heartbeat': handle_heartbeat
     }.get(msg_type)
-    
+    if handler is None:
+        ws.send(json.dumps({'error': f'未知消息类型: {msg_type}'}))
+        return
+
     handler(ws, data)
 
 def handle_heartbeat(ws, data):
     """心跳处理模块化"""
     ws.send(json.dumps({'type':'heartbeat','status':'alive'}))
 
-# 导入优先级常量
-from enum import IntEnum
-# 定义任务优先级枚举
-class TaskPriority(IntEnum):
-    EMERGENCY = 1          # 疲劳驾驶检测 - 最高优先级
-    WAKE_WORD = 2          # 唤醒词 - 中优先级
-    NORMAL_COMMAND = 3     # 普通命令 - 最低优先级
+# 手势识别的确认、拒绝，视觉识别的分心状态，语音识别的“已注意道路”（高优先级）
+EMERGENCY_CODES = ['2300', '2800', '2900', '3000']
+
+# 大模型超时时紧急事件的本地兜底反馈：只对分心/疲劳提醒兜底，
+# 确认、拒绝等决策必须由大模型给出，超时时返回错误而不是本地替用户做决定
+EMERGENCY_FALLBACK_FEEDBACK = {
+    '2300': '检测到您可能分心或疲劳，请注意道路安全！'
+}
+
+def load_emergency_inputs():
+    """从指令集中提取紧急指令的输入文本 -> 指令编码"""
+    return {
+        instr['input']: instr['response']
+        for instr in load_instruction_set().get('instructions', [])
+        if instr.get('response') in EMERGENCY_CODES
+    }
+
+def normalize_speech_text(text):
+    """去掉语音识别文本中的空白和标点，用于与指令输入精确比较"""
+    return re.sub(r'[\W_]+', '', text)
+
+EMERGENCY_INPUTS = load_emergency_inputs()
+EMERGENCY_SPEECH_INPUTS = {normalize_speech_text(text): code for text, code in EMERGENCY_INPUTS.items()}
+
+def match_emergency_code(part, info):
+    """在请求大模型之前，根据识别文本预判是否为紧急事件，返回指令编码"""
+    if part == 'image':
+        # 手势和视觉信息为 "手势,视觉" 形式，逐项精确匹配
+        for item in info.split(','):
+            if item in EMERGENCY_INPUTS:
+                return EMERGENCY_INPUTS[item]
+        return None
+    # 语音整句去标点后精确匹配（"确认导航到公司" 是普通指令，不是紧急确认）
+    return EMERGENCY_SPEECH_INPUTS.get(normalize_speech_text(info))
+
+def classify_part_priority(part, info, wake_word):
+    """请求大模型之前确定调度优先级"""
+    if part == 'audio' and info == wake_word:
+        return TaskPriority.WAKE_WORD
+    if match_emergency_code(part, info):
+        return TaskPriority.EMERGENCY
+    return TaskPriority.NORMAL_COMMAND
 
 # 新增：确定任务优先级的函数
 def determine_task_priority(image_info, audio_info, wake_word):
     """根据多模态处理结果确定任务优先级"""
     # 1. 手势识别的确认、拒绝，视觉识别的分心状态，语音识别的“已注意道路”（高优先级）
-    emergency_codes = ['2300', '2800', '2900', '3000']
     # 检查图像中的紧急指令
-    if isinstance(image_info, dict) and image_info.get('instruction_code') in emergency_codes:
+    if isinstance(image_info, dict) and image_info.get('instruction_code') in EMERGENCY_CODES:
         return TaskPriority.EMERGENCY
         
     # 检查语音中的紧急指令  
-    if isinstance(audio_info, dict) and audio_info.get('instruction_code') in emergency_codes:
+    if isinstance(audio_info, dict) and audio_info.get('instruction_code') in EMERGENCY_CODES:
         return TaskPriority.EMERGENCY
 
     # 2. 检查唤醒词（中优先级）
@@ -71,16 +223,23 @@ def determine_task_priority(image_info, audio_info, wake_word):
     # 3. 默认普通命令（低优先级）
     return TaskPriority.NORMAL_COMMAND
 
-def handle_command(ws, data):
+def handle_command(ws, data, scheduler=None):
     """结果处理模块化"""
     is_emergency = data.get('is_emergency')
     user_id = data.get('user_id')
     is_wake = data.get('is_wake')
     wake_word = data.get('wake_word')
+    capture_ts = data.get('capture_ts')
     
     print("后端接收请求")
     # print("后端接收请求:", data)
-    result = multimodal_processor.process_request(data, is_emergency, is_wake)
+    if debug_channel.should_render(user_id):
+        data['debug_frame'] = True
+    with metrics.timer('inference'):
+        result = session_manager.process_request(user_id, wake_word, data, is_emergency, is_wake)
+    debug_frame = result.pop('debug_frame', None)
+    if debug_frame:
+        debug_channel.publish(user_id, debug_frame)
     print("后端处理请求:", result)
     
     if result.get('error'):
@@ -91,33 +250,101 @@ def handle_command(ws, data):
     audio = result.get('audio') or '音频数据为空'
     
     if any([gesture != '无手势', video != '视觉数据为空', audio != '音频数据为空']):
+        # 手势/视觉（系统指令）与语音（用户指令）的大模型请求并发发出，
+        # 各自返回后立即作为独立的 response 推送，前端按 request_id 合并
+        request_id = uuid.uuid4().hex
         image_info = f"{gesture or '无手势'},{video or '视觉数据为空'}"
         print("手势和视觉信息:", image_info)
-        # ============ 定义手势和视觉相关为系统指令，音频相关为用户指令 ============
+        print("音频信息:", audio)
+
+        jobs = []
         if image_info != '无手势,视觉数据为空':
-            image_info = process_system_info(image_info, user_id)
-        print("后端处理后的手势和视觉信息:", image_info)
-        
-        if audio == wake_word:
-            audio_info = wake_word
+            jobs.append(('image', process_image_part, image_info))
+        if audio != '音频数据为空':
+            jobs.append(('audio', process_audio_part, audio))
+
+        # 按优先级提交到调度器：紧急事件插队并取消过时的普通请求
+        greenlets = []
+        for part, handler, info in jobs:
+            args = (ws, request_id, part, len(jobs), handler, info, user_id, wake_word, is_emergency, capture_ts)
+            if scheduler is not None:
+                scheduler.submit(classify_part_priority(part, info, wake_word), send_response_part, *args)
+            else:
+                greenlets.append(gevent.spawn(send_response_part, *args))
+        gevent.joinall(greenlets)
+
+def process_image_part(image_info, user_id, wake_word):
+    """手势和视觉信息 -> 系统指令"""
+    # ============ 定义手势和视觉相关为系统指令，音频相关为用户指令 ============
+    image_info = process_system_info(image_info, user_id)
+    print("后端处理后的手势和视觉信息:", image_info)
+    return image_info, '音频数据为空'
+
+def process_audio_part(audio, user_id, wake_word):
+    """语音信息 -> 用户指令（唤醒词无需请求大模型）"""
+    audio_info = audio
+    if audio_info != wake_word:
+        audio_info = process_user_command(audio_info, user_id)
+    print("后端处理后的音频信息:", audio_info)
+    return '无手势,视觉数据为空', audio_info
+
+def emergency_fallback(part, info):
+    """紧急事件的本地兜底结果（不经过大模型）"""
+    code = match_emergency_code(part, info)
+    result = {
+        'instruction_code': code,
+        'decision': '',
+        'feedback': EMERGENCY_FALLBACK_FEEDBACK.get(code, '')
+    }
+    if part == 'image':
+        return result, '音频数据为空'
+    return '无手势,视觉数据为空', result
+
+def send_response_part(ws, request_id, part, parts, handler, info, user_id, wake_word, is_emergency,
+                       capture_ts=None):
+    """处理单个部分并立即推送响应"""
+    with metrics.timer(f'response_{part}'):
+        _send_response_part(ws, request_id, part, parts, handler, info, user_id, wake_word, is_emergency,
+                            capture_ts)
+
+def _send_response_part(ws, request_id, part, parts, handler, info, user_id, wake_word, is_emergency,
+                        capture_ts):
+    try:
+        code = match_emergency_code(part, info)
+        if code:
+            # 紧急事件保证响应时延：大模型超过时限则使用本地兜底结果（仅分心/疲劳提醒）
+            try:
+                with gevent.Timeout(Config.EMERGENCY_RESPONSE_DEADLINE):
+                    image_info, audio_info = handler(info, user_id, wake_word)
+            except gevent.Timeout:
+                if code not in EMERGENCY_FALLBACK_FEEDBACK:
+                    print("紧急事件大模型响应超时，确认/拒绝类指令不做本地兜底")
+                    metrics.inc('emergency_timeouts_total')
+                    ws.send(json.dumps({'error': '紧急事件大模型响应超时', 'request_id': request_id, 'part': part}))
+                    return
+                print("紧急事件大模型响应超时，使用本地兜底结果")
+                metrics.inc('emergency_fallbacks_total')
+                image_info, audio_info = emergency_fallback(part, info)
         else:
-            audio_info = audio or '音频数据为空'
-        print("音频信息:", audio_info)
-        
-        if audio_info != '音频数据为空' and audio_info != wake_word:
-            audio_info = process_user_command(audio_info, user_id)
-        print("后端处理后的音频信息:", audio_info)
-        
-        if any([image_info != '无手势,视觉数据为空', audio_info != '音频数据为空']):
-            # 任务优先级
-            priority = determine_task_priority(image_info, audio_info, wake_word)
-
-            # 如果在紧急状况下，priority为1（EMERGENCY）才发送响应
-            # 如果在非紧急状况下，直接发送响应
-            if (is_emergency and priority == TaskPriority.EMERGENCY) or (not is_emergency):
-                ws.send(json.dumps({
-                    'type':'response',
-                    'priority': priority,
-                    'image_info': image_info,
-                    'audio_info': audio_info
-                }))
\ No newline at end of file
+            image_info, audio_info = handler(info, user_id, wake_word)
+        if image_info == '无手势,视觉数据为空' and audio_info == '音频数据为空':
+            return
+
+        # 任务优先级
+        priority = determine_task_priority(image_info, audio_info, wake_word)
+
+        # 如果在紧急状况下，priority为1（EMERGENCY）才发送响应
+        # 如果在非紧急状况下，直接发送响应
+        if (is_emergency and priority == TaskPriority.EMERGENCY) or (not is_emergency):
+            ws.send(json.dumps({
+                'type':'response',
+                'request_id': request_id,
+                'part': part,
+                'parts': parts,
+                'capture_ts': capture_ts,  # 回传采集时间，客户端据此统计端到端时延
+                'priority': priority,
+                'image_info': image_info,
+                'audio_info': audio_info
+            }))
+    except Exception as e:
+        ws.send(json.dumps({'error': str(e), 'request_id': request_id, 'part': part}))
@@ -0,0 +1,103 @@
+import heapq
+import itertools
+import time
+from enum import IntEnum
+import gevent
+from .utils.metrics import metrics
+
+# 定义任务优先级枚举
+class TaskPriority(IntEnum):
+    EMERGENCY = 1          # 疲劳驾驶检测 - 最高优先级
+    WAKE_WORD = 2          # 唤醒词 - 中优先级
+    NORMAL_COMMAND = 3     # 普通命令 - 最低优先级
+
+class ScheduledTask:
+    """调度队列中的任务"""
+    def __init__(self, priority, seq, func, args):
+        self.priority = priority
+        self.seq = seq
+        self.func = func
+        self.args = args
+        self.enqueued_at = time.perf_counter()
+
+    def __lt__(self, other):
+        return (self.priority, self.seq) < (other.priority, other.seq)
+
+class PriorityScheduler:
+    """
+    单车辆的优先级任务调度器
+
+    - 按 TaskPriority 出队，同优先级先进先出
+    - 普通任务受并发上限约束，紧急任务不受限制、立即执行
+    - 紧急任务到达时取消正在执行的普通任务（其结果已过时）
+    - 等待队列超过上限时丢弃最旧的普通任务
+    """
+    def __init__(self, max_concurrency=2, max_pending=8):
+        self.max_concurrency = max(1, int(max_concurrency))
+        self.max_pending = max(1, int(max_pending))
+        self._queue = []
+        self._seq = itertools.count()
+        self._running = {}  # greenlet -> ScheduledTask
+        self.closed = False
+        self.preempted = 0
+        self.dropped = 0
+
+    def submit(self, priority, func, *args):
+        """提交任务"""
+        if self.closed:
+            return
+        if priority == TaskPriority.EMERGENCY:
+            self._preempt_normal()
+        heapq.heappush(self._queue, ScheduledTask(priority, next(self._seq), func, args))
+        self._trim()
+        self._dispatch()
+
+    def _preempt_normal(self):
+        """取消正在执行的普通任务"""
+        for greenlet, task in list(self._running.items()):
+            if task.priority == TaskPriority.NORMAL_COMMAND:
+                self.preempted += 1
+                metrics.inc('llm_tasks_preempted_total')
+                greenlet.kill(block=False)
+
+    def _trim(self):
+        """等待队列超过上限时丢弃最旧的普通任务"""
+        while len(self._queue) > self.max_pending:
+            normal_tasks = [t for t in self._queue if t.priority == TaskPriority.NORMAL_COMMAND]
+            if not normal_tasks:
+                break
+            self._queue.remove(min(normal_tasks, key=lambda t: t.seq))
+            heapq.heapify(self._queue)
+            self.dropped += 1
+            metrics.inc('llm_tasks_dropped_total')
+
+    def _dispatch(self):
+        while self._queue and not self.closed:
+            task = self._queue[0]
+            if task.priority != TaskPriority.EMERGENCY and len(self._running) >= self.max_concurrency:
+                break
+            heapq.heappop(self._queue)
+            metrics.observe('llm_queue_wait', time.perf_counter() - task.enqueued_at)
+            greenlet = gevent.spawn(task.func, *task.args)
+            self._running[greenlet] = task
+            # 正常结束、异常或被取消（包括尚未开始即被取消）时都会回调
+            greenlet.link(self._on_done)
+
+    def _on_done(self, greenlet):
+        self._running.pop(greenlet, None)
+        self._dispatch()
+
+    @property
+    def pending(self):
+        return len(self._queue)
+
+    @property
+    def running(self):
+        return len(self._running)
+
+    def close(self):
+        """连接断开时清空队列并取消所有任务"""
+        self.closed = True
+        self._queue.clear()
+        for greenlet in list(self._running):
+            greenlet.kill(block=False)
@@ -8,6 +8,7 @@ import base64
 import json
 import uuid
 import requests
+from .utils.metrics import metrics
 
 # 音色列表
 VOICE_TYPES = [
@@ -42,6 +43,7 @@ api_url = f"https://{host}/api/v1/tts"
 
 header = {"Authorization": f"Bearer;{access_token}"}
 
+@metrics.timed('tts')
 def generate_speech(text, voice_index=0):
     """
     生成语音数据
@@ -0,0 +1,241 @@
+import bisect
+import os
+import resource
+import time
+from collections import deque
+from contextlib import contextmanager
+from functools import wraps
+from gevent import monkey
+
+# 指标在推理线程池的原生线程中更新，使用未被 gevent 替换的锁和线程局部存储
+# （补丁后的 threading.local 按协程隔离）
+_allocate_lock = monkey.get_original('_thread', 'allocate_lock')
+_thread_local = monkey.get_original('_thread', '_local')
+
+# 延迟直方图桶上界（秒），覆盖 0.5ms ~ 30s，每个数量级 6 个桶
+DEFAULT_BUCKETS = tuple(
+    round(base * scale, 6)
+    for scale in (0.0001, 0.001, 0.01, 0.1, 1.0, 10.0)
+    for base in (1, 1.5, 2, 3, 5, 7.5)
+    if 0.0005 <= base * scale <= 30
+)
+QUANTILES = (0.5, 0.95, 0.99)
+# 待合并样本超过该数量时由观测线程顺带合并
+FOLD_THRESHOLD = 4096
+
+
+class Histogram:
+    """
+    无锁热路径的延迟直方图
+
+    observe 只做一次 deque.append（原子操作），样本在采集或积压时再合并进桶计数，
+    合并使用非阻塞锁，观测线程永远不会等待。
+    """
+    def __init__(self, buckets=DEFAULT_BUCKETS):
+        self.buckets = tuple(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)  # 最后一个为 +Inf
+        self.sum = 0.0
+        self.count = 0
+        self._samples = deque()
+        self._fold_lock = _allocate_lock()
+
+    def observe(self, value):
+        self._samples.append(value)
+        if len(self._samples) > FOLD_THRESHOLD:
+            self._fold(blocking=False)
+
+    def _fold(self, blocking=True):
+        if not self._fold_lock.acquire(blocking):
+            return
+        try:
+            samples = self._samples
+            while True:
+                try:
+                    value = samples.popleft()
+                except IndexError:
+                    break
+                self.counts[bisect.bisect_left(self.buckets, value)] += 1
+                self.sum += value
+                self.count += 1
+        finally:
+            self._fold_lock.release()
+
+    def snapshot(self):
+        self._fold()
+        return {
+            'buckets': list(self.buckets),
+            'counts': list(self.counts),
+            'sum': self.sum,
+            'count': self.count
+        }
+
+
+def histogram_quantile(quantile, buckets, counts):
+    """按桶计数线性插值估算分位数（与 Prometheus histogram_quantile 一致）"""
+    total = sum(counts)
+    if total == 0:
+        return 0.0
+    rank = quantile * total
+    cumulative = 0
+    for i, count in enumerate(counts):
+        if cumulative + count >= rank and count > 0:
+            if i >= len(buckets):
+                return buckets[-1]
+            lower = buckets[i - 1] if i > 0 else 0.0
+            return lower + (buckets[i] - lower) * (rank - cumulative) / count
+        cumulative += count
+    return buckets[-1]
+
+
+class MetricsRegistry:
+    """进程内指标注册表：阶段延迟直方图、计数器、采集时计算的仪表"""
+    def __init__(self):
+        self.histograms = {}
+        # 计数器按线程累加：每个线程只写自己的字典，热路径无锁；采集时在锁内汇总
+        self._local = _thread_local()
+        self._thread_counters = []
+        self._counters_lock = _allocate_lock()  # 只在线程首次计数和采集时使用
+        self.gauges = {}
+
+    def histogram(self, stage):
+        histogram = self.histograms.get(stage)
+        if histogram is None:
+            histogram = self.histograms.setdefault(stage, Histogram())
+        return histogram
+
+    def observe(self, stage, seconds):
+        self.histogram(stage).observe(seconds)
+
+    def inc(self, name, value=1):
+        try:
+            counters = self._local.counters
+        except AttributeError:
+            counters = self._register_thread()
+        counters[name] = counters.get(name, 0) + value
+
+    def _register_thread(self):
+        counters = self._local.counters = {}
+        with self._counters_lock:
+            self._thread_counters.append(counters)
+        return counters
+
+    @property
+    def counters(self):
+        """各线程计数器之和"""
+        with self._counters_lock:
+            # dict 复制在 GIL 下一次完成，不会与所属线程的写入交错
+            per_thread = [dict(counters) for counters in self._thread_counters]
+        totals = {}
+        for counters in per_thread:
+            for name, value in counters.items():
+                totals[name] = totals.get(name, 0) + value
+        return totals
+
+    def gauge(self, name, func):
+        """注册仪表，func 在采集时调用"""
+        self.gauges[name] = func
+
+    @contextmanager
+    def timer(self, stage):
+        """计时上下文：with metrics.timer('asr'): ..."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(stage, time.perf_counter() - start)
+
+    def timed(self, stage):
+        """计时装饰器：@metrics.timed('llm_api')"""
+        def decorator(func):
+            @wraps(func)
+            def wrapper(*args, **kwargs):
+                start = time.perf_counter()
+                try:
+                    return func(*args, **kwargs)
+                finally:
+                    self.observe(stage, time.perf_counter() - start)
+            return wrapper
+        return decorator
+
+    def snapshot(self):
+        """导出可跨进程传递的指标快照"""
+        gauges = {}
+        for name, func in list(self.gauges.items()):
+            try:
+                gauges[name] = float(func())
+            except Exception:
+                continue
+        return {
+            'histograms': {stage: h.snapshot() for stage, h in list(self.histograms.items())},
+            'counters': self.counters,
+            'gauges': gauges
+        }
+
+
+def process_rss_bytes():
+    """当前进程常驻内存（字节），无 /proc 时退回峰值常驻内存"""
+    try:
+        with open('/proc/self/statm') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except (OSError, ValueError, IndexError):
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+
+def _format_labels(labels):
+    return ','.join(f'{key}="{value}"' for key, value in labels)
+
+
+def render_prometheus(snapshots, prefix='multimodal'):
+    """
+    将多个进程的指标快照渲染为 Prometheus 文本格式
+
+    snapshots: [(process_label, snapshot), ...]
+    """
+    lines = []
+    stage_metric = f'{prefix}_stage_duration_seconds'
+    quantile_metric = f'{prefix}_stage_duration_quantile_seconds'
+
+    lines.append(f'# HELP {stage_metric} Per-stage latency of the multimodal pipeline.')
+    lines.append(f'# TYPE {stage_metric} histogram')
+    for process, snapshot in snapshots:
+        for stage, h in sorted(snapshot['histograms'].items()):
+            base = [('process', process), ('stage', stage)]
+            cumulative = 0
+            for bound, count in zip(h['buckets'] + ['+Inf'], h['counts']):
+                cumulative += count
+                le = bound if bound == '+Inf' else repr(float(bound))
+                lines.append(f'{stage_metric}_bucket{{{_format_labels(base + [("le", le)])}}} {cumulative}')
+            lines.append(f'{stage_metric}_sum{{{_format_labels(base)}}} {h["sum"]}')
+            lines.append(f'{stage_metric}_count{{{_format_labels(base)}}} {h["count"]}')
+
+    lines.append(f'# HELP {quantile_metric} Estimated p50/p95/p99 of per-stage latency.')
+    lines.append(f'# TYPE {quantile_metric} gauge')
+    for process, snapshot in snapshots:
+        for stage, h in sorted(snapshot['histograms'].items()):
+            for quantile in QUANTILES:
+                labels = _format_labels([('process', process), ('stage', stage), ('quantile', quantile)])
+                value = histogram_quantile(quantile, h['buckets'], h['counts'])
+                lines.append(f'{quantile_metric}{{{labels}}} {value}')
+
+    counter_names = sorted({name for _, snapshot in snapshots for name in snapshot['counters']})
+    for name in counter_names:
+        lines.append(f'# TYPE {prefix}_{name} counter')
+        for process, snapshot in snapshots:
+            if name in snapshot['counters']:
+                labels = _format_labels([('process', process)])
+                lines.append(f'{prefix}_{name}{{{labels}}} {snapshot["counters"][name]}')
+
+    gauge_names = sorted({name for _, snapshot in snapshots for name in snapshot['gauges']})
+    for name in gauge_names:
+        lines.append(f'# TYPE {prefix}_{name} gauge')
+        for process, snapshot in snapshots:
+            if name in snapshot['gauges']:
+                labels = _format_labels([('process', process)])
+                lines.append(f'{prefix}_{name}{{{labels}}} {snapshot["gauges"][name]}')
+
+    return '\n'.join(lines) + '\n'
+
+
+# 进程级全局注册表
+metrics = MetricsRegistry()
+metrics.gauge('process_resident_memory_bytes', process_rss_bytes)
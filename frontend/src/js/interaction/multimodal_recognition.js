@@ -36,6 +36,7 @@ export function initMultimodalRecognition() {
 
     function connectWebSocket() {
         socket = new WebSocket(`ws://127.0.0.1:5000/ws/multimodal`);
+        socket.binaryType = 'arraybuffer';
 
         socket.onopen = () => {
             console.log('WebSocket连接已建立');
@@ -59,8 +60,13 @@ export function initMultimodalRecognition() {
                 return;
             }
             else if (data.type === 'response') {
+                // 同一帧的手势/视觉结果与语音结果分别推送（part: 'image' / 'audio'），
+                // 通过 request_id 关联，未携带的一侧为占位值
                 // data = {
                 //     type: 'response',
+                //     request_id: xxx,
+                //     part: 'image'/'audio',
+                //     parts: 1/2,
                 //     image_info = {
                 //         instruction_code: xxx,
                 //         decision: xxx,
@@ -72,7 +78,7 @@ export function initMultimodalRecognition() {
                 //         feedback: xxx
                 //     }/wake_word/'音频数据为空'/
                 // }
-                console.log('多模态响应:', data);
+                console.log('多模态响应:', data.request_id, data.part, data);
                 console.log('isAwake:', isAwake);
                 let priority = data.priority;                
                 let image_info = data.image_info;
@@ -151,6 +157,7 @@ export function initMultimodalRecognition() {
                 isProcessing = true;
                 
                 // 捕获视频帧
+                const captureTs = Date.now();
                 const image_info = await getVideoFrame(video);
                 
                 // 捕获音频
@@ -160,19 +167,16 @@ export function initMultimodalRecognition() {
                 const userInfo = JSON.parse(userInfoStr);
                 const userId = userInfo.user_id;
 
-                // 发送多模态请求
-                const payload = {
-                    is_emergency: isEmergency,
-                    type: 'command',
-                    user_id: userId,
-                    image: image_info,
-                    audio: audio_info,
-                    is_wake: isAwake,
-                    wake_word: wakeWord,
-                    timestamp: Date.now()
-                };
-                // console.log('前端发送请求:', payload);
-                socket.send(JSON.stringify(payload));
+                // 发送多模态请求（二进制帧：头部 + 原始JPEG + 原始PCM）
+                const frame = encodeBinaryFrame({
+                    userId: userId,
+                    isEmergency: isEmergency,
+                    isWake: isAwake,
+                    wakeWord: wakeWord,
+                    timestamp: Date.now(),
+                    captureTs: captureTs
+                }, image_info, audio_info);
+                socket.send(frame);
                 
                 isProcessing = false;
             }
@@ -187,12 +191,55 @@ export function initMultimodalRecognition() {
                 const tempCtx = tempCanvas.getContext('2d');
                 
                 tempCtx.drawImage(videoElement, 0, 0);
-                resolve(tempCanvas.toDataURL('image/jpeg', 0.8));
-                
-                // 移除临时canvas
-                tempCanvas.remove();
+                tempCanvas.toBlob(async (blob) => {
+                    resolve(blob ? new Uint8Array(await blob.arrayBuffer()) : new Uint8Array(0));
+                    // 移除临时canvas
+                    tempCanvas.remove();
+                }, 'image/jpeg', 0.8);
             });
         }
+
+        // 二进制帧格式（小端序，与后端 multimodal/binary_frame.py 保持一致）
+        // | magic 'MM'(2) | version(1) | type(1) | flags(1) | reserved(1) | wake_word_len(2) |
+        // | user_id(4) | timestamp(8) | capture_ts(8) | image_len(4) | audio_len(4) |
+        // | wake_word | image(JPEG) | audio(PCM int16) |
+        const FRAME_HEADER_SIZE = 36;
+        const FRAME_TYPE_COMMAND = 1;
+        const FLAG_EMERGENCY = 0x01;
+        const FLAG_WAKE = 0x02;
+
+        function encodeBinaryFrame(meta, jpegBytes, pcmInt16) {
+            const wakeWordBytes = new TextEncoder().encode(meta.wakeWord || '');
+            const audioBytes = new Uint8Array(pcmInt16.buffer, pcmInt16.byteOffset, pcmInt16.byteLength);
+            const buffer = new ArrayBuffer(
+                FRAME_HEADER_SIZE + wakeWordBytes.length + jpegBytes.length + audioBytes.length);
+            const view = new DataView(buffer);
+            let flags = 0;
+            if (meta.isEmergency) flags |= FLAG_EMERGENCY;
+            if (meta.isWake) flags |= FLAG_WAKE;
+
+            view.setUint8(0, 0x4D); // 'M'
+            view.setUint8(1, 0x4D); // 'M'
+            view.setUint8(2, 1);    // version
+            view.setUint8(3, FRAME_TYPE_COMMAND);
+            view.setUint8(4, flags);
+            view.setUint8(5, 0);
+            view.setUint16(6, wakeWordBytes.length, true);
+            view.setUint32(8, Number(meta.userId) || 0, true);
+            view.setBigUint64(12, BigInt(meta.timestamp), true);
+            view.setBigUint64(20, BigInt(meta.captureTs), true);
+            view.setUint32(28, jpegBytes.length, true);
+            view.setUint32(32, audioBytes.length, true);
+
+            const bytes = new Uint8Array(buffer);
+            let offset = FRAME_HEADER_SIZE;
+            bytes.set(wakeWordBytes, offset);
+            offset += wakeWordBytes.length;
+            bytes.set(jpegBytes, offset);
+            offset += jpegBytes.length;
+            bytes.set(audioBytes, offset);
+            return buffer;
+        }
     
         let audioContext = null;
         let workletNode = null;
@@ -248,15 +295,10 @@ export function initMultimodalRecognition() {
 
             if (isSpeaking) {
                 console.log('语音合成播放时不发送音频数据');
-                return "";
+                return new Int16Array(0);
             }
 
-            const int16Chunk = convertFloat32ToInt16(float32Chunk);
-            const uint8Array = new Uint8Array(int16Chunk.buffer);
-            const binaryString = Array.from(uint8Array)
-                .map(byte => String.fromCharCode(byte))
-                .join('');
-            return btoa(binaryString);
+            return convertFloat32ToInt16(float32Chunk);
         }
         
         function convertFloat32ToInt16(float32Array) {
@@ -0,0 +1,5 @@
+import os
+import sys
+
+# 以仓库根目录为导入根（backend 为顶层包）
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
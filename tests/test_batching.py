@@ -0,0 +1,102 @@
+import time
+from concurrent.futures import Future
+
+import numpy as np
+import pytest
+
+from backend.multimodal.audio.batching import ASRBatcher, PendingUtterance
+
+SAMPLE_RATE = 16000
+
+
+class SyncExecutor:
+    def submit(self, func, *args):
+        future = Future()
+        try:
+            future.set_result(func(*args))
+        except Exception as e:
+            future.set_exception(e)
+        return future
+
+
+class FakeRecognizer:
+    """以波形首个样本作为识别文本；首样本为负数的语句推理出错（会拖垮整批）"""
+    def __init__(self):
+        self.batches = []
+
+    def recognize_batch(self, waveforms):
+        self.batches.append(len(waveforms))
+        for waveform in waveforms:
+            if waveform[0] < 0:
+                raise RuntimeError(f'bad utterance {waveform[0]}')
+        return [str(waveform[0]) for waveform in waveforms]
+
+
+def utterance(seconds, label=0, waited=0.0):
+    item = PendingUtterance(np.full(int(seconds * SAMPLE_RATE), label, dtype=np.int16), SAMPLE_RATE)
+    item.enqueued -= waited
+    return item
+
+
+def batcher(**kwargs):
+    return ASRBatcher(FakeRecognizer(), SyncExecutor(), sample_rate=SAMPLE_RATE, **kwargs)
+
+
+def test_buckets_split_by_duration_ratio():
+    asr = batcher(bucket_ratio=1.5)
+    buckets = asr.buckets([utterance(1.0), utterance(3.0), utterance(1.2), utterance(4.0)])
+    assert [[item.duration for item in bucket] for bucket in buckets] == [[1.0, 1.2], [3.0, 4.0]]
+
+
+def test_buckets_respect_max_batch():
+    asr = batcher(max_batch=2)
+    buckets = asr.buckets([utterance(1.0) for _ in range(5)])
+    assert [len(bucket) for bucket in buckets] == [2, 2, 1]
+
+
+def test_fresh_utterances_are_split_to_meet_latency_budget():
+    asr = batcher(latency_budget=1.0)
+    asr.rtf = 0.2
+    # 每条 2 秒：单条约 0.4 秒，两条成批约 0.8 秒，三条超出预算
+    buckets = asr.buckets([utterance(2.0) for _ in range(5)])
+    assert [len(bucket) for bucket in buckets] == [2, 2, 1]
+
+
+def test_overdue_utterances_are_still_batched():
+    """积压时已经超出预算的语句不能退化为逐条推理"""
+    asr = batcher(latency_budget=1.0, max_batch=8)
+    asr.rtf = 0.2
+    buckets = asr.buckets([utterance(2.0, waited=1.5) for _ in range(5)])
+    assert [len(bucket) for bucket in buckets] == [5]
+
+
+def test_oldest_bucket_first():
+    asr = batcher(bucket_ratio=1.5)
+    buckets = asr.buckets([utterance(1.0), utterance(5.0, waited=0.5)])
+    assert [bucket[0].duration for bucket in buckets] == [5.0, 1.0]
+
+
+def test_failed_batch_retries_each_utterance():
+    asr = batcher()
+    items = [utterance(1.0, label) for label in (1, -2, 3)]
+    asr._infer(items)
+    assert asr.recognizer.batches == [3, 1, 1, 1]
+    assert items[0].result.get() == '1'
+    assert items[2].result.get() == '3'
+    with pytest.raises(RuntimeError, match='bad utterance -2'):
+        items[1].result.get()
+
+
+def test_submit_collects_one_batch():
+    asr = batcher(window=0.01)
+    results = [asr.submit(np.full(SAMPLE_RATE, label, dtype=np.int16)) for label in (1, 2, 3)]
+    assert [result.get(timeout=1) for result in results] == ['1', '2', '3']
+    assert asr.recognizer.batches == [3]
+
+
+def test_full_batch_is_sent_without_waiting_for_window():
+    asr = batcher(window=5.0, max_batch=2)
+    start = time.monotonic()
+    results = [asr.submit(np.full(SAMPLE_RATE, label, dtype=np.int16)) for label in (1, 2)]
+    assert [result.get(timeout=1) for result in results] == ['1', '2']
+    assert time.monotonic() - start < 1.0
@@ -0,0 +1,74 @@
+import struct
+
+import pytest
+
+from backend.loadtest.replay import CAPTURE_TS_OFFSET, USER_ID_OFFSET, rewrite_frame
+from backend.loadtest.recording import KIND_BINARY
+from backend.multimodal.binary_frame import (
+    FRAME_TYPE_COMMAND, FRAME_TYPE_HEARTBEAT, HEADER_SIZE, build_binary_frame, is_binary_frame, parse_binary_frame
+)
+
+
+def command_frame(**kwargs):
+    fields = dict(image_bytes=b'\xff\xd8jpeg', audio_bytes=b'\x01\x00\x02\x00', wake_word='你好小车',
+                  is_emergency=True, timestamp=123, capture_ts=1700000000123)
+    fields.update(kwargs)
+    return build_binary_frame(FRAME_TYPE_COMMAND, 42, **fields)
+
+
+def test_header_is_36_bytes():
+    assert HEADER_SIZE == 36
+
+
+def test_round_trip():
+    frame = command_frame()
+    assert is_binary_frame(frame) and not is_binary_frame('{}')
+    data = parse_binary_frame(frame)
+    assert data['type'] == 'command'
+    assert data['user_id'] == 42
+    assert data['is_emergency'] and not data['is_wake']
+    assert (data['timestamp'], data['capture_ts']) == (123, 1700000000123)
+    assert data['wake_word'] == '你好小车'
+    assert bytes(data['image_bytes']) == b'\xff\xd8jpeg'
+    assert bytes(data['audio_bytes']) == b'\x01\x00\x02\x00'
+
+
+def test_payload_is_not_copied():
+    frame = bytearray(command_frame())
+    data = parse_binary_frame(frame)
+    assert isinstance(data['image_bytes'], memoryview)
+    frame[-1] = 7
+    assert data['audio_bytes'][-1] == 7
+
+
+def test_empty_payloads_and_heartbeat():
+    data = parse_binary_frame(build_binary_frame(FRAME_TYPE_HEARTBEAT, 0))
+    assert data['type'] == 'heartbeat'
+    assert len(data['image_bytes']) == len(data['audio_bytes']) == 0
+    assert 'wake_word' not in data
+
+
+@pytest.mark.parametrize('mutate, message', [
+    (lambda frame: frame[:HEADER_SIZE - 1], '长度不足'),
+    (lambda frame: b'XX' + frame[2:], '标识错误'),
+    (lambda frame: frame[:2] + b'\x02' + frame[3:], '版本'),
+    (lambda frame: frame[:3] + b'\x09' + frame[4:], '帧类型'),
+    (lambda frame: frame + b'\x00', '长度与头部不一致'),
+    (lambda frame: frame[:-1], '长度与头部不一致'),
+])
+def test_rejects_malformed_frames(mutate, message):
+    with pytest.raises(ValueError, match=message):
+        parse_binary_frame(mutate(command_frame()))
+
+
+def test_rejects_odd_audio_length():
+    with pytest.raises(ValueError, match='int16'):
+        parse_binary_frame(command_frame(audio_bytes=b'\x01\x00\x02'))
+
+
+def test_replay_offsets_match_header():
+    frame = command_frame()
+    assert struct.unpack_from('<I', frame, USER_ID_OFFSET)[0] == 42
+    assert struct.unpack_from('<Q', frame, CAPTURE_TS_OFFSET)[0] == 1700000000123
+    data = parse_binary_frame(rewrite_frame(KIND_BINARY, frame, 7, 99))
+    assert (data['user_id'], data['capture_ts'], data['timestamp']) == (7, 99, 123)
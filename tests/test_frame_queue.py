@@ -0,0 +1,63 @@
+import base64
+
+import gevent
+
+from backend.multimodal.frame_queue import LatestFrameQueue
+
+
+def test_latest_frame_wins_and_dropped_audio_is_carried():
+    queue = LatestFrameQueue()
+    queue.put({'id': 1, 'audio_bytes': memoryview(b'\x01\x00')})
+    queue.put({'id': 2, 'audio': base64.b64encode(b'\x02\x00').decode()})
+    queue.put({'id': 3, 'audio_bytes': b'\x03\x00'})
+    data = queue.get()
+    assert data['id'] == 3
+    # 被丢弃帧的音频按到达顺序拼接在最新帧之前
+    assert bytes(data['audio_bytes']) == b'\x01\x00\x02\x00\x03\x00'
+    assert 'audio' not in data
+    assert (queue.received, queue.dropped, queue.processed) == (3, 2, 1)
+
+
+def test_base64_frame_receives_carry_as_raw_pcm():
+    queue = LatestFrameQueue()
+    queue.put({'id': 1, 'audio_bytes': b'\x01\x00'})
+    queue.put({'id': 2, 'audio': base64.b64encode(b'\x02\x00').decode()})
+    data = queue.get()
+    assert bytes(data['audio_bytes']) == b'\x01\x00\x02\x00'
+    assert 'audio' not in data
+
+
+def test_frames_without_audio():
+    queue = LatestFrameQueue()
+    queue.put({'id': 1})
+    queue.put({'id': 2, 'audio_bytes': b'\x02\x00'})
+    # 丢弃帧没有音频时不改写最新帧
+    assert queue.get() == {'id': 2, 'audio_bytes': b'\x02\x00'}
+    queue.put({'id': 3, 'audio_bytes': b'\x03\x00'})
+    queue.put({'id': 4})
+    assert bytes(queue.get()['audio_bytes']) == b'\x03\x00'
+
+
+def test_carry_does_not_leak_into_next_frame():
+    queue = LatestFrameQueue()
+    queue.put({'id': 1, 'audio_bytes': b'\x01\x00'})
+    queue.put({'id': 2, 'audio_bytes': b'\x02\x00'})
+    queue.get()
+    queue.put({'id': 3, 'audio_bytes': b'\x03\x00'})
+    assert queue.get()['audio_bytes'] == b'\x03\x00'
+
+
+def test_get_blocks_until_put_and_close_wakes_reader():
+    queue = LatestFrameQueue()
+    reader = gevent.spawn(queue.get)
+    gevent.sleep(0)
+    assert not reader.ready()
+    queue.put({'id': 1})
+    assert reader.get(timeout=1) == {'id': 1}
+
+    reader = gevent.spawn(queue.get)
+    gevent.sleep(0)
+    queue.close()
+    assert reader.get(timeout=1) is None
+    queue.put({'id': 2})
+    assert queue.received == 1 and queue.get() is None
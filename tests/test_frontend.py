@@ -0,0 +1,128 @@
+import numpy as np
+import pytest
+
+knf = pytest.importorskip('kaldi_native_fbank')
+
+from backend.multimodal.audio.SenseVoiceSmall.utils.frontend import WavFrontend
+
+LFR_M = 7
+LFR_N = 6
+NUM_BINS = 80
+# numpy 实现与 knf 的 log-mel 差异来自 float32 FFT / 累加顺序，低能量频带最大约 2e-3（相对 3e-4）
+RTOL = 5e-4
+ATOL = 5e-4
+
+
+def knf_fbank(frontend, waveform):
+    """kaldi-native-fbank 逐帧计算的参考结果（原实现）"""
+    fbank = knf.OnlineFbank(frontend.opts)
+    fbank.accept_waveform(frontend.opts.frame_opts.samp_freq, (waveform * (1 << 15)).tolist())
+    mat = np.empty([fbank.num_frames_ready, NUM_BINS])
+    for i in range(fbank.num_frames_ready):
+        mat[i, :] = fbank.get_frame(i)
+    return mat.astype(np.float32)
+
+
+def reference_lfr_cmvn(feat, cmvn):
+    """原实现的逐帧 LFR 拼帧 + CMVN"""
+    T = feat.shape[0]
+    T_lfr = int(np.ceil(T / LFR_N))
+    inputs = np.vstack((np.tile(feat[0], ((LFR_M - 1) // 2, 1)), feat))
+    T = T + (LFR_M - 1) // 2
+    frames = []
+    for i in range(T_lfr):
+        if LFR_M <= T - i * LFR_N:
+            frames.append(inputs[i * LFR_N : i * LFR_N + LFR_M].reshape(1, -1))
+        else:
+            frame = inputs[i * LFR_N :].reshape(-1)
+            for _ in range(LFR_M - (T - i * LFR_N)):
+                frame = np.hstack((frame, inputs[-1]))
+            frames.append(frame)
+    lfr = np.vstack(frames).astype(np.float32)
+    return (lfr + cmvn[0]) * cmvn[1]
+
+
+@pytest.fixture
+def cmvn_file(tmp_path):
+    dim = LFR_M * NUM_BINS
+    rng = np.random.default_rng(1)
+    means = ' '.join(f'{v:.6f}' for v in -rng.uniform(5, 15, dim))
+    scales = ' '.join(f'{v:.6f}' for v in rng.uniform(0.1, 0.5, dim))
+    path = tmp_path / 'am.mvn'
+    path.write_text(
+        '<Nnet>\n'
+        f'<AddShift> {dim} {dim}\n'
+        f'<LearnRateCoef> 0 [ {means} ]\n'
+        f'<Rescale> {dim} {dim}\n'
+        f'<LearnRateCoef> 0 [ {scales} ]\n'
+        '</Nnet>\n',
+        encoding='utf-8'
+    )
+    return str(path)
+
+
+@pytest.fixture
+def frontend(cmvn_file):
+    return WavFrontend(cmvn_file=cmvn_file, dither=0.0, lfr_m=LFR_M, lfr_n=LFR_N)
+
+
+def waveforms():
+    rng = np.random.default_rng(0)
+    t = np.arange(48000) / 16000
+    chirp = 0.3 * np.sin(2 * np.pi * (200 + 2000 * t) * t)
+    return {
+        'empty': np.zeros(0),
+        'shorter_than_window': rng.standard_normal(399) * 0.1,
+        'one_frame': rng.standard_normal(400) * 0.1,
+        'two_frames': rng.standard_normal(560) * 0.1,
+        'silence': np.zeros(16000),
+        'noise_1s': rng.standard_normal(16000) * 0.1,
+        'chirp_3s': chirp,
+        'noise_odd_length': rng.standard_normal(48123) * 0.05,
+    }
+
+
+@pytest.mark.parametrize('name', list(waveforms()))
+def test_fbank_matches_knf(frontend, name):
+    waveform = waveforms()[name].astype(np.float32)
+    expected = knf_fbank(frontend, waveform)
+    feat, feat_len = frontend.fbank(waveform)
+    assert feat.dtype == np.float32
+    assert feat.shape == expected.shape == (int(feat_len), NUM_BINS)
+    np.testing.assert_allclose(feat, expected, rtol=RTOL, atol=ATOL)
+
+
+@pytest.mark.parametrize('name', [name for name in waveforms() if name not in ('empty', 'shorter_than_window')])
+def test_lfr_cmvn_matches_reference(frontend, name):
+    waveform = waveforms()[name].astype(np.float32)
+    expected = reference_lfr_cmvn(knf_fbank(frontend, waveform), frontend.cmvn)
+    feat, feat_len = frontend.lfr_cmvn(frontend.fbank(waveform)[0])
+    # 特征以 float32 输出（原实现与 float64 的 CMVN 相加后为 float64，送入模型前同样转换为 float32）
+    assert feat.dtype == np.float32
+    assert feat.shape == expected.shape == (int(feat_len), LFR_M * NUM_BINS)
+    # CMVN 缩放系数 < 1，误差不会放大
+    np.testing.assert_allclose(feat, expected, rtol=RTOL, atol=ATOL)
+
+
+def test_lfr_cmvn_on_knf_features_is_exact(frontend):
+    """同一 fbank 输入时，向量化 LFR + CMVN 与逐帧实现只差 float32 舍入"""
+    waveform = waveforms()['noise_odd_length'].astype(np.float32)
+    speech = knf_fbank(frontend, waveform)
+    feat, _ = frontend.lfr_cmvn(speech)
+    np.testing.assert_allclose(feat, reference_lfr_cmvn(speech, frontend.cmvn), rtol=1e-6, atol=1e-5)
+
+
+@pytest.mark.parametrize('name', ['empty', 'shorter_than_window'])
+def test_lfr_cmvn_without_frames(frontend, name):
+    waveform = waveforms()[name].astype(np.float32)
+    feat, feat_len = frontend.lfr_cmvn(frontend.fbank(waveform)[0])
+    assert feat.shape == (0, LFR_M * NUM_BINS)
+    assert feat.dtype == np.float32
+    assert int(feat_len) == 0
+
+
+def test_apply_lfr_is_exact():
+    speech = np.random.default_rng(2).standard_normal((37, NUM_BINS)).astype(np.float32)
+    identity = np.array([np.zeros(LFR_M * NUM_BINS), np.ones(LFR_M * NUM_BINS)])
+    expected = reference_lfr_cmvn(speech, identity).astype(np.float32)
+    np.testing.assert_array_equal(WavFrontend.apply_lfr(speech, LFR_M, LFR_N), expected)
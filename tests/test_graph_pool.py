@@ -0,0 +1,84 @@
+from backend.multimodal.graph_pool import GraphPool
+
+
+class FakeGraph:
+    def __init__(self, name):
+        self.name = name
+        self.state = []
+        self.closed = False
+
+    def reset(self):
+        self.state.clear()
+
+
+def counting_factory():
+    names = iter(range(100))
+    return lambda: FakeGraph(next(names))
+
+
+def test_resettable_graph_is_reset_and_reused():
+    pool = GraphPool(counting_factory(), reset=FakeGraph.reset)
+    lease = pool.acquire()
+    lease.instance.state.append('上一辆车的跟踪状态')
+    graph = lease.instance
+    lease.release()
+    reused = pool.acquire()
+    assert reused.instance is graph
+    assert reused.instance.state == []
+    assert pool.created == 1
+
+
+def test_graph_without_reset_is_disposed_and_recreated():
+    pool = GraphPool(counting_factory(), dispose=lambda graph: setattr(graph, 'closed', True))
+    lease = pool.acquire()
+    first = lease.instance
+    lease.release()
+    assert first.closed
+    assert pool.idle == 0 and pool.discarded == 1
+    assert pool.acquire().instance is not first
+    assert pool.created == 2
+
+
+def test_failed_reset_discards_graph():
+    def reset(graph):
+        raise RuntimeError('graph closed')
+
+    disposed = []
+    pool = GraphPool(counting_factory(), reset=reset, dispose=disposed.append)
+    lease = pool.acquire()
+    graph = lease.instance
+    lease.release()
+    assert disposed == [graph]
+    assert pool.idle == 0
+
+
+def test_release_is_idempotent():
+    pool = GraphPool(counting_factory(), reset=FakeGraph.reset)
+    lease = pool.acquire()
+    lease.release()
+    lease.release()
+    assert pool.idle == 1
+
+
+def test_warmup_keeps_the_warmed_graph_without_reset():
+    disposed = []
+    pool = GraphPool(counting_factory(), dispose=disposed.append)
+    pool.warmup(lambda lease: lease.timestamp(5))
+    assert pool.idle == 1 and disposed == []
+    lease = pool.acquire()
+    assert lease.instance.name == 0
+    assert pool.created == 1
+
+
+def test_timestamps_stay_monotonic_across_leases():
+    pool = GraphPool(counting_factory(), reset=FakeGraph.reset)
+    lease = pool.acquire()
+    first = [lease.timestamp(ts) for ts in (1000, 1033, 1066)]
+    lease.release()
+    # 下一个会话的采集时间早于上一个会话
+    lease = pool.acquire()
+    second = [lease.timestamp(ts) for ts in (10, 43, 43, 20)]
+    timestamps = first + second
+    assert all(b > a for a, b in zip(timestamps, timestamps[1:]))
+    # 帧间隔保留
+    assert second[1] - second[0] == 33
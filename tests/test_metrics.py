@@ -0,0 +1,78 @@
+import threading
+
+import gevent
+import pytest
+
+from backend.utils.metrics import Histogram, MetricsRegistry, histogram_quantile, render_prometheus
+
+
+def test_counters_from_many_threads_are_not_lost():
+    registry = MetricsRegistry()
+    start = threading.Barrier(8)
+
+    def work():
+        start.wait()
+        for _ in range(20000):
+            registry.inc('frames_total')
+            registry.inc('bytes_total', 3)
+
+    threads = [threading.Thread(target=work) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert registry.counters == {'frames_total': 160000, 'bytes_total': 480000}
+    # 每个线程只登记一次
+    assert len(registry._thread_counters) == 8
+
+
+def test_greenlets_share_their_thread_counters():
+    registry = MetricsRegistry()
+    gevent.joinall([gevent.spawn(lambda: [registry.inc('requests_total') for _ in range(100)]) for _ in range(10)])
+    assert registry.counters == {'requests_total': 1000}
+    assert len(registry._thread_counters) == 1
+
+
+def test_snapshot_while_counting():
+    registry = MetricsRegistry()
+    stop = threading.Event()
+
+    def work():
+        while not stop.is_set():
+            registry.inc('busy_total')
+
+    thread = threading.Thread(target=work)
+    thread.start()
+    try:
+        previous = 0
+        for _ in range(200):
+            value = registry.snapshot()['counters'].get('busy_total', 0)
+            assert value >= previous
+            previous = value
+    finally:
+        stop.set()
+        thread.join()
+    assert registry.counters['busy_total'] >= previous
+
+
+def test_histogram_counts_and_quantiles():
+    histogram = Histogram(buckets=(0.1, 0.2, 0.5))
+    for value in (0.05, 0.15, 0.15, 0.3, 1.0):
+        histogram.observe(value)
+    snapshot = histogram.snapshot()
+    assert snapshot['counts'] == [1, 2, 1, 1]
+    assert snapshot['count'] == 5
+    assert snapshot['sum'] == pytest.approx(1.65)
+    assert histogram_quantile(0.5, snapshot['buckets'], snapshot['counts']) == pytest.approx(0.175)
+    assert histogram_quantile(0.99, snapshot['buckets'], snapshot['counts']) == 0.5
+
+
+def test_render_prometheus_includes_counters_per_process():
+    registry = MetricsRegistry()
+    registry.inc('vad_rejected_total', 2)
+    registry.observe('asr', 0.3)
+    registry.gauge('sessions', lambda: 4)
+    text = render_prometheus([('hub', registry.snapshot())])
+    assert 'multimodal_vad_rejected_total{process="hub"} 2' in text
+    assert 'multimodal_stage_duration_seconds_count{process="hub",stage="asr"} 1' in text
+    assert 'multimodal_sessions{process="hub"} 4.0' in text
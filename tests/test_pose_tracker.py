@@ -0,0 +1,71 @@
+import numpy as np
+import pytest
+
+from backend.multimodal.video.pose_tracker import AngleKalmanFilter
+
+TRUE_ANGLES = np.array([10.0, -5.0, 2.0])
+NOISE_STD = 3.0
+
+
+def run_filter(angle_filter, interval, frames=200, skip=20):
+    """恒定姿态加测量噪声，返回 (原始测量的均方根误差, 滤波后的均方根误差)"""
+    rng = np.random.default_rng(0)
+    raw, filtered = [], []
+    for i in range(frames):
+        measured = TRUE_ANGLES + rng.normal(0, NOISE_STD, 3)
+        raw.append(measured)
+        filtered.append(angle_filter.update(measured, i * interval).copy())
+    raw = np.array(raw[skip:]) - TRUE_ANGLES
+    filtered = np.array(filtered[skip:]) - TRUE_ANGLES
+    return np.sqrt((raw ** 2).mean()), np.sqrt((filtered ** 2).mean())
+
+
+def test_smooths_at_client_frame_interval():
+    """客户端约 4.8 秒一帧：滤波器不能每帧重新初始化，测量噪声应被明显平滑"""
+    angle_filter = AngleKalmanFilter()
+    raw_error, filtered_error = run_filter(angle_filter, 4.8)
+    assert angle_filter.gap_limit() == pytest.approx(3 * 4.8)
+    assert filtered_error < 0.7 * raw_error
+
+
+def test_smooths_at_video_frame_rate():
+    raw_error, filtered_error = run_filter(AngleKalmanFilter(), 1 / 30)
+    assert filtered_error < 0.3 * raw_error
+
+
+def test_second_frame_is_filtered_not_reset():
+    angle_filter = AngleKalmanFilter()
+    angle_filter.update(np.array([0.0, 0.0, 0.0]), 100.0)
+    smoothed = angle_filter.update(np.array([6.0, 6.0, 6.0]), 104.8)
+    assert angle_filter.timestamp == 104.8
+    assert np.all((smoothed > 0) & (smoothed < 6))
+
+
+def test_resets_after_gap_much_longer_than_frame_interval():
+    angle_filter = AngleKalmanFilter()
+    for i in range(5):
+        angle_filter.update(TRUE_ANGLES, i * 4.8)
+    measured = np.array([40.0, 30.0, -20.0])
+    np.testing.assert_array_equal(angle_filter.update(measured, 4 * 4.8 + 60.0), measured)
+
+
+def test_fixed_max_gap():
+    angle_filter = AngleKalmanFilter(max_gap=1.0)
+    angle_filter.update(TRUE_ANGLES, 0.0)
+    measured = np.array([40.0, 30.0, -20.0])
+    np.testing.assert_array_equal(angle_filter.update(measured, 4.8), measured)
+
+
+def test_repeated_timestamp_keeps_state():
+    angle_filter = AngleKalmanFilter()
+    angle_filter.update(TRUE_ANGLES, 1.0)
+    np.testing.assert_array_equal(angle_filter.update(np.array([50.0, 50.0, 50.0]), 1.0), TRUE_ANGLES)
+
+
+def test_innovation_wraps_at_180_degrees():
+    angle_filter = AngleKalmanFilter()
+    for i in range(10):
+        angle_filter.update(np.array([179.0, 0.0, 0.0]), i / 30)
+    smoothed = angle_filter.update(np.array([-179.0, 0.0, 0.0]), 10 / 30)
+    # 从 179 到 -179 只相差 2 度，不应向 0 度方向大幅跳变
+    assert abs(smoothed[0]) > 175
@@ -0,0 +1,130 @@
+import gevent
+from gevent.event import Event
+
+from backend.task_scheduler import PriorityScheduler, TaskPriority
+
+
+class Recorder:
+    """记录任务的开始与结束，任务阻塞直到 release"""
+    def __init__(self):
+        self.started = []
+        self.finished = []
+        self.gate = Event()
+
+    def task(self, name):
+        self.started.append(name)
+        self.gate.wait()
+        self.finished.append(name)
+
+    def release(self):
+        self.gate.set()
+        gevent.sleep(0)
+
+
+def test_normal_tasks_respect_concurrency():
+    recorder = Recorder()
+    scheduler = PriorityScheduler(max_concurrency=2, max_pending=8)
+    for name in 'abc':
+        scheduler.submit(TaskPriority.NORMAL_COMMAND, recorder.task, name)
+    gevent.sleep(0)
+    assert recorder.started == ['a', 'b']
+    assert (scheduler.running, scheduler.pending) == (2, 1)
+    recorder.release()
+    gevent.sleep(0.01)
+    assert recorder.finished == ['a', 'b', 'c']
+    assert (scheduler.running, scheduler.pending) == (0, 0)
+
+
+def test_queue_is_ordered_by_priority_then_fifo():
+    recorder = Recorder()
+    scheduler = PriorityScheduler(max_concurrency=1, max_pending=8)
+    scheduler.submit(TaskPriority.NORMAL_COMMAND, recorder.task, 'running')
+    scheduler.submit(TaskPriority.NORMAL_COMMAND, recorder.task, 'normal1')
+    scheduler.submit(TaskPriority.WAKE_WORD, recorder.task, 'wake1')
+    scheduler.submit(TaskPriority.NORMAL_COMMAND, recorder.task, 'normal2')
+    scheduler.submit(TaskPriority.WAKE_WORD, recorder.task, 'wake2')
+    recorder.release()
+    gevent.sleep(0.01)
+    assert recorder.finished == ['running', 'wake1', 'wake2', 'normal1', 'normal2']
+
+
+def test_emergency_preempts_running_normal_tasks_only():
+    recorder = Recorder()
+    scheduler = PriorityScheduler(max_concurrency=2, max_pending=8)
+    scheduler.submit(TaskPriority.NORMAL_COMMAND, recorder.task, 'normal')
+    scheduler.submit(TaskPriority.WAKE_WORD, recorder.task, 'wake')
+    gevent.sleep(0)
+    scheduler.submit(TaskPriority.EMERGENCY, recorder.task, 'emergency')
+    gevent.sleep(0)
+    assert recorder.started == ['normal', 'wake', 'emergency']
+    assert scheduler.preempted == 1
+    recorder.release()
+    gevent.sleep(0.01)
+    assert sorted(recorder.finished) == ['emergency', 'wake']
+    assert scheduler.running == 0
+
+
+def test_emergency_ignores_concurrency_limit():
+    recorder = Recorder()
+    scheduler = PriorityScheduler(max_concurrency=1, max_pending=8)
+    scheduler.submit(TaskPriority.WAKE_WORD, recorder.task, 'wake')
+    scheduler.submit(TaskPriority.EMERGENCY, recorder.task, 'emergency1')
+    scheduler.submit(TaskPriority.EMERGENCY, recorder.task, 'emergency2')
+    gevent.sleep(0)
+    assert recorder.started == ['wake', 'emergency1', 'emergency2']
+    assert scheduler.running == 3
+    recorder.release()
+
+
+def test_preempted_task_that_never_started_frees_its_slot():
+    """同一轮事件循环中提交又被抢占的普通任务未开始执行，也必须归还并发名额"""
+    recorder = Recorder()
+    scheduler = PriorityScheduler(max_concurrency=1, max_pending=8)
+    scheduler.submit(TaskPriority.NORMAL_COMMAND, recorder.task, 'killed')
+    scheduler.submit(TaskPriority.EMERGENCY, recorder.task, 'emergency')
+    scheduler.submit(TaskPriority.NORMAL_COMMAND, recorder.task, 'next')
+    recorder.release()
+    gevent.sleep(0.01)
+    assert 'killed' not in recorder.started
+    assert recorder.finished == ['emergency', 'next']
+    assert scheduler.running == 0
+
+
+def test_trim_drops_oldest_normal_tasks_first():
+    recorder = Recorder()
+    scheduler = PriorityScheduler(max_concurrency=1, max_pending=2)
+    scheduler.submit(TaskPriority.NORMAL_COMMAND, recorder.task, 'running')
+    gevent.sleep(0)
+    scheduler.submit(TaskPriority.NORMAL_COMMAND, recorder.task, 'old')
+    scheduler.submit(TaskPriority.WAKE_WORD, recorder.task, 'wake')
+    scheduler.submit(TaskPriority.NORMAL_COMMAND, recorder.task, 'new')
+    assert scheduler.dropped == 1 and scheduler.pending == 2
+    recorder.release()
+    gevent.sleep(0.01)
+    assert recorder.finished == ['running', 'wake', 'new']
+
+
+def test_trim_never_drops_higher_priority_tasks():
+    recorder = Recorder()
+    scheduler = PriorityScheduler(max_concurrency=1, max_pending=1)
+    scheduler.submit(TaskPriority.NORMAL_COMMAND, recorder.task, 'running')
+    gevent.sleep(0)
+    for name in ('wake1', 'wake2', 'wake3'):
+        scheduler.submit(TaskPriority.WAKE_WORD, recorder.task, name)
+    # 队列中只有唤醒词任务时允许超过上限
+    assert scheduler.pending == 3 and scheduler.dropped == 0
+
+
+def test_close_cancels_everything():
+    recorder = Recorder()
+    scheduler = PriorityScheduler(max_concurrency=1, max_pending=8)
+    scheduler.submit(TaskPriority.NORMAL_COMMAND, recorder.task, 'running')
+    scheduler.submit(TaskPriority.NORMAL_COMMAND, recorder.task, 'queued')
+    gevent.sleep(0)
+    scheduler.close()
+    scheduler.submit(TaskPriority.EMERGENCY, recorder.task, 'late')
+    recorder.release()
+    gevent.sleep(0.01)
+    assert recorder.started == ['running']
+    assert recorder.finished == []
+    assert (scheduler.running, scheduler.pending) == (0, 0)
@@ -0,0 +1,114 @@
+from collections import deque
+
+import numpy as np
+import pytest
+
+from backend.multimodal.time_window import TimeWindowBuffer, pooled_var
+
+
+def fill(buffer, values, start_time=0.0, step=0.1):
+    for i, value in enumerate(values):
+        buffer.append(float(value), start_time + i * step)
+
+
+def test_capacity_evicts_oldest_like_deque():
+    rng = np.random.default_rng(0)
+    buffer = TimeWindowBuffer(7)
+    expected = deque(maxlen=7)
+    for value in rng.standard_normal(50).tolist():
+        buffer.append(value)
+        expected.append(value)
+        assert len(buffer) == len(expected)
+        np.testing.assert_allclose(buffer.values(), list(expected))
+        assert buffer.max() == max(expected)
+        assert buffer.min() == min(expected)
+        assert buffer.last() == expected[-1]
+        assert buffer.mean() == pytest.approx(np.mean(expected))
+        assert buffer.var() == pytest.approx(np.var(expected), abs=1e-12)
+
+
+def test_time_window_expires_old_samples():
+    buffer = TimeWindowBuffer(20, window=0.5)
+    fill(buffer, [1, 2, 3, 4, 5], step=0.25)
+    # 1.0 时刻：早于 0.5 的样本过期，恰好在窗口边界上的样本保留
+    assert buffer.values().tolist() == [3, 4, 5]
+    buffer.expire(10.0)
+    assert len(buffer) == 0
+    assert buffer.max() is None and buffer.min() is None
+    assert buffer.mean() == 0.0 and buffer.var() == 0.0
+
+
+def test_monotonic_queues_follow_eviction():
+    buffer = TimeWindowBuffer(3)
+    fill(buffer, [5, 1, 3])
+    assert (buffer.max(), buffer.min()) == (5, 1)
+    buffer.append(2)  # 淘汰 5
+    assert (buffer.max(), buffer.min()) == (3, 1)
+    buffer.append(4)  # 淘汰 1
+    assert (buffer.max(), buffer.min()) == (4, 2)
+
+
+def test_clear_keeps_buffer_usable():
+    buffer = TimeWindowBuffer(4)
+    fill(buffer, [1, 2, 3, 4, 5])
+    buffer.clear()
+    assert len(buffer) == 0 and buffer.sum == 0.0
+    fill(buffer, [7, 8])
+    assert buffer.values().tolist() == [7, 8]
+    assert (buffer.max(), buffer.min(), buffer.mean()) == (8, 7, 7.5)
+
+
+def test_sums_stay_accurate_over_many_evictions():
+    buffer = TimeWindowBuffer(10)
+    # 大值之后的小值：增量减法的累计误差由定期重新求和消除
+    fill(buffer, [1e8] * 10 + [0.1] * 1000)
+    assert buffer.mean() == pytest.approx(0.1, rel=1e-12)
+    assert buffer.var() == pytest.approx(0.0, abs=1e-12)
+
+
+def test_pooled_var_matches_concatenation():
+    rng = np.random.default_rng(1)
+    a, b = TimeWindowBuffer(5), TimeWindowBuffer(8)
+    fill(a, rng.standard_normal(12))
+    fill(b, rng.standard_normal(3) + 2)
+    expected = np.var(np.concatenate((a.values(), b.values())))
+    assert pooled_var(a, b) == pytest.approx(expected)
+    assert pooled_var(TimeWindowBuffer(3), default=-1.0) == -1.0
+
+
+@pytest.mark.parametrize('count', [3, 4, 15, 30, 47])
+def test_moving_average_extrema_matches_convolve_across_wrap(count):
+    rng = np.random.default_rng(count)
+    buffer = TimeWindowBuffer(30)
+    fill(buffer, rng.standard_normal(count) * 10)
+    values = buffer.values()
+    smoothed = np.convolve(values, np.ones(3) / 3, mode='valid')
+    max_idx, max_val, min_idx, min_val, n = buffer.moving_average_extrema(3)
+    assert n == len(smoothed)
+    assert (max_idx, min_idx) == (np.argmax(smoothed), np.argmin(smoothed))
+    assert max_val == pytest.approx(smoothed.max())
+    assert min_val == pytest.approx(smoothed.min())
+
+
+def test_moving_average_extrema_ties_and_short_buffers():
+    buffer = TimeWindowBuffer(10)
+    fill(buffer, [1, 1])
+    assert buffer.moving_average_extrema(3) is None
+    buffer.append(1)
+    # 全部相等：与 np.argmax / np.argmin 一样取最早的位置
+    assert buffer.moving_average_extrema(3) == (0, 1.0, 0, 1.0, 1)
+
+
+def test_analyze_motion_pattern_buffer_matches_array():
+    from backend.multimodal.video.head_pose_detector import HeadPoseDetector
+
+    detector = HeadPoseDetector()
+    rng = np.random.default_rng(2)
+    for trial in range(50):
+        buffer = TimeWindowBuffer(detector.WINDOW_SIZE)
+        # 先写满再继续追加，使有效样本跨越环形缓冲区的回绕点
+        angles = np.sin(np.linspace(0, rng.uniform(1, 8), 30 + trial)) * rng.uniform(2, 30) + rng.normal(0, 2, 30 + trial)
+        fill(buffer, angles)
+        for threshold in (5, 15, 30):
+            assert detector.analyze_motion_pattern(buffer, threshold) == \
+                detector.analyze_motion_pattern(buffer.values(), threshold)
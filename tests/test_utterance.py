@@ -0,0 +1,104 @@
+import numpy as np
+
+from backend.multimodal.audio.utterance import UtteranceAssembler
+
+SAMPLE_RATE = 16000
+HOP = 160
+
+
+def segment(*parts):
+    """parts 为 (秒数, 是否语音)，返回 (PCM, 逐帧判定)；样本值为全局递增序号，便于检查拼接"""
+    frames = [(round(seconds * SAMPLE_RATE / HOP), speech) for seconds, speech in parts]
+    mask = np.concatenate([np.full(count, speech, dtype=bool) for count, speech in frames])
+    return (np.arange(len(mask) * HOP) % 30000).astype(np.int16), mask
+
+
+def samples(seconds):
+    return round(seconds * SAMPLE_RATE)
+
+
+def assembler(**kwargs):
+    kwargs.setdefault('chunk_end_hangover', 0.2)
+    return UtteranceAssembler(sample_rate=SAMPLE_RATE, hop_length=HOP, hangover=0.6, preroll=0.3, **kwargs)
+
+
+def test_utterance_ends_after_hangover_with_preroll():
+    pcm, mask = segment((1.0, False), (1.0, True), (1.0, False))
+    utterances = assembler().push(pcm, mask)
+    assert len(utterances) == 1
+    # 0.3 秒 preroll + 1 秒语音 + 0.6 秒 hangover
+    np.testing.assert_array_equal(utterances[0], pcm[samples(0.7):samples(2.6)])
+
+
+def test_speech_is_joined_across_chunks():
+    asm = assembler()
+    pcm, mask = segment((0.5, False), (1.0, True), (0.5, True), (0.8, False))
+    split = samples(1.0)
+    # 第一段在语音中间结束，不能在段尾结束语句
+    assert asm.push(pcm[:split], mask[:split // HOP]) == []
+    assert asm.active
+    utterances = asm.push(pcm[split:], mask[split // HOP:])
+    assert len(utterances) == 1
+    np.testing.assert_array_equal(utterances[0], pcm[samples(0.2):samples(2.6)])
+
+
+def test_short_noise_is_discarded():
+    asm = assembler(min_speech=0.3)
+    assert asm.push(*segment((1.0, False), (0.1, True), (1.0, False))) == []
+    assert not asm.active
+
+
+def test_long_chunk_ends_utterance_at_chunk_end():
+    """4.8 秒一段：段尾静音不足 hangover 但已达到 chunk_end_hangover，本段就结束语句"""
+    utterances = assembler().push(*segment((2.0, False), (2.5, True), (0.3, False)))
+    assert len(utterances) == 1
+    assert len(utterances[0]) == samples(0.3 + 2.5 + 0.3)
+
+
+def test_speech_running_to_chunk_end_is_kept_open():
+    asm = assembler()
+    assert asm.push(*segment((2.0, False), (2.8, True))) == []
+    assert asm.active
+    utterances = asm.push(*segment((1.0, True), (3.8, False)))
+    assert len(utterances) == 1
+    assert len(utterances[0]) == samples(0.3 + 2.8 + 1.0 + 0.6)
+
+
+def test_short_chunks_wait_for_full_hangover():
+    """不长于 hangover 的分段按完整 hangover 判定结束，不在段尾提前切分"""
+    asm = assembler()
+    assert asm.push(*segment((0.4, True), (0.2, False))) == []
+    assert asm.push(*segment((0.3, False))) == []
+    assert len(asm.push(*segment((0.3, False)))) == 1
+
+
+def test_flush_ends_open_utterance():
+    asm = assembler()
+    utterances = asm.push(*segment((0.5, False), (0.5, True)), flush=True)
+    assert len(utterances) == 1 and not asm.active
+
+
+def test_forced_split_keeps_all_samples():
+    asm = assembler(max_seconds=1.0)
+    pcm, mask = segment((2.5, True), (0.4, False))
+    utterances = asm.push(pcm, mask)
+    assert [len(u) for u in utterances] == [samples(1.0), samples(1.0), samples(0.9)]
+    np.testing.assert_array_equal(np.concatenate(utterances), pcm)
+
+
+def test_reset_drops_open_utterance_and_preroll():
+    asm = assembler()
+    asm.push(*segment((1.0, False), (1.0, True)))
+    asm.reset()
+    assert not asm.active
+    utterances = asm.push(*segment((0.5, True), (0.6, False)))
+    assert len(utterances) == 1
+    assert len(utterances[0]) == samples(1.1)
+
+
+def test_empty_input():
+    asm = assembler()
+    assert asm.push(np.zeros(0, dtype=np.int16), np.zeros(0, dtype=bool)) == []
+    # 不足一帧：沿用静音判定
+    assert asm.push(np.zeros(100, dtype=np.int16), np.zeros(0, dtype=bool)) == []
+    assert not asm.active
@@ -0,0 +1,78 @@
+import numpy as np
+import pytest
+
+from backend.multimodal.audio.vad import SpeechGate, classify_frames, frame_energies, longest_run, normalize_audio
+
+SAMPLE_RATE = 16000
+
+
+def noise(seconds, std, seed=0):
+    return (np.random.default_rng(seed).standard_normal(int(seconds * SAMPLE_RATE)) * std).astype(np.int16)
+
+
+def speech(seconds, std=6000, seed=1):
+    """1.2 Hz 包络调制的宽带信号，模拟有停顿的语音"""
+    n = int(seconds * SAMPLE_RATE)
+    envelope = np.abs(np.sin(np.pi * 1.2 * np.arange(n) / SAMPLE_RATE))
+    return (np.random.default_rng(seed).standard_normal(n) * std * envelope).astype(np.int16)
+
+
+def test_frame_energies_matches_per_frame_loop():
+    audio = normalize_audio(noise(0.1, 3000))
+    frame_length, hop_length = 320, 160
+    expected = [np.mean(audio[start:start + frame_length] ** 2)
+                for start in range(0, len(audio) - frame_length, hop_length)]
+    np.testing.assert_allclose(frame_energies(audio, frame_length, hop_length), expected, rtol=1e-5)
+    assert frame_energies(audio[:frame_length], frame_length, hop_length).size == 0
+
+
+def test_longest_run_and_classify_frames():
+    mask = np.array([0, 1, 1, 0, 1, 1, 1, 0], dtype=bool)
+    assert longest_run(mask) == 3
+    assert longest_run(np.zeros(4, dtype=bool)) == 0
+    has_speech, ratio = classify_frames(mask, 160, SAMPLE_RATE, min_length=0.03)
+    assert has_speech and ratio == pytest.approx(5 / 8)
+    assert not classify_frames(mask, 160, SAMPLE_RATE, min_length=0.04)[0]
+
+
+def test_rejects_silence_and_accepts_speech():
+    gate = SpeechGate()
+    assert gate.update(noise(2.0, 20)) == (False, pytest.approx(0, abs=0.1))
+    has_speech, ratio = gate.update(np.concatenate((noise(1.0, 20), speech(2.0), noise(1.0, 20))))
+    assert has_speech and 0.2 < ratio < 0.6
+
+
+def test_adapts_to_steady_engine_noise():
+    gate = SpeechGate(adapt_seconds=5.0)
+    engine = noise(4.8, 1500, seed=3)
+    # 适应完成前宁可放行：初始噪声底为绝对下限
+    assert gate.update(engine)[0]
+    for seed in range(4, 10):
+        gate.update(noise(4.8, 1500, seed=seed))
+    assert not gate.update(noise(4.8, 1500, seed=10))[0]
+    # 发动机噪声之上的语音仍能检出
+    assert gate.update(noise(4.8, 1500, seed=11) + speech(4.8, std=8000))[0]
+
+
+def test_noise_floor_drops_immediately_and_rises_slowly():
+    gate = SpeechGate(min_dbfs=-80.0, adapt_seconds=5.0)
+    loud_db = 20 * np.log10(1500 / 32768)
+    quiet_db = 20 * np.log10(30 / 32768)
+    gate.update(noise(4.8, 1500))
+    # 上升按时间常数跟随：4.8 秒只走完约 62%
+    assert -80.0 < gate.noise_floor_db < loud_db - 10
+    gate.update(noise(0.5, 30))
+    quiet_floor = gate.noise_floor_db
+    # 下降立即跟随（10% 分位数略低于均方值）
+    assert quiet_floor == pytest.approx(quiet_db, abs=3)
+    # 连续说话不会把噪声底抬高到语音电平
+    gate.update(speech(0.5))
+    assert gate.noise_floor_db < quiet_floor + 10
+
+
+def test_short_and_empty_input():
+    gate = SpeechGate()
+    for audio in (np.zeros(0, dtype=np.int16), noise(0.01, 3000)):
+        assert gate.speech_mask(audio).size == 0
+        assert gate.update(audio) == (False, 0)
+    assert gate.noise_floor_db == gate.min_dbfs
@@ -0,0 +1,78 @@
+from concurrent.futures import Future
+
+import numpy as np
+
+from backend.multimodal.audio.wake_word import WakeWordSpotter
+
+FRAME_LENGTH = 512
+KEYWORD = 1000
+
+
+class SyncExecutor:
+    def submit(self, func, *args):
+        future = Future()
+        future.set_result(func(*args))
+        return future
+
+
+class PendingExecutor:
+    """检测任务一直未完成"""
+    def submit(self, func, *args):
+        return Future()
+
+
+class FakePorcupine:
+    """整帧都是 KEYWORD 时视为唤醒词"""
+    frame_length = FRAME_LENGTH
+
+    def __init__(self):
+        self.frames = []
+
+    def process(self, frame):
+        assert len(frame) == FRAME_LENGTH
+        self.frames.append(np.array(frame))
+        return 0 if np.all(np.asarray(frame) == KEYWORD) else -1
+
+
+def test_keyword_split_across_chunks_is_detected():
+    porcupine = FakePorcupine()
+    spotter = WakeWordSpotter(porcupine, SyncExecutor())
+    audio = np.concatenate((np.zeros(FRAME_LENGTH * 2, dtype=np.int16), np.full(FRAME_LENGTH, KEYWORD, dtype=np.int16)))
+    split = FRAME_LENGTH * 2 + 100
+    spotter.feed(audio[:split])
+    assert not spotter.poll()
+    spotter.feed(audio[split:])
+    assert spotter.wait(timeout=0.1)
+    assert spotter.poll()
+    # 事件取出后清空
+    assert not spotter.poll()
+    np.testing.assert_array_equal(np.concatenate(porcupine.frames), audio)
+
+
+def test_samples_are_processed_exactly_once_in_order():
+    porcupine = FakePorcupine()
+    spotter = WakeWordSpotter(porcupine, SyncExecutor())
+    audio = np.arange(FRAME_LENGTH * 5, dtype=np.int16)
+    for chunk in np.split(audio, [100, 130, 900, 1600, 1601]):
+        spotter.feed(chunk)
+    np.testing.assert_array_equal(np.concatenate(porcupine.frames), audio[:FRAME_LENGTH * 5])
+    assert not spotter.poll()
+
+
+def test_wait_times_out():
+    spotter = WakeWordSpotter(FakePorcupine(), PendingExecutor())
+    assert spotter.wait(timeout=0.01)  # 尚未提交
+    spotter.feed(np.zeros(FRAME_LENGTH, dtype=np.int16))
+    assert not spotter.wait(timeout=0.01)
+
+
+def test_close_clears_carry_and_events():
+    porcupine = FakePorcupine()
+    spotter = WakeWordSpotter(porcupine, SyncExecutor())
+    spotter.feed(np.full(FRAME_LENGTH + 10, KEYWORD, dtype=np.int16))
+    spotter.close()
+    assert not spotter.poll()
+    # 上一个会话剩余的样本不会拼接到下一个会话
+    spotter.feed(np.zeros(FRAME_LENGTH, dtype=np.int16))
+    assert len(porcupine.frames) == 2
+    assert np.all(porcupine.frames[-1] == 0)
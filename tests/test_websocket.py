@@ -0,0 +1,55 @@
+import json
+
+import pytest
+
+from backend.routes.websocket import classify_part_priority, emergency_fallback, handle_message, match_emergency_code
+from backend.task_scheduler import TaskPriority
+
+
+class FakeWebSocket:
+    def __init__(self):
+        self.sent = []
+
+    def send(self, message, binary=None):
+        self.sent.append(json.loads(message))
+
+
+def test_heartbeat():
+    ws = FakeWebSocket()
+    handle_message(ws, {'type': 'heartbeat'})
+    assert ws.sent == [{'type': 'heartbeat', 'status': 'alive'}]
+
+
+def test_command_is_not_handled_outside_the_scheduler():
+    """command 帧只能经推理协程提交到优先级调度器，不能在这里绕过调度直接推理"""
+    ws = FakeWebSocket()
+    handle_message(ws, {'type': 'command', 'user_id': 1})
+    assert ws.sent == [{'error': '未知消息类型: command'}]
+
+
+@pytest.mark.parametrize('part, info, code', [
+    ('image', '确认,视觉数据为空', '2800'),
+    ('image', '无手势,驾驶员持续分心或疲劳！', '2300'),
+    ('image', '无手势,视觉数据为空', None),
+    ('audio', '已注意道路。', '3000'),
+    ('audio', '  确认 ', '2800'),
+    # 包含紧急指令文本的普通命令不是紧急事件
+    ('audio', '确认导航到公司', None),
+    ('audio', '拒绝播放音乐', None),
+])
+def test_match_emergency_code_is_exact(part, info, code):
+    assert match_emergency_code(part, info) == code
+
+
+def test_classify_part_priority():
+    assert classify_part_priority('audio', '你好小车', '你好小车') == TaskPriority.WAKE_WORD
+    assert classify_part_priority('image', '拒绝,视觉数据为空', '你好小车') == TaskPriority.EMERGENCY
+    assert classify_part_priority('audio', '打开空调', '你好小车') == TaskPriority.NORMAL_COMMAND
+
+
+def test_emergency_fallback_only_gives_safety_feedback():
+    image_result, _ = emergency_fallback('image', '无手势,驾驶员持续分心或疲劳！')
+    assert image_result['instruction_code'] == '2300' and image_result['feedback']
+    # 确认、拒绝不能由本地兜底替用户决定
+    _, audio_result = emergency_fallback('audio', '确认')
+    assert audio_result['instruction_code'] == '2800' and audio_result['feedback'] == ''